@@ -17,6 +17,8 @@ classifiers = [
     'Intended Audience :: Developers',
     'License :: OSI Approved :: MIT License',
     'Environment :: Win32 (MS Windows)',
+    'Operating System :: Microsoft :: Windows',
+    'Operating System :: POSIX :: Linux',
     'Programming Language :: Python :: 3',
 ]
 
@@ -42,9 +44,12 @@ setup(
     classifiers=classifiers,
     packages=packages,
     package_dir=package_dir,
+    package_data={'swimport': ['include/swimport/*.h']},
     install_requires=['CppHeaderParser>=2'],
     extras_require={
-        'memory testing': ['psutil']
+        'memory testing': ['psutil'],
+        # the examples of numpy arrays
+        'examples': ['numpy'],
     },
     python_requires=">=3.6.0",
 )
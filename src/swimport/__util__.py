@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import Iterable, Optional, Union, TypeVar, Sequence
 
 import re
+import os
 from enum import IntEnum
 from functools import lru_cache, partial, update_wrapper
 from string import Formatter
@@ -213,9 +214,23 @@ class Replaceable:
         )
 
 
+def write_if_changed(path: str, text: str):
+    """
+    write text to a path, unless the path already has that content. Leaving identical files untouched keeps their
+    modification time, so it can be used by build systems.
+    """
+    if os.path.exists(path):
+        with open(path) as r:
+            if r.read() == text:
+                return
+    with open(path, 'w') as w:
+        w.write(text)
+
+
 __all__ = [
     'Verbosity',
     'scope_lines', 'clean_source', 'clean_identifier',
     'ExtendedFormatter',
-    'Replaceable'
+    'Replaceable',
+    'write_if_changed'
 ]
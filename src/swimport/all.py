@@ -3,7 +3,8 @@ from swimport.model import \
     CPPObject, Function, Container, Variable, Enumeration, Typedef
 from swimport.pools import pools
 from swimport.swim import Swim
-from swimport.typeswim import TypeSwimporting, FunctionBody, BuiltinTypemap
+from swimport.profiling import SwimProfiler
+from swimport.typeswim import TypeSwimporting, FunctionBody, BuiltinTypemap, DefaultCppCheck
 
 from swimport.functionswim import FunctionNameTrigger, FunctionBehaviour, ParameterNameTrigger, ParameterTypeTrigger,\
     ParameterBehaviour, ParameterRule
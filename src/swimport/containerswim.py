@@ -4,7 +4,7 @@ from functools import partial
 
 from swimport.__util__ import *
 from swimport.model import Container, NameTrigger, SwimRule, object_swimporting, Source, SwimportingsResult, \
-    RawSource, Function
+    RawSource, Function, indexed_candidates
 from swimport.swim import Swim
 from swimport.typeswim import TypeSwimporting, BuiltinTypemap, FunctionBody
 
@@ -135,9 +135,10 @@ class ContainerSwim:
         self.wrapper_superclass = wrapper_superclass
 
         trigger = Container.Trigger(trigger)
+        trigger_func = trigger.compile()
         qualified = None
-        for c in source:
-            if trigger.is_valid(None, c):
+        for c in indexed_candidates(source, trigger):
+            if trigger_func(None, c):
                 if qualified is None:
                     qualified = c
                 else:
@@ -1,11 +1,14 @@
 from typing import Union, List, Match, Optional, Iterable, Deque
 
 import re
+import keyword
 from collections import deque
+from warnings import warn
 
 from swimport.swim import Swim
 from swimport.pools import Pool, syspools
-from swimport.model import NameTrigger, Function, object_swimporting, Compileable, TriggerBehaviourSwimRule, SwimRule
+from swimport.model import NameTrigger, Function, Container, object_swimporting, Compileable, \
+    TriggerBehaviourSwimRule, SwimRule
 from swimport.__util__ import *
 
 MACRO_PATTERN = re.compile(r'\$({(?P<k_b>[^}]+)}|(?P<k>[a-zA-Z_0-9]+)|(?P<other>({}|.)))')
@@ -167,6 +170,79 @@ ParameterRule.default = ParameterBehaviour.default
 
 # endregion
 
+
+# the special methods that swig exports the operator methods of classes as (see swig's pyopers.swg)
+operator_method_names = {
+    'operator+': '__add__', 'operator-': '__sub__', 'operator*': '__mul__', 'operator/': '__truediv__',
+    'operator%': '__mod__', 'operator<<': '__lshift__', 'operator>>': '__rshift__',
+    'operator&': '__and__', 'operator|': '__or__', 'operator^': '__xor__',
+    'operator<': '__lt__', 'operator<=': '__le__', 'operator>': '__gt__', 'operator>=': '__ge__',
+    'operator==': '__eq__', 'operator!=': '__ne__',
+    'operator~': '__invert__', 'operator()': '__call__',
+}
+# as operator_method_names, for unary operators (that are methods without parameters)
+unary_operator_method_names = {'operator+': '__pos__', 'operator-': '__neg__'}
+
+
+def exported_name(func: Function) -> Optional[str]:
+    """
+    get the name that swig exports a function as in python. Names that are python keywords are prefixed with an
+    underscore, and operator methods are exported as special methods. Names changed by %rename directives are not
+    detected.
+    :param func: the function
+    :return: the exported name, or None if swig ignores the function or its exported name is unknown
+    """
+    name = func.name
+    if func._data.get('operator'):
+        if not isinstance(func, Container.Method):
+            # swig ignores operators outside of classes
+            return None
+        if not func.parameters and name in unary_operator_method_names:
+            return unary_operator_method_names[name]
+        return operator_method_names.get(name)
+    if name in ('print', 'exec'):
+        # only some versions of swig rename these (they used to be python keywords)
+        return None
+    if keyword.iskeyword(name):
+        return '_' + name
+    return name
+
+
+def async_companion(func: Function) -> Optional[str]:
+    """
+    get the python code of a coroutine that runs a function in the module's async_executor
+    :param func: the function to run
+    :return: the definition of the coroutine, <name>_async (where name is the name the function is exported as, without
+        the double underscores of special methods), or None if the exported name of the function is unknown
+    """
+    name = exported_name(func)
+    if name is None:
+        warn(f'cannot tell the name that {func.name} is exported as, it will not have an async companion')
+        return None
+    companion = name
+    if name.startswith('__') and name.endswith('__'):
+        # names that start with a double underscore (and don't end with one) are mangled in class bodies
+        companion = name[2:-2]
+    if not isinstance(func, Container.Method):
+        return f"""
+            async def {companion}_async(*args, **kwargs):
+                '''{name}, run in the module's async_executor'''
+                return await _SWIMPORT_run_async({name}, *args, **kwargs)
+            """
+    if func.is_static:
+        return f"""
+            @classmethod
+            async def {companion}_async(cls, *args, **kwargs):
+                '''{name}, run in the module's async_executor'''
+                return await _SWIMPORT_run_async(cls.{name}, *args, **kwargs)
+            """
+    return f"""
+            async def {companion}_async(self, *args, **kwargs):
+                '''{name}, run in the module's async_executor'''
+                return await _SWIMPORT_run_async(self.{name}, *args, **kwargs)
+            """
+
+
 @Function.set_default_behaviour
 class FunctionBehaviour(Function.Behaviour):
     default_parameters_rules: Deque[ParameterRule] = deque((
@@ -180,7 +256,8 @@ class FunctionBehaviour(Function.Behaviour):
     def __init__(self, parameter_rules: List[ParameterRule] = ..., dll_detect=(),
                  prepend_python: str = None, append_python: str = None, exception_check=None, contract=None,
                  free_ret: Union[str, bool] = False, autodoc: Union[str, int, None] = 2,
-                 docstring: str = None, body: str = '', body_scope: str = ...):
+                 docstring: str = None, body: str = '', body_scope: str = ..., release_gil: bool = ...,
+                 async_: bool = False):
         """
         :param parameter_rules: rules for handling parameters
         :param dll_detect: dll detection dictionary
@@ -193,6 +270,11 @@ class FunctionBehaviour(Function.Behaviour):
         or specify a releasing function.
         :param autodoc: autodoc value for function (see %autodoc in SWIG)
         :param docstring: docstring for the function
+        :param release_gil: whether to release the GIL while the function runs (after its arguments are converted and
+        before its return value is converted). The function must not use python objects. Default is to release the
+        GIL only for async functions.
+        :param async_: whether to add a coroutine companion, <name>_async, that runs the function in the module's
+        async_executor (see syspools.async_executor).
         """
         if parameter_rules is ...:
             parameter_rules = self.default_parameters_rules
@@ -207,6 +289,10 @@ class FunctionBehaviour(Function.Behaviour):
         self.docstring = docstring
         self.body = body
         self.body_scope = body_scope
+        if release_gil is ...:
+            release_gil = async_
+        self.release_gil = release_gil
+        self.async_ = async_
 
         if self.body:
             assert not self.dll_detect, 'function body must not be used with dll detect'
@@ -281,16 +367,25 @@ class FunctionBehaviour(Function.Behaviour):
                 Swim.add_python_prepend(obj, None)
             )
 
-        elif self.exception:
+        if self.exception or self.release_gil:
+            action = '$action'
+            if self.release_gil:
+                swim(syspools.allow_threads)
+                action = '{SWIM_ALLOW_THREADS $action}'
+
             if self.exception is ...:
                 swim(syspools.std_exception)
+                if self.release_gil:
+                    std_exception = 'SWIM_STD_EXCEPTION_ACTION(' + obj.pattern + ', ' + action + ');'
+                else:
+                    std_exception = 'SWIM_STD_EXCEPTION(' + obj.pattern + ');'
                 pre_decl_scopes.append(
-                    Swim.add_raw('SWIM_STD_EXCEPTION(' + obj.pattern + ');')
+                    Swim.add_raw(std_exception)
                 )
             else:
-                exception = clean_source(self.exception)
+                exception = clean_source(self.exception) if self.exception else '$action'
                 pre_decl_scopes.append(
-                    Swim.add_exception_check(exception)
+                    Swim.add_exception_check(exception.replace('$action', action))
                 )
 
             post_decl_scopes.append(Swim.add_raw('%exception;'))
@@ -352,6 +447,12 @@ class FunctionBehaviour(Function.Behaviour):
         for scope in reversed(post_decl_scopes):
             scope(swim)
 
+        if self.async_:
+            companion = async_companion(obj)
+            if companion:
+                swim(syspools.async_executor)
+                swim.add_python(companion)
+
         swim.add_comment(((n + ': ' + str(v)) for n, v in debug.items()),
                          verbosity_level=Verbosity.debug)
 
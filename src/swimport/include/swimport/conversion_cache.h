@@ -0,0 +1,127 @@
+#pragma once
+// a memo of the values that typecheck typemaps convert (see DefaultCppCheck's cache), so that overload dispatch converts
+// each argument to each type only once, and the in typemap of the chosen overload does not convert it again.
+#include <Python.h>
+#include <cstddef>
+#include <memory>
+#include <utility>
+#include <vector>
+
+namespace py_cache{
+    // whether an object, and everything it holds, is immutable. Only the conversions of such objects are memoized,
+    // since swig has no hook for the end of an overload dispatch, so the memo might outlive it if no overload that
+    // uses the memo is chosen, and other objects might be changed before they are converted again.
+    inline bool is_stable(PyObject* obj, int depth = 0){
+        if (obj == Py_None || PyBool_Check(obj) || PyLong_CheckExact(obj) || PyFloat_CheckExact(obj)
+            || PyComplex_CheckExact(obj) || PyUnicode_CheckExact(obj) || PyBytes_CheckExact(obj))
+            return true;
+        if (depth >= 8 || !PyTuple_CheckExact(obj))
+            return false;
+        for (Py_ssize_t i = 0; i < PyTuple_GET_SIZE(obj); i++){
+            if (!is_stable(PyTuple_GET_ITEM(obj, i), depth + 1))
+                return false;
+        }
+        return true;
+    }
+
+    // a unique address for every type
+    template<typename T>
+    struct type_tag{
+        static char const id;
+    };
+    template<typename T>
+    char const type_tag<T>::id = 0;
+
+    // the values converted in the current call, by the converted object and their type, in the current thread.
+    // The memo is cleared when a function that uses it returns (in its freearg typemaps). Only typecheck typemaps store
+    // values in it, and the number of entries is bounded, since a dispatch that chooses an overload that does not use
+    // the memo leaves its entries behind.
+    class conversion_memo{
+        template<typename T>
+        static void destroy(void* value){
+            delete static_cast<T*>(value);
+        }
+
+        struct entry{
+            PyObject* key;  // strong reference, so the object cannot be replaced by another at the same address
+            void const * type;
+            std::unique_ptr<void, void(*)(void*)> value;
+        };
+        std::vector<entry> entries;
+
+        conversion_memo() = default;
+
+        template<typename T>
+        entry* find(PyObject* obj){
+            for (auto & e: entries){
+                if (e.key == obj && e.type == &type_tag<T>::id)
+                    return &e;
+            }
+            return nullptr;
+        }
+    public:
+        // when a value is stored in a full memo, the memo is cleared first
+        static constexpr std::size_t max_entries = 32;
+
+        conversion_memo(conversion_memo const &) = delete;
+        // the keys are not released on thread exit, since the GIL might not be held
+        ~conversion_memo() = default;
+
+        static conversion_memo& get(){
+            static thread_local conversion_memo ret;
+            return ret;
+        }
+
+        std::size_t size() const{
+            return entries.size();
+        }
+
+        void clear(){
+            if (entries.empty())
+                return;
+            // the entries are moved out first, since releasing a key might run python code that uses the memo
+            std::vector<entry> old;
+            old.swap(entries);
+            for (auto & e: old){
+                e.value.reset();
+                Py_DECREF(e.key);
+            }
+        }
+
+        template<typename T>
+        bool contains(PyObject* obj){
+            return find<T>(obj) != nullptr;
+        }
+
+        template<typename T>
+        void store(PyObject* obj, T&& v){
+            if (!is_stable(obj))
+                return;
+            std::unique_ptr<void, void(*)(void*)> value(new T(std::move(v)), &destroy<T>);
+            auto existing = find<T>(obj);
+            if (existing){
+                existing->value = std::move(value);
+                return;
+            }
+            // the entries of a full memo are most likely left over from previous calls
+            if (entries.size() >= max_entries)
+                clear();
+            Py_INCREF(obj);
+            entries.push_back(entry{obj, &type_tag<T>::id, std::move(value)});
+        }
+
+        // take the value of type T converted from obj, or nullptr if it was not memoized
+        template<typename T>
+        std::unique_ptr<T> take(PyObject* obj){
+            auto e = find<T>(obj);
+            if (!e)
+                return nullptr;
+            std::unique_ptr<T> ret(static_cast<T*>(e->value.release()));
+            PyObject* key = e->key;
+            *e = std::move(entries.back());
+            entries.pop_back();
+            Py_DECREF(key);
+            return ret;
+        }
+    };
+}
@@ -0,0 +1,36 @@
+#pragma once
+// helpers for running C++ code without holding python's GIL
+// the header is also guarded by a macro, since it might be both embedded in an interface file (see
+// syspools.allow_threads) and included by pycall_surrogate.h
+#ifndef SWIMPORT_GIL_H
+#define SWIMPORT_GIL_H
+#include <Python.h>
+
+namespace py_gil{
+    // releases the GIL for its lifetime (like Py_BEGIN_ALLOW_THREADS/Py_END_ALLOW_THREADS), the GIL is re-acquired
+    // even if an exception is thrown, before it is caught.
+    class allow_threads{
+        PyThreadState* const state;
+    public:
+        allow_threads(): state(PyEval_SaveThread()){}
+        allow_threads(allow_threads const &) = delete;
+        ~allow_threads(){
+            PyEval_RestoreThread(state);
+        }
+    };
+
+    // acquires the GIL for its lifetime (like PyGILState_Ensure/PyGILState_Release), from any thread
+    class ensure{
+        PyGILState_STATE const state;
+    public:
+        ensure(): state(PyGILState_Ensure()){}
+        ensure(ensure const &) = delete;
+        ~ensure(){
+            PyGILState_Release(state);
+        }
+    };
+}
+
+// run a function's action without the GIL (see FunctionBehaviour's release_gil)
+#define SWIM_ALLOW_THREADS py_gil::allow_threads swim_allow_threads;
+#endif
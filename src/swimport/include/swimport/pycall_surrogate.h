@@ -0,0 +1,296 @@
+#pragma once
+#include <Python.h>
+#include <cstddef>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <tuple>
+#include <type_traits>
+#include <utility>
+#include <vector>
+
+#include "gil.h"
+
+//#define PRINT
+#ifdef PRINT
+#include <iostream>
+#include <cstdio>
+using namespace std;
+#define PY_PRINT(preamble, o) wcout << preamble; PyObject_Print(o, stdout, 0); wcout << endl;
+#endif
+
+namespace py_call{
+    template <typename T>
+    using converter_to_cpp = T (*)(PyObject*, int&);
+
+    template<typename T>
+    using converter_to_py = PyObject* (*)(T const &, int&);
+
+    template<typename... ARG_TYPES>
+    using converter_to_py_pack = std::tuple<converter_to_py<ARG_TYPES>...>;
+
+    // a strong reference to a python object, that can be copied and released from any thread, with or without the GIL
+    // (it must be created with the GIL)
+    class safe_ref{
+        PyObject* const obj;
+    public:
+        explicit safe_ref(PyObject* obj): obj(obj){
+            Py_XINCREF(obj);
+        }
+        safe_ref(safe_ref const & other): obj(other.obj){
+            if (!obj)
+                return;
+            py_gil::ensure gil;
+            Py_INCREF(obj);
+        }
+        safe_ref& operator=(safe_ref const &) = delete;
+        ~safe_ref(){
+            // the reference is leaked if the interpreter was already finalized
+            if (!obj || !Py_IsInitialized())
+                return;
+            py_gil::ensure gil;
+            Py_DECREF(obj);
+        }
+
+        PyObject* get() const{
+            return obj;
+        }
+    };
+
+    // throw the python exception that is set as a c++ exception, and clear it. Used in threads that do not have a python
+    // thread state of their own, in which the exception would be lost once the GIL is released. The exception instance
+    // is thrown with its traceback, as a new reference, that the handler that catches it (see
+    // SWIM_STD_EXCEPTION_ACTION) raises and releases.
+    [[noreturn]] inline void throw_fetched(){
+        PyObject *type, *value, *traceback;
+        PyErr_Fetch(&type, &value, &traceback);
+        PyErr_NormalizeException(&type, &value, &traceback);
+        if (value && traceback)
+            PyException_SetTraceback(value, traceback);
+        Py_XDECREF(type);
+        Py_XDECREF(traceback);
+        if (!value || PyErr_Occurred()){
+            Py_XDECREF(value);
+            PyErr_Clear();
+            throw std::pair<PyObject*, std::string>(PyExc_RuntimeError, "an exception was raised in a python callback");
+        }
+        throw value;
+    }
+}
+
+template<typename RTYPE, typename... ARG_TYPES>
+class py_callable{
+    const py_call::converter_to_py_pack<ARG_TYPES...> arg_converters;
+    const py_call::converter_to_cpp<RTYPE> ret_converter;
+    PyObject* const callable;
+
+    template<int dest_index, typename... REST_TYPES>
+    void fill_args(PyObject* sink, REST_TYPES... args){}
+
+    template<int dest_index, typename FIRST, typename... REST_TYPES>
+    void fill_args(PyObject* sink, FIRST firstarg, REST_TYPES... args){
+        py_call::converter_to_py<FIRST> conv = std::get<dest_index>(arg_converters);
+        int ok = 1;
+        PyObject* py_arg = nullptr;
+        try{
+            py_arg = conv(firstarg, ok);
+        }
+        catch(...) {ok = 0;}
+        if (!ok || PyErr_Occurred()){
+            throw Py_Ellipsis;
+        }
+        PyTuple_SET_ITEM(sink, dest_index, py_arg);
+        fill_args<dest_index+1, REST_TYPES...>(sink, args...);
+    }
+public:
+    py_callable(const py_call::converter_to_cpp<RTYPE> ret_converter,
+     const py_call::converter_to_py_pack<ARG_TYPES...> arg_converters,
+     PyObject* const callable):
+    ret_converter(ret_converter), arg_converters(arg_converters), callable(callable){}
+
+    RTYPE call(ARG_TYPES... args){
+        #ifdef PRINT
+        cout << "called" << endl;
+        #endif
+
+        PyObject* py_args = PyTuple_New(sizeof...(ARG_TYPES));
+        if (!py_args){
+            throw Py_Ellipsis;
+        }
+        fill_args<0, ARG_TYPES...>(py_args, args...);
+
+        #ifdef PRINT
+        PY_PRINT("args: ", py_args);
+        cout << "calling inner" << endl;
+        #endif
+
+        auto result = PyObject_CallObject(callable, py_args);
+
+        #ifdef PRINT
+        PY_PRINT("result: ", result);
+        #endif
+
+        Py_DECREF(py_args);
+
+        if (!result){
+            throw Py_Ellipsis;
+        }
+
+        #ifdef PRINT
+        cout << "converting result" << endl;
+        #endif
+
+        int ok = 1;
+        RTYPE ret = ret_converter(result, ok);
+
+        Py_DECREF(result);
+
+        if (!ok || PyErr_Occurred()){
+            throw Py_Ellipsis;
+        }
+
+        return ret;
+    }
+};
+
+template<typename... ARG_TYPES>
+class py_callable<void, ARG_TYPES...>{
+    const py_call::converter_to_py_pack<ARG_TYPES...> arg_converters;
+    PyObject* const callable;
+
+    template<int dest_index, typename... REST_TYPES>
+    void fill_args(PyObject* sink, REST_TYPES... args){}
+
+    template<int dest_index, typename FIRST, typename... REST_TYPES>
+    void fill_args(PyObject* sink, FIRST firstarg, REST_TYPES... args){
+        py_call::converter_to_py<FIRST> conv = std::get<dest_index>(arg_converters);
+        int ok = 1;
+        PyObject* py_arg = nullptr;
+        try{
+            py_arg = conv(firstarg, ok);
+        }
+        catch(...) {ok = 0;}
+        if (!ok || PyErr_Occurred()){
+            throw Py_Ellipsis;
+        }
+        PyTuple_SET_ITEM(sink, dest_index, py_arg);
+        fill_args<dest_index+1, REST_TYPES...>(sink, args...);
+    }
+public:
+    py_callable(void* sink, const py_call::converter_to_py_pack<ARG_TYPES...> arg_converters,
+     PyObject* const callable):
+    arg_converters(arg_converters), callable(callable){}
+
+    void call(ARG_TYPES... args){
+        PyObject* py_args = PyTuple_New(sizeof...(ARG_TYPES));
+        if (!py_args){
+            throw Py_Ellipsis;
+        }
+        fill_args<0, ARG_TYPES...>(py_args, args...);
+        auto result = PyObject_CallObject(callable, py_args);
+        Py_DECREF(py_args);
+
+        if (!result){
+            throw Py_Ellipsis;
+        }
+
+        Py_DECREF(result);
+    }
+};
+
+// as py_callable, but can be called from any thread, with or without the GIL, and keeps a reference to the python
+// callable for as long as it exists.
+template<typename RTYPE, typename... ARG_TYPES>
+class py_threadsafe_callable{
+    py_callable<RTYPE, ARG_TYPES...> inner;
+    py_call::safe_ref callable;
+public:
+    template<typename RET_CONVERTER>
+    py_threadsafe_callable(RET_CONVERTER ret_converter,
+     const py_call::converter_to_py_pack<ARG_TYPES...> arg_converters,
+     PyObject* const callable):
+    inner(ret_converter, arg_converters, callable), callable(callable){}
+
+    RTYPE call(ARG_TYPES... args){
+        bool const has_thread_state = PyGILState_GetThisThreadState() != nullptr;
+        py_gil::ensure gil;
+        try{
+            return inner.call(args...);
+        }
+        catch (PyObject* const & e){
+            // the error indicator belongs to this thread's temporary thread state, convert it to an exception that
+            // can be handled after the GIL is released
+            if (e == Py_Ellipsis && !has_thread_state){
+                if (!PyErr_Occurred())
+                    throw std::pair<PyObject*, std::string>(PyExc_RuntimeError,
+                                                            "a python callback failed without setting an error");
+                py_call::throw_fetched();
+            }
+            throw;
+        }
+    }
+};
+
+// a thread-safe surrogate for callables that return void, that queues the calls and delivers them to python in
+// batches, acquiring the GIL once per batch. A batch is delivered (in the thread that completes it) once it has
+// batch_size calls, and the remaining calls are delivered when the last copy of the surrogate is destroyed.
+// Since the calls are deferred, exceptions raised by the python callable are reported with PyErr_WriteUnraisable.
+template<typename... ARG_TYPES>
+class py_batched_callable{
+    using call_args = std::tuple<typename std::decay<ARG_TYPES>::type...>;
+
+    struct state{
+        py_callable<void, ARG_TYPES...> inner;
+        py_call::safe_ref callable;
+        std::size_t const batch_size;
+        std::mutex mutex;
+        std::vector<call_args> pending;
+
+        state(const py_call::converter_to_py_pack<ARG_TYPES...> arg_converters, PyObject* const callable,
+         std::size_t batch_size):
+        inner(nullptr, arg_converters, callable), callable(callable), batch_size(batch_size ? batch_size : 1){}
+
+        state(state const &) = delete;
+        ~state(){
+            deliver(pending);
+        }
+
+        template<std::size_t... I>
+        void deliver_one(call_args & args, std::index_sequence<I...>){
+            inner.call(std::get<I>(args)...);
+        }
+
+        void deliver(std::vector<call_args> & calls){
+            if (calls.empty() || !Py_IsInitialized())
+                return;
+            py_gil::ensure gil;
+            for (auto & args: calls){
+                try{
+                    deliver_one(args, std::index_sequence_for<ARG_TYPES...>());
+                }
+                catch (...){
+                    if (PyErr_Occurred())
+                        PyErr_WriteUnraisable(callable.get());
+                }
+            }
+        }
+    };
+    std::shared_ptr<state> shared;
+public:
+    py_batched_callable(void* sink, const py_call::converter_to_py_pack<ARG_TYPES...> arg_converters,
+     PyObject* const callable, std::size_t batch_size):
+    shared(std::make_shared<state>(arg_converters, callable, batch_size)){}
+
+    void call(ARG_TYPES... args){
+        std::vector<call_args> batch;
+        {
+            std::lock_guard<std::mutex> lock(shared->mutex);
+            shared->pending.emplace_back(args...);
+            if (shared->pending.size() < shared->batch_size)
+                return;
+            batch.swap(shared->pending);
+            shared->pending.reserve(shared->batch_size);
+        }
+        shared->deliver(batch);
+    }
+};
@@ -0,0 +1,28 @@
+#pragma once
+// swimport's header-only runtime: the helpers that generated interface files use, in a single header that does not
+// depend on the module, so it can be precompiled once and shared between all the translation units of all modules.
+// include it with pools.runtime, or by creating the swim with runtime=True.
+#include <Python.h>
+#include <cstddef>
+#include <new>
+#include <memory>
+#include <exception>
+#include <stdexcept>
+#include <system_error>
+#include <string>
+#include <utility>
+#include <tuple>
+#include <functional>
+#include <typeinfo>
+#include <vector>
+#include <map>
+#include <set>
+#include <unordered_map>
+#include <unordered_set>
+
+#include "typemap_macros.h"
+#include "py_iterable.h"
+#include "cpp_iterable.h"
+#include "pycall_surrogate.h"
+#include "conversion_cache.h"
+#include "gil.h"
@@ -0,0 +1,33 @@
+#pragma once
+// the macros that swimport's type conversion functions use (see pools.typemap_macros)
+#include <exception>
+#include <utility>
+#include <string>
+#include <typeinfo>
+
+#define PACKED_UD(ind) (((void**)userdata)[(ind)])
+// note: RAISE macros are supposed to be thrown form py->cpp functions, and THROW from cpp->py
+#define SWIM_RAISE(TYPE,MSG) throw std::pair<PyObject*, std::string>((TYPE), (MSG))
+#define SWIM_RAISE_KEY(MSG, KEY)   { std::string msg = (MSG);\
+                                     auto key_str = PyObject_Str((KEY));\
+                                     msg += PyUnicode_AsUTF8(key_str);\
+                                     Py_DECREF(key_str);\
+                                     SWIM_RAISE(PyExc_KeyError, msg); }
+#define SWIM_RAISE_TYPE(MSG, OBJ)  { std::string msg = (MSG);\
+                                     auto otype = PyObject_Type((OBJ)); \
+                                     auto otype_str = PyObject_Str(otype);\
+                                     msg += PyUnicode_AsUTF8(otype_str);\
+                                     Py_DECREF(otype);\
+                                     Py_DECREF(otype_str);\
+                                     SWIM_RAISE(PyExc_TypeError, msg); }
+#define SWIM_RAISE_UNSPECIFIED_VAR(var) SWIM_RAISE_TYPE("an unspecified exception occurred, input type: ", var);
+#define SWIM_RAISE_UNSPECIFIED SWIM_RAISE_UNSPECIFIED_VAR(input);
+#define SWIM_RAISE_EXISTING throw Py_Ellipsis;
+
+#define SWIM_THROW SWIM_RAISE
+#define SWIM_THROW_TYPE(MSG, OBJ)  { std::string msg = (MSG);\
+                                     msg += typeid((OBJ)).name();\
+                                     SWIM_RAISE(PyExc_TypeError, msg); }
+#define SWIM_THROW_UNSPECIFIED_VAR(var) SWIM_THROW_TYPE("an unspecified exception occurred, input type: ", var);
+#define SWIM_THROW_UNSPECIFIED SWIM_THROW_UNSPECIFIED_VAR(input);
+#define SWIM_THROW_EXISTING SWIM_RAISE_EXISTING
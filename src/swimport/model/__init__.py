@@ -1,4 +1,4 @@
 from swimport.model.cpp_object import CPPObject, Variable, Function, Container, Enumeration, Typedef,\
-    Source, FileSource, RawSource
+    Source, FileSource, RawSource, NameIndex
 from swimport.model.rules import TriggerBehaviourSwimRule, Swimporting, Compileable, object_swimporting,\
-    SwimRule, Trigger, Behaviour, NameTrigger, SwimportingsResult, SwimportAggregate
+    SwimRule, Trigger, Behaviour, NameTrigger, SwimportingsResult, SwimportAggregate, indexed_candidates
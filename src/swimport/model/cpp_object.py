@@ -1,14 +1,22 @@
 from __future__ import annotations
 
-from typing import Callable, Type, Any, Generic, Optional, TypeVar, List, Iterable
+from typing import Callable, Type, Any, Generic, Optional, TypeVar, List, Iterable, Union, Tuple, Dict, Set
 
 from abc import ABC, abstractmethod
 from inspect import isabstract
 from functools import update_wrapper, lru_cache
 import re
+import pickle
 from enum import Enum
 from itertools import chain
-
+from bisect import bisect_left
+from hashlib import sha256
+from os import PathLike, replace, remove, cpu_count
+from pathlib import Path
+from tempfile import mkstemp
+from concurrent.futures import ProcessPoolExecutor
+
+import swimport
 import swimport.model.rules as rules_mod
 
 import CppHeaderParser
@@ -19,31 +27,228 @@ Source = Iterable['CPPObject']
 
 
 class HeaderSource(Source):
+    """
+    A source of the objects detected by a parsed header. The CPPObject wrappers are only created when the source is
+    iterated over, and each wrapper is created at most once.
+    """
+
     def __init__(self, header, lines):
-        self._objects: List[CPPObject] = [
-            *(Function(f, lines) for f in header.functions),  # methods
-            *(Typedef(pair) for pair in header.typedefs.items()),  # typedefs
-            *(Enumeration(e, lines) for e in header.enums),  # enums
-            *(Variable(v) for v in header.variables),  # vars
-            *(Container(c, lines) for c in header.classes.values())  # containers
+        self._set_entries(self.header_entries(header), lines)
+
+    @staticmethod
+    def header_entries(header) -> List[Tuple[Type[CPPObject], Any]]:
+        """get the raw parser data of all the objects detected by a parsed header, alongside their wrapper types"""
+        return [
+            *((Function, f) for f in header.functions),  # methods
+            *((Typedef, pair) for pair in header.typedefs.items()),  # typedefs
+            *((Enumeration, e) for e in header.enums),  # enums
+            *((Variable, v) for v in header.variables),  # vars
+            *((Container, c) for c in header.classes.values())  # containers
         ]
 
+    def _set_entries(self, entries: List[Tuple[Type[CPPObject], Any]], lines: List[str]):
+        self._entries = entries
+        self._lines = lines
+        self._objects: List[Optional[CPPObject]] = [None] * len(entries)
+        self._name_index: Optional[NameIndex] = None
+
+    def _wrap(self, index) -> CPPObject:
+        ret = self._objects[index]
+        if ret is None:
+            cls, data = self._entries[index]
+            if issubclass(cls, _Sourced):
+                ret = cls(data, self._lines)
+            else:
+                ret = cls(data)
+            self._objects[index] = ret
+        return ret
+
+    @property
+    def name_index(self) -> NameIndex:
+        """an index of the source's objects by category and name, created on first access"""
+        if self._name_index is None:
+            self._name_index = NameIndex(self)
+        return self._name_index
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, index) -> CPPObject:
+        return self._wrap(index)
+
     def __iter__(self):
-        yield from self._objects
+        for i in range(len(self._entries)):
+            yield self._wrap(i)
+
+
+class NameIndex:
+    """
+    An index of an indexable source's objects, by category, exact name, and name prefix.
+    All lookups return sets of indices into the source.
+    """
+
+    def __init__(self, source: HeaderSource):
+        # category -> (all indices, name -> indices, sorted names, indices parallel to the sorted names)
+        self._categories: Dict[type, Tuple[Set[int], Dict[str, Set[int]], List[str], List[int]]] = {}
+        by_category: Dict[type, List[Tuple[str, int]]] = {}
+        # the index is built from the raw entries, so that indexing the source doesn't create its wrappers
+        for i, (cat, data) in enumerate(source._entries):
+            all_indices, exact, _, _ = self._categories.setdefault(cat, (set(), {}, [], []))
+            all_indices.add(i)
+            name = cat.raw_name(data)
+            if isinstance(name, str):
+                exact.setdefault(name, set()).add(i)
+                by_category.setdefault(cat, []).append((name, i))
+
+        for cat, pairs in by_category.items():
+            pairs.sort()
+            _, _, names, indices = self._categories[cat]
+            names.extend(n for (n, _) in pairs)
+            indices.extend(i for (_, i) in pairs)
+
+    def _matching(self, category: Optional[type]):
+        if category is None:
+            return self._categories.values()
+        return (v for (k, v) in self._categories.items() if issubclass(k, category))
+
+    def category(self, category: Optional[type]) -> Set[int]:
+        """get the indices of all the objects of a category"""
+        ret = set()
+        for all_indices, _, _, _ in self._matching(category):
+            ret.update(all_indices)
+        return ret
+
+    def exact(self, name: str, category: Optional[type] = None) -> Set[int]:
+        """get the indices of all the objects of a category with a specific name"""
+        ret = set()
+        for _, exact, _, _ in self._matching(category):
+            ret.update(exact.get(name, ()))
+        return ret
+
+    def prefix(self, prefix: str, category: Optional[type] = None) -> Set[int]:
+        """get the indices of all the objects of a category whose names start with a prefix"""
+        ret = set()
+        for _, _, names, indices in self._matching(category):
+            i = bisect_left(names, prefix)
+            while i < len(names) and names[i].startswith(prefix):
+                ret.add(indices[i])
+                i += 1
+        return ret
 
 
 class FileSource(HeaderSource):
     """A source from a cpp header file. Reads the header file and generates CPPObject wrappers for the objects
     detected."""
 
-    def __init__(self, source_path, directives=()):
+    default_cache_dir: Optional[Union[str, PathLike]] = None  # the cache directory to use if none is specified
+    cache_format_version = 2  # increment this whenever the wrappers change in a way that invalidates old caches
+
+    def __init__(self, source_path, directives=(), cache_dir=...):
+        """
+        :param source_path: the path to the header file
+        :param directives: preprocessor directives to define when the header is included
+        :param cache_dir: a directory to store the parsed header in, so that later runs over an identical header
+            will not need to parse it again. None to disable caching. Default is to use FileSource.default_cache_dir.
+        """
         self.source_path = source_path
         self.directives = directives
 
         with open(self.source_path) as r:
             lines = [l.rstrip() for l in r]
-        header = CppHeaderParser.CppHeader('\n'.join(lines), 'string')  # self.source_path, 'file')
-        super().__init__(header, lines)
+
+        if cache_dir is ...:
+            cache_dir = self.default_cache_dir
+        cache_path = None
+        cached = None
+        if cache_dir is not None:
+            cache_path = Path(cache_dir) / (self.cache_key(lines, directives) + '.pickle')
+            cached = self._read_cache(cache_path)
+
+        if cached is None:
+            header = CppHeaderParser.CppHeader('\n'.join(lines), 'string')  # self.source_path, 'file')
+            entries = self.header_entries(header)
+            if cache_path is not None:
+                self._write_cache(cache_path, (entries, lines))
+        else:
+            entries, lines = cached
+
+        self._set_entries(entries, lines)
+
+    @classmethod
+    def parse_many(cls, paths: Iterable[Union[str, PathLike, Tuple[Union[str, PathLike], Iterable[str]]]],
+                   workers: Optional[int] = None, cache_dir=...) -> List[FileSource]:
+        """
+        Create file sources for multiple headers, parsing them in parallel worker processes.
+        :param paths: the paths to the header files, or pairs of paths and directives.
+        :param workers: the maximum number of worker processes to use. Default is the number of processors.
+        :param cache_dir: the cache directory to use for all the headers (see FileSource.__init__)
+        :return: a list of the file sources, in the same order as their paths.
+        """
+        if cache_dir is ...:
+            # resolve the default here, worker processes might not share the class's state
+            cache_dir = cls.default_cache_dir
+
+        args = []
+        for p in paths:
+            if isinstance(p, tuple):
+                path, directives = p
+            else:
+                path, directives = p, ()
+            args.append((path, tuple(directives), cache_dir))
+
+        if workers is None:
+            workers = cpu_count() or 1
+        workers = min(workers, len(args))
+        if workers <= 1:
+            return [cls(*a) for a in args]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(cls._parse_worker, args))
+
+    @classmethod
+    def _parse_worker(cls, args):
+        return cls(*args)
+
+    @classmethod
+    def cache_key(cls, lines: List[str], directives=()) -> str:
+        """get the key under which a header's parsed objects are cached"""
+        h = sha256()
+        for part in (str(cls.cache_format_version), CppHeaderParser.version, swimport.__version__,
+                     repr(tuple(directives))):
+            h.update(part.encode('utf-8'))
+            h.update(b'\0')
+        h.update('\n'.join(lines).encode('utf-8', 'surrogatepass'))
+        return h.hexdigest()
+
+    @staticmethod
+    def _read_cache(cache_path: Path) -> Optional[Tuple[List[Tuple[Type[CPPObject], Any]], List[str]]]:
+        try:
+            with cache_path.open('rb') as r:
+                ret = pickle.load(r)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # a corrupt or outdated cache is treated the same as a missing one
+            return None
+        if not (isinstance(ret, tuple) and len(ret) == 2):
+            return None
+        return ret
+
+    @staticmethod
+    def _write_cache(cache_path: Path, cached):
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first, so that concurrent runs never read a partially written cache
+        fd, temp_path = mkstemp(dir=str(cache_path.parent), suffix='.tmp')
+        try:
+            with open(fd, 'wb') as w:
+                pickle.dump(cached, w, protocol=pickle.HIGHEST_PROTOCOL)
+            replace(temp_path, str(cache_path))
+        except BaseException:
+            try:
+                remove(temp_path)
+            except OSError:
+                pass
+            raise
 
 
 class RawSource(HeaderSource):
@@ -126,6 +331,11 @@ class CPPObject(ABC):
         """identifiable name of the object"""
         pass
 
+    @staticmethod
+    def raw_name(data) -> Optional[str]:
+        """get the name of an object from its raw parser data, without wrapping it (None for nameless objects)"""
+        return data.get('name')
+
     @property
     @abstractmethod
     def body(self) -> str:
@@ -295,7 +505,13 @@ class Function(_Declaration, _TypedCPPObject):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.params = [self.Param(p, owner=self, index=i) for (i, p) in enumerate(self._data['parameters'])]
+        self._params: Optional[List[Function.Param]] = None
+
+    @property
+    def params(self) -> List[Param]:
+        if self._params is None:
+            self._params = [self.Param(p, owner=self, index=i) for (i, p) in enumerate(self._data['parameters'])]
+        return self._params
 
     @classmethod
     def make(cls, name, params, rtnType):
@@ -364,6 +580,10 @@ class Typedef(_TypedCPPObject):
     def name(self):
         return self.dest_type
 
+    @staticmethod
+    def raw_name(data) -> str:
+        return data[0]
+
     @property
     def type(self):
         return self.source_type
@@ -411,17 +631,26 @@ class Container(_Scope):
     """a container (class, struct, or union)"""
 
     def __init__(self, data, source_lines):
-        if data['name'].startswith('union '):  # get rid of union header for unions
-            data['name'] = data['name'][len('union '):]
+        data['name'] = self.raw_name(data)
         super().__init__(data, source_lines)
+        self._methods: Optional[List[Container.Method]] = None
+        self._members: Optional[List[Container.Member]] = None
 
-        self.methods = list(chain.from_iterable(
-            (self.Method(m, source_lines, access=k) for m in v)
-            for k, v in self._data['methods'].items()))
+    @property
+    def methods(self) -> List[Method]:
+        if self._methods is None:
+            self._methods = list(chain.from_iterable(
+                (self.Method(m, self.source_lines, access=k) for m in v)
+                for k, v in self._data['methods'].items()))
+        return self._methods
 
-        self.members = list(chain.from_iterable(
-            (self.Member(m, access=k, owner=self) for m in v)
-            for k, v in self._data['properties'].items()))
+    @property
+    def members(self) -> List[Member]:
+        if self._members is None:
+            self._members = list(chain.from_iterable(
+                (self.Member(m, access=k, owner=self) for m in v)
+                for k, v in self._data['properties'].items()))
+        return self._members
 
     class Kind(Enum):
         Union = 'union'
@@ -453,6 +682,13 @@ class Container(_Scope):
     def name(self):
         return self._data['name']
 
+    @staticmethod
+    def raw_name(data) -> str:
+        name = data['name']
+        if name.startswith('union '):  # get rid of union header for unions
+            name = name[len('union '):]
+        return name
+
     @property
     def kind(self) -> Kind:
         return self.Kind[self._data['declaration_method'].capitalize()]
@@ -482,7 +718,13 @@ class Enumeration(_Declaration, _TypedCPPObject):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.members = [self.EnumerationValue(m) for m in self._data['values']]
+        self._members: Optional[List[Enumeration.EnumerationValue]] = None
+
+    @property
+    def members(self) -> List[EnumerationValue]:
+        if self._members is None:
+            self._members = [self.EnumerationValue(m) for m in self._data['values']]
+        return self._members
 
     @property
     def name(self):
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
-from typing import Callable, Type, Optional, Union, Pattern, Iterable, Any, TYPE_CHECKING, Set
+from typing import Callable, Type, Optional, Union, Pattern, Iterable, Any, TYPE_CHECKING, Set, Tuple
 
 from abc import ABC, abstractmethod
 import re
 from itertools import chain
 from functools import partial
+from time import perf_counter
 
 if TYPE_CHECKING:
-    from swimport.model.cpp_object import Source, CPPObject
+    from swimport.model.cpp_object import Source, CPPObject, NameIndex
 
 from swimport.__util__ import Replaceable
 
@@ -50,6 +51,22 @@ class Trigger(ABC, Replaceable):
         """get whether an object, under a specific rule, should be imported"""
         return True
 
+    def candidates(self, index: NameIndex) -> Optional[Set[int]]:
+        """
+        get the indices of all the objects in an indexed source that the trigger might accept, or None if the trigger
+        cannot narrow them down. Note that the trigger is still checked for each candidate.
+        """
+        return None
+
+    def compile(self) -> Callable[[Any, Any], bool]:
+        """
+        get a callable that accepts a rule and an object, and is equivalent to is_valid, but specialized for the
+        trigger's structure.
+        """
+        if _simple_spec(self):
+            return _compile_all((self,))
+        return self.is_valid
+
     def __and__(self, other):
         """Create a trigger that only accepts values that both triggers accept"""
         return AndTrigger(self, other)
@@ -78,6 +95,14 @@ class CategorizedTrigger(Trigger):
     def is_valid(self, rule: 'SwimRule', obj):
         return super().is_valid(rule, obj) and isinstance(obj, self.object_category)
 
+    def candidates(self, index: NameIndex) -> Optional[Set[int]]:
+        # the triggers that follow in the mro (like NameTrigger in ContainerNameTrigger) might narrow the category down
+        narrowed = super().candidates(index)
+        ret = index.category(self.object_category)
+        if narrowed is not None:
+            ret &= narrowed
+        return ret
+
     def __init_subclass__(cls, *, specialization, **kwargs):
         super().__init_subclass__(**kwargs)
         cls.object_category = specialization
@@ -85,6 +110,58 @@ class CategorizedTrigger(Trigger):
 
 Compileable = Union[str, Pattern[str]]
 
+_regex_special_chars = frozenset('.^$*+?{}[]|()\\')
+_regex_optional_chars = frozenset('*?{')
+
+
+def literal_prefix(pattern: Pattern[str]) -> Tuple[str, bool]:
+    """
+    get the literal prefix that all full matches of a pattern must start with, and whether the pattern is entirely
+    literal
+    >>> literal_prefix(re.compile('foo'))
+    ('foo', True)
+    >>> literal_prefix(re.compile('foo_.*'))
+    ('foo_', False)
+    >>> literal_prefix(re.compile(r'std::vector<int\\*>'))
+    ('std::vector<int*>', True)
+    >>> literal_prefix(re.compile('bar?'))
+    ('ba', False)
+    >>> literal_prefix(re.compile('a|b'))
+    ('', False)
+    >>> literal_prefix(re.compile('(?i)foo'))
+    ('', False)
+    >>> literal_prefix(re.compile('f o o', re.VERBOSE))
+    ('', False)
+    """
+    if not isinstance(pattern.pattern, str) or (pattern.flags & (re.IGNORECASE | re.VERBOSE)):
+        return '', False
+    src = pattern.pattern
+    ret = []
+    i = 0
+    while i < len(src):
+        c = src[i]
+        if c == '\\':
+            if i + 1 >= len(src) or src[i + 1].isalnum():
+                # special sequences (\d, \w, \b...) are not literal
+                break
+            ret.append(src[i + 1])
+            i += 2
+            continue
+        if c in _regex_special_chars:
+            break
+        ret.append(c)
+        i += 1
+    else:
+        return ''.join(ret), True
+
+    if '|' in src:
+        # an alternation might discard the prefix entirely (it could also be escaped, but better safe than sorry)
+        return '', False
+    if src[i] in _regex_optional_chars and ret:
+        # the last literal character is quantified, and might not appear
+        ret.pop()
+    return ''.join(ret), False
+
 
 class NameTrigger(Trigger):
     """A trigger that only allows objects whose name fully matches the pattern"""
@@ -95,6 +172,17 @@ class NameTrigger(Trigger):
     def is_valid(self, rule: 'SwimRule', obj):
         return super().is_valid(rule, obj) and self.name_pattern.fullmatch(obj.name)
 
+    def candidates(self, index: NameIndex) -> Optional[Set[int]]:
+        prefix, is_literal = literal_prefix(self.name_pattern)
+        category = getattr(self, 'object_category', None)
+        if is_literal:
+            return index.exact(prefix, category)
+        if prefix:
+            return index.prefix(prefix, category)
+        if category is not None:
+            return index.category(category)
+        return super().candidates(index)
+
 
 class AggregateTrigger(Trigger):
     """A trigger that aggregates results of other sub-triggers"""
@@ -114,7 +202,8 @@ class AggregateTrigger(Trigger):
                     object_category = False
 
             # check if we can flatten another aggregate ((a|b)|(c|d)) -> (a|b|c|d)
-            if isinstance(sub_trigger, AggregateTrigger) and sub_trigger.aggregate is self.aggregate:
+            if isinstance(sub_trigger, AggregateTrigger) and sub_trigger.aggregate is self.aggregate \
+                    and self.aggregate in _associative_aggregates:
                 self.sub_triggers.extend(sub_trigger.sub_triggers)
             else:
                 self.sub_triggers.append(sub_trigger)
@@ -125,12 +214,198 @@ class AggregateTrigger(Trigger):
     def is_valid(self, rule: 'SwimRule', obj):
         return self.aggregate(t.is_valid(rule, obj) for t in self.sub_triggers)
 
+    def candidates(self, index: NameIndex) -> Optional[Set[int]]:
+        if self.aggregate is all:
+            # any sub-trigger's candidates will do, use the smallest of them
+            ret = None
+            for t in self.sub_triggers:
+                c = t.candidates(index)
+                if c is not None and (ret is None or len(c) < len(ret)):
+                    ret = c
+            return ret
+        if self.aggregate in (any, _xor):
+            # an accepted object must be accepted by at least one sub-trigger
+            ret = set()
+            for t in self.sub_triggers:
+                c = t.candidates(index)
+                if c is None:
+                    return None
+                ret |= c
+            return ret
+        if self.aggregate is _gt:
+            return self.sub_triggers[0].candidates(index)
+        return None
+
+    def compile(self) -> Callable[[Any, Any], bool]:
+        if self.aggregate is all:
+            return _compile_all(self.sub_triggers)
+        if self.aggregate is any:
+            return _compile_any(self.sub_triggers)
+        if self.aggregate is _not_any:
+            inner = _compile_any(self.sub_triggers)
+            return lambda rule, obj: not inner(rule, obj)
+        if self.aggregate is _xor:
+            funcs = tuple(t.compile() for t in self.sub_triggers)
+
+            def ret(rule, obj):
+                odd = False
+                for f in funcs:
+                    if f(rule, obj):
+                        odd = not odd
+                return odd
+
+            return ret
+        if self.aggregate is _gt:
+            first = self.sub_triggers[0].compile()
+            second = self.sub_triggers[1].compile()
+            return lambda rule, obj: bool(first(rule, obj)) and not second(rule, obj)
+        return super().compile()
+
+
+def _xor(a):
+    return sum(map(bool, a)) % 2 == 1
+
+
+def _not_any(a):
+    return not any(a)
+
+
+def _gt(i):
+    return bool(next(i)) > bool(next(i))
+
+
+_associative_aggregates = (all, any, _xor)
+
+
+def _simple_spec(trigger: Trigger) -> Optional[Tuple[Optional[type], Optional[Pattern[str]]]]:
+    """
+    if the trigger is a plain name trigger or categorized trigger (with no custom validation), get its category and
+    name pattern (either might be None). Otherwise, return None.
+    """
+    for cls in type(trigger).__mro__:
+        if cls in (NameTrigger, CategorizedTrigger, Trigger):
+            continue
+        if 'is_valid' in vars(cls) or 'compile' in vars(cls):
+            return None
+    category = trigger.object_category if isinstance(trigger, CategorizedTrigger) else None
+    pattern = trigger.name_pattern if isinstance(trigger, NameTrigger) else None
+    if category is None and pattern is None:
+        return None
+    return category, pattern
+
+
+def _compile_all(triggers: Iterable[Trigger]) -> Callable[[Any, Any], bool]:
+    categories = []
+    full_matches = []
+    others = []
+    for t in triggers:
+        spec = _simple_spec(t)
+        if not spec:
+            others.append(t.compile())
+            continue
+        category, pattern = spec
+        if category is not None and category not in categories:
+            categories.append(category)
+        if pattern is not None:
+            full_matches.append(pattern.fullmatch)
+    categories = tuple(categories)
+    full_matches = tuple(full_matches)
+    others = tuple(others)
+
+    # category checks are the cheapest, so they go first, then the name checks, and only then custom triggers
+    def ret(rule, obj):
+        for c in categories:
+            if not isinstance(obj, c):
+                return False
+        if full_matches:
+            name = obj.name
+            for m in full_matches:
+                if not m(name):
+                    return False
+        for f in others:
+            if not f(rule, obj):
+                return False
+        return True
+
+    return ret
+
+
+def _merge_patterns(patterns: List[Pattern[str]]) -> List[Pattern[str]]:
+    """merge name patterns with the same flags into a single alternation, where possible"""
+    by_flags = {}
+    ret = []
+    for p in patterns:
+        if p.groups or not isinstance(p.pattern, str):
+            # group references would be broken by the merge
+            ret.append(p)
+        else:
+            by_flags.setdefault(p.flags, []).append(p)
+    for flags, group in by_flags.items():
+        if len(group) == 1:
+            ret.extend(group)
+            continue
+        try:
+            ret.append(re.compile('|'.join('(?:' + p.pattern + ')' for p in group), flags))
+        except re.error:
+            ret.extend(group)
+    return ret
+
+
+def _compile_any(triggers: Iterable[Trigger]) -> Callable[[Any, Any], bool]:
+    categories = []
+    patterns_by_category = {}
+    others = []
+    for t in triggers:
+        spec = _simple_spec(t)
+        if not spec:
+            others.append(t.compile())
+            continue
+        category, pattern = spec
+        if pattern is None:
+            categories.append(category)
+        else:
+            patterns_by_category.setdefault(category, []).append(pattern)
+    categories = tuple(categories)
+    name_checks = tuple(
+        (category, p.fullmatch)
+        for category, patterns in patterns_by_category.items()
+        for p in _merge_patterns(patterns)
+    )
+    others = tuple(others)
+
+    def ret(rule, obj):
+        if categories and isinstance(obj, categories):
+            return True
+        for c, m in name_checks:
+            if (c is None or isinstance(obj, c)) and m(obj.name):
+                return True
+        for f in others:
+            if f(rule, obj):
+                return True
+        return False
+
+    return ret
+
 
 AndTrigger = partial(AggregateTrigger, all)
 OrTrigger = partial(AggregateTrigger, any)
-XorTrigger = partial(AggregateTrigger, lambda a: sum(map(bool, a)) % 2 == 1)
-NotAnyTrigger = partial(AggregateTrigger, lambda a: not any(a))
-GtTrigger = partial(AggregateTrigger, lambda i: bool(next(i)) > bool(next(i)))
+XorTrigger = partial(AggregateTrigger, _xor)
+NotAnyTrigger = partial(AggregateTrigger, _not_any)
+GtTrigger = partial(AggregateTrigger, _gt)
+
+
+def indexed_candidates(source: Source, narrower) -> Iterable[CPPObject]:
+    """
+    iterate over the objects of a source that might be accepted by narrower (an object with a candidates method, like
+    a trigger or a rule). If the source is not indexed, or the narrower cannot narrow the objects down, all
+    the source's objects are iterated over.
+    """
+    index = getattr(source, 'name_index', None)
+    if index is not None:
+        candidates = narrower.candidates(index)
+        if candidates is not None:
+            return (source[i] for i in sorted(candidates))
+    return source
 
 
 class SwimRule(ABC):
@@ -141,14 +416,16 @@ class SwimRule(ABC):
         """Get a swimporting for a cppobject, or None if the object does not pass the trigger"""
         pass
 
+    def candidates(self, index: NameIndex) -> Optional[Set[int]]:
+        """
+        get the indices of all the objects in an indexed source that the rule might accept, or None if the rule
+        cannot narrow them down.
+        """
+        return None
+
     def __call__(self, *sources: Source) -> Iterable[Swimporting]:
         """Get swimportings for all valid objects in sources"""
-        if len(sources) > 1:
-            src = chain.from_iterable(sources)
-        elif sources:
-            src = sources[0]
-        else:
-            return
+        src = chain.from_iterable(indexed_candidates(source, self) for source in sources)
 
         for o in src:
             s = self.do(o)
@@ -190,6 +467,9 @@ class CategorizedBehaviour(Behaviour):
         return super().default_is_valid(rule, obj) \
                and isinstance(obj, self.object_category)
 
+    def candidates(self, index: NameIndex) -> Optional[Set[int]]:
+        return index.category(self.object_category)
+
     def __rrshift__(self, other):
         if (other is not ...) and (not isinstance(other, Trigger)):
             other = self.object_category.Trigger(other)
@@ -213,6 +493,7 @@ class TriggerBehaviourSwimRule(SwimRule, Replaceable):
         self.trigger = trigger
         self.behaviour = behaviour
         self.name = name
+        self._trigger_func = None
         t_category = getattr(self.trigger, 'object_category', None)
         b_category = getattr(self.behaviour, 'object_category', None)
         if t_category is not b_category \
@@ -230,12 +511,19 @@ class TriggerBehaviourSwimRule(SwimRule, Replaceable):
             return f'rule: {self.name}'
         return super().__str__()
 
+    def candidates(self, index: NameIndex) -> Optional[Set[int]]:
+        if self.trigger is ...:
+            return self.behaviour.candidates(index)
+        return self.trigger.candidates(index)
+
     def do(self, obj) -> Optional[Swimporting]:
         """Get a swimporting for a cppobject, or None if the object does not pass the trigger"""
         if self.trigger is ...:
             valid = self.behaviour.default_is_valid(self, obj)
         else:
-            valid = self.trigger.is_valid(self, obj)
+            if self._trigger_func is None:
+                self._trigger_func = self.trigger.compile()
+            valid = self._trigger_func(self, obj)
 
         if valid:
             return self.behaviour.wrap(self, obj)
@@ -316,11 +604,34 @@ class SwimportAggregate(ABC):
         apply multiple swimportings
         :return: a SwimportResult object
         """
+        profiler = getattr(self, 'profiler', None)
+        if profiler is not None:
+            return self._apply_portings_profiled(portings, profiler)
         ret = SwimportingsResult()
         for p in portings:
             ret += self.apply_porting(p)
         return ret
 
+    def _apply_portings_profiled(self, portings: Iterable[Swimporting], profiler) -> SwimportingsResult:
+        """
+        apply multiple swimportings, recording the time spent finding the swimportings of rules as well
+        """
+        ret = SwimportingsResult()
+        portings = iter(portings)
+        rule_name = None
+        while True:
+            start = perf_counter()
+            p = next(portings, None)
+            end = perf_counter()
+            rule = getattr(p, 'rule', None)
+            if rule is not None:
+                rule_name = str(rule)
+            if rule_name is not None:
+                profiler.add('rule match', rule_name, start, end)
+            if p is None:
+                return ret
+            ret += self.apply_porting(p)
+
     def __call__(self, arg) -> SwimportingsResult:
         """apply either a single or multiple swimportings"""
         if not isinstance(arg, Iterable):
@@ -13,6 +13,48 @@ def np_main(numpy_dir, *, swim):
     swim.add_init('import_array();')
 
 
+@syspools.add(IdiomaticPool)
+def np_vector(swim):
+    # a function to create an ndarray that owns a heap-allocated vector, and views its buffer without copying
+    name = swim.create_unique_id('ndarray_from_vector')
+    swim.add_raw(f"""
+    %fragment("{name}", "header") %{{
+    #ifndef NPY_NO_DEPRECATED_API
+    #define NPY_NO_DEPRECATED_API NPY_1_7_API_VERSION
+    #endif
+    #include <numpy/arrayobject.h>
+    #include <vector>
+    template<typename T>
+    PyObject* {name}(std::vector<T>* owned, int typenum){{
+        npy_intp dims[1] = {{(npy_intp)owned->size()}};
+        if (owned->empty()){{
+            delete owned;
+            return PyArray_SimpleNew(1, dims, typenum);
+        }}
+        PyObject* capsule = PyCapsule_New(owned, nullptr, [](PyObject* c){{
+            delete (std::vector<T>*)PyCapsule_GetPointer(c, nullptr);
+        }});
+        if (!capsule){{
+            delete owned;
+            return nullptr;
+        }}
+        PyObject* ret = PyArray_SimpleNewFromData(1, dims, typenum, (void*)owned->data());
+        if (!ret){{
+            Py_DECREF(capsule);
+            return nullptr;
+        }}
+        // the array steals the reference to the capsule, even on failure
+        if (PyArray_SetBaseObject((PyArrayObject*)ret, capsule) < 0){{
+            Py_DECREF(ret);
+            return nullptr;
+        }}
+        return ret;
+    }}
+    %}}
+    """)
+    swim.add_init('import_array();')
+
+
 @syspools.add(IdiomaticPool)
 def np_char(*, swim):
     # the NPY_CHAR value is officially deprecated, but currently, numpy.i only makes use of the
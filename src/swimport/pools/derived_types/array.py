@@ -25,6 +25,38 @@ def array(inner_type: str, size: int, *, cpp_name='std::array<?,??>', swim, **kw
     if port.to_cpp:
         body = [f"""
                 ok = 1;
+                if (PyList_CheckExact(input) || PyTuple_CheckExact(input)){{
+                    if (PySequence_Fast_GET_SIZE(input) != {size})
+                        SWIM_RAISE_TYPE("expected {size} members in: ", input);
+                    // the items are borrowed, and the conversions might run python code that changes the list
+                    PyObject* item = nullptr;
+                    try{{
+                    """]
+        for i in range(size):
+            if i:
+                # the size is checked again, in case a conversion changed the list
+                body.append(f"""
+                    if (PySequence_Fast_GET_SIZE(input) != {size})
+                        SWIM_RAISE_TYPE("expected {size} members in: ", input);""")
+            body.append(f"""
+                    item = PySequence_Fast_GET_ITEM(input, {i});
+                    Py_INCREF(item);
+                    {inner_type} member_{i} = {inner_porting.to_cpp_func.function_name}(item, ok, PACKED_UD(0));
+                    Py_DECREF(item);
+                    item = nullptr;
+                    if (!ok || PyErr_Occurred() != nullptr)
+                        SWIM_RAISE_UNSPECIFIED;
+                    """)
+        body.append(f"""
+                    return {{ {', '.join(f'member_{i}' for i in range(size))} }};
+                    }}
+                    catch(...){{
+                        Py_XDECREF(item);
+                        throw;
+                    }}
+                }}
+                """)
+        body.append(f"""
                 auto obj_len = PyObject_Length(input);
                 if (obj_len == -1){{
                     if (PyErr_Occurred() != nullptr)
@@ -38,7 +70,7 @@ def array(inner_type: str, size: int, *, cpp_name='std::array<?,??>', swim, **kw
                 if (!iter){{
                     SWIM_RAISE_TYPE("expected an iterable, not ", input);
                 }}
-                auto temp = PyIter_Next(iter);"""]
+                auto temp = PyIter_Next(iter);""")
         for i in range(size):
             body.append(f"""
             if (!temp)
@@ -70,4 +102,12 @@ def array(inner_type: str, size: int, *, cpp_name='std::array<?,??>', swim, **kw
         return {{ {members} }};
         """)
         port.to_cpp = port.to_cpp.replace(body='\n'.join(body))
+    if port.to_cpp_check:
+        port.to_cpp_check = port.to_cpp_check.replace(body=f"""
+            auto obj_len = PyObject_Length(input);
+            if (obj_len == -1)
+                PyErr_Clear();
+            else if (obj_len != {size})
+                return 0;
+            """ + port.to_cpp_check.body)
     yield port
@@ -3,14 +3,14 @@ from typing import List
 from itertools import chain
 from warnings import warn
 
-from swimport.pools.pools import pools
+from swimport.pools.pools import pools, syspools
 from swimport.pools.types import TypeSwimportingPool
 from swimport.typeswim import TypeSwimporting, FunctionBody
 
 
 @pools.add(TypeSwimportingPool, name='callable')
-def callable_(ret_type, *arg_types, cpp_name='std::function<?>', surrogate_type_name='py_callable<?>',
-              on_ret_post='raise', swim,
+def callable_(ret_type, *arg_types, cpp_name='std::function<?>', surrogate_type_name=...,
+              on_ret_post='raise', thread_safe=False, batch_size=None, swim,
               **type_args):
     """
     typemaps for using std::function for a set of types
@@ -18,8 +18,15 @@ def callable_(ret_type, *arg_types, cpp_name='std::function<?>', surrogate_type_
     :param arg_types: the types of the arguments
     :param cpp_name: the name of the cpp type to map for. ? will be replaced with the type names
     :param surrogate_type_name: the type name of the surrogate object to adapt between a python callable and
-        a c++ object.
+        a c++ object. Default is py_callable<?>, or py_threadsafe_callable<?> or py_batched_callable<?> if
+        thread_safe or batch_size are set.
     :param on_ret_post: What to do if the return type has a to_cpp_post map, 'raise', 'warn', or None.
+    :param thread_safe: whether the function can be called from any thread, with or without the GIL (the GIL is
+        acquired for each call, and the function keeps a reference to the python callable).
+    :param batch_size: if set, the calls are queued and delivered to python in batches of this size, acquiring the
+        GIL once per batch (the remaining calls are delivered when the function is destroyed). Only for functions that
+        return void, implies thread_safe. Since the calls are deferred, their arguments are stored by value (arguments
+        passed by reference are copied), and pointer arguments are not allowed.
     :param type_args: keyword parameters forwarded to the TypeSwimporting created
     """
     arg_portings: List[TypeSwimporting] = []
@@ -43,18 +50,36 @@ def callable_(ret_type, *arg_types, cpp_name='std::function<?>', surrogate_type_
         ret_type = 'void'
         ret_porting = None
 
+    if surrogate_type_name is ...:
+        if batch_size:
+            surrogate_type_name = 'py_batched_callable<?>'
+        elif thread_safe:
+            surrogate_type_name = 'py_threadsafe_callable<?>'
+        else:
+            surrogate_type_name = 'py_callable<?>'
+    if batch_size and ret_porting:
+        raise ValueError('only callables that return void can be batched')
+
     arg_types = list(arg_types)
     for i, t in enumerate(arg_types):
         t, sp = swim.get_porting(t)
         if not sp.to_py_func:
             raise ValueError('the type ' + t + ' does not have a to_py function')
+        if batch_size and ('*' in t or '[' in t):
+            raise ValueError('the arguments of batched callables are stored until they are delivered, so they cannot'
+                             ' be pointers, not ' + t)
         arg_portings.append(sp)
         arg_types[i] = t
 
     cpp_name = cpp_name.replace('?', ret_type + '(' + ', '.join(arg_types) + ')')
-    surrogate_type_name = surrogate_type_name.replace('?', ', '.join(chain((ret_type,), arg_types)))
+    if batch_size:
+        surrogate_type_name = surrogate_type_name.replace('?', ', '.join(arg_types))
+    else:
+        surrogate_type_name = surrogate_type_name.replace('?', ', '.join(chain((ret_type,), arg_types)))
 
     swim(pools.include("<tuple>"))
+    if thread_safe or batch_size:
+        swim(syspools.init_threads)
 
     to_cpp_body = [
         f"""
@@ -76,7 +101,7 @@ def callable_(ret_type, *arg_types, cpp_name='std::function<?>', surrogate_type_
         )
     to_cpp_body.append(
         f"""
-        {surrogate_type_name} surrogate(to_cpp_conv, to_py_conv_pack, input);
+        {surrogate_type_name} surrogate(to_cpp_conv, to_py_conv_pack, input{f', {batch_size}' if batch_size else ''});
         return ({cpp_name})std::bind( std::mem_fn(&{surrogate_type_name}::call) , {", ".join(
             chain(("surrogate",), ('std::placeholders::_' + str(i) for i, _ in enumerate(arg_types, 1))))});
         """
@@ -1,11 +1,160 @@
-from swimport.pools.pools import pools
-from swimport.pools.types import TypeSwimportingPool
+from swimport.pools.pools import pools, syspools
+from swimport.pools.types import TypeSwimportingPool, primitive_to_py
 from swimport.typeswim import TypeSwimporting, FunctionBody
 
 
+# the numpy type numbers of the inner types that can be output as numpy arrays
+numpy_types = {
+    'signed char': 'NPY_BYTE', 'unsigned char': 'NPY_UBYTE',
+    'short': 'NPY_SHORT', 'unsigned short': 'NPY_USHORT',
+    'int': 'NPY_INT', 'unsigned int': 'NPY_UINT',
+    'long': 'NPY_LONG', 'unsigned long': 'NPY_ULONG',
+    'long long': 'NPY_LONGLONG', 'unsigned long long': 'NPY_ULONGLONG',
+    'float': 'NPY_FLOAT', 'double': 'NPY_DOUBLE', 'long double': 'NPY_LONGDOUBLE',
+    'size_t': 'NPY_UINTP',
+    'int8_t': 'NPY_INT8', 'uint8_t': 'NPY_UINT8', 'int16_t': 'NPY_INT16', 'uint16_t': 'NPY_UINT16',
+    'int32_t': 'NPY_INT32', 'uint32_t': 'NPY_UINT32', 'int64_t': 'NPY_INT64', 'uint64_t': 'NPY_UINT64',
+}
+
+# the buffer format characters (see the struct module) of the inner types that can be copied from buffers, any
+# character of the same kind is accepted, as long as the item size matches
+buffer_formats = {
+    **dict.fromkeys(('signed char', 'short', 'int', 'long', 'long long',
+                     'int8_t', 'int16_t', 'int32_t', 'int64_t'), 'bhilqn'),
+    **dict.fromkeys(('unsigned char', 'unsigned short', 'unsigned int', 'unsigned long', 'unsigned long long',
+                     'size_t', 'uint8_t', 'uint16_t', 'uint32_t', 'uint64_t'), 'BHILQN'),
+    **dict.fromkeys(('float', 'double', 'long double'), 'fdg'),
+}
+
+
+def inline_to_py(inner_type, inner_porting):
+    """
+    :return: the name of a python c-api function that converts the inner type to python, if the inner type is a
+        primitive that is converted by the primitive pool (and so its to_py function can be inlined), or None otherwise
+    """
+    func = primitive_to_py.get(inner_type)
+    if not func or inner_porting.to_py_func.user_data:
+        return None
+    body = inner_porting.to_py_func.body
+    if not isinstance(body, str) or body.strip() != f'return {func}(input);':
+        return None
+    return func
+
+
+def inline_sequence_to_py(new_func, set_item, inline_func):
+    """
+    :return: the body of a to_py function that converts a c++ container to a new list or tuple, calling inline_func
+        directly on each element. Conversions of primitives only fail on memory errors, so errors are checked once
+        after the loop.
+    """
+    return f"""
+            ok = 1;
+            Py_ssize_t size = input.size();
+            auto ret = {new_func}(size);
+            if (!ret){{
+                ok = 0;
+                return nullptr;
+            }}
+            Py_ssize_t i = 0;
+            for (auto const & e: input){{
+                PyObject* to_add = {inline_func}(e);
+                if (!to_add)
+                    break;
+                {set_item}(ret, i, to_add);
+                i++;
+            }}
+            if (i != size){{
+                Py_DECREF(ret);
+                ok = 0;
+                return nullptr;
+            }}
+            return ret;
+            """
+
+
+def element_ref(move: bool) -> str:
+    """
+    :return: the declaration of the loop variable of a to_py function that iterates over its input's elements, by
+        non-const reference if the elements are moved from, or by const reference otherwise
+    """
+    return 'auto &' if move else 'auto const &'
+
+
+def element_to_py(func: FunctionBody, move: bool) -> str:
+    """
+    :return: the name of the function to convert an element with, the element type's rvalue function (see
+        FunctionBody's rvalue_body) if the elements are moved from and the type has one, or its to_py function otherwise
+    """
+    if move and func.rvalue_function_name:
+        return func.rvalue_function_name
+    return func.function_name
+
+
+def rvalue_variant(make_body, *inner_funcs: FunctionBody):
+    """
+    :param make_body: a function that gets whether the elements of the input are moved from, and returns the body of a
+        to_py function. The body should declare its loop variables with element_ref and convert the elements with
+        element_to_py.
+    :return: the body of the to_py function that moves the elements out of its input, or None if none of the inner
+        types can be moved from
+    """
+    if not any(f and f.rvalue_function_name for f in inner_funcs):
+        return None
+    return make_body(True)
+
+
+def sample_check(element_check):
+    """
+    :param element_check: c++ statements that check the first element of the input (a borrowed PyObject* called
+        "first"), and store the result in a bool called "ret"
+    :return: the body of a to_cpp_check function that checks that its input is iterable, and that its first element
+        passes element_check (instead of converting all the elements). Empty iterables pass, and so do iterators, whose
+        first element cannot be checked without consuming it.
+    """
+    return f"""
+            bool ret = true;
+            PyObject* first = nullptr;
+            if (PyList_CheckExact(input) || PyTuple_CheckExact(input)){{
+                if (PySequence_Fast_GET_SIZE(input) == 0)
+                    return 1;
+                first = PySequence_Fast_GET_ITEM(input, 0);
+                Py_INCREF(first);
+            }}
+            else{{
+                auto iter = PyObject_GetIter(input);
+                if (!iter){{
+                    PyErr_Clear();
+                    return 0;
+                }}
+                if (iter == input){{
+                    Py_DECREF(iter);
+                    return 1;
+                }}
+                first = PyIter_Next(iter);
+                Py_DECREF(iter);
+                if (!first){{
+                    if (PyErr_Occurred() != nullptr){{
+                        PyErr_Clear();
+                        return 0;
+                    }}
+                    return 1;
+                }}
+            }}
+            {{
+                {element_check}
+            }}
+            Py_DECREF(first);
+            if (PyErr_Occurred() != nullptr){{
+                PyErr_Clear();
+                return 0;
+            }}
+            return ret;
+            """
+
+
 @pools.add(TypeSwimportingPool, name='iter')
-def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=..., reserve=..., output=iter, swim,
-          **type_args):
+def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=..., reserve=..., from_buffer=...,
+          output=iter, swim, **type_args):
     """
     typemaps for iterable type
     :param inner_type: the type to wrap in iterable input
@@ -13,10 +162,15 @@ def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=...,
     :param input_: whether to include input typemaps for the type. ... is to only include if available.
     :param insert_func: the name of the function to insert values into the cpp type. Default is to guess based on
         cpp_name. Only used if input is true.
-    :param reserve: whether to call reserve on the C++ structure using an input's __length_hint__. Default is
-        to only reserve for std::vector. Only used if input is true.
+    :param reserve: whether to call reserve on the C++ structure using an input's length (or __length_hint__).
+        Default is to only reserve for std::vector and std::unordered_set. Only used if input is true.
+    :param from_buffer: whether to copy inputs that support the buffer protocol (like array.array, bytes, or numpy
+        arrays) with a matching format in one go, instead of converting each element. Default is to do so if the
+        inner type is arithmetic (see buffer_formats). Only used if input is true.
     :param output: whether to include output typemaps for the type. False, for nothing.
-        Default is to use an iterable adapter.
+        Default is to use an iterable adapter. Can also be list, tuple, set, frozenset, or 'numpy' to output a
+        numpy array that takes ownership of the vector's buffer (only for std::vector of arithmetic types, see
+        numpy_types).
     :param type_args: keyword parameters forwarded to the TypeSwimporting created
     """
     type_args.setdefault('in_iterable_types', ())
@@ -26,6 +180,9 @@ def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=...,
     inner_type, inner_porting = swim.get_porting(inner_type)
 
     cpp_name = cpp_name.replace('?', inner_type)
+    # the elements of sequences (as opposed to sets and maps) can be moved from
+    sequence = any((cpp_name.startswith(prefix) or cpp_name.startswith('std::' + prefix))
+                   for prefix in ('vector<', 'deque<', 'list<', 'forward_list<', 'array<'))
 
     if not inner_porting.to_cpp_func:
         if input_ is True:
@@ -60,8 +217,37 @@ def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=...,
                                             }});
                                            """,
                              fragments=inner_porting.to_py_func.frags)
+    elif output == 'numpy':
+        npy_type = numpy_types.get(inner_type)
+        if not npy_type:
+            raise ValueError(f'numpy output is not supported for inner type {inner_type}')
+        if not any(cpp_name.startswith(pref) for pref in ('std::vector<', 'vector<')):
+            raise ValueError(f'numpy output is only supported for std::vector, not {cpp_name}')
+        swim(syspools.np_vector)
+        ndarray_from_vector = swim.create_unique_id('ndarray_from_vector')
+        # values that can be moved from are moved to the heap, other values are copied there (with a single copy of the
+        # buffer), either way, the array takes ownership of the heap vector and views its buffer
+        to_py = FunctionBody(f"""
+            auto ret = {ndarray_from_vector}(new {cpp_name}(input), {npy_type});
+            ok = (ret != nullptr);
+            return ret;
+            """,
+                             rvalue_body=f"""
+            auto ret = {ndarray_from_vector}(new {cpp_name}(std::move(input)), {npy_type});
+            ok = (ret != nullptr);
+            return ret;
+            """,
+                             fragments=[ndarray_from_vector])
+    elif output in (list, tuple) and inline_to_py(inner_type, inner_porting):
+        if output is list:
+            to_py = FunctionBody(inline_sequence_to_py('PyList_New', 'PyList_SET_ITEM',
+                                                       inline_to_py(inner_type, inner_porting)))
+        else:
+            to_py = FunctionBody(inline_sequence_to_py('PyTuple_New', 'PyTuple_SET_ITEM',
+                                                       inline_to_py(inner_type, inner_porting)))
     elif output is list:
-        to_py = FunctionBody.combine(inner_porting.to_py_func)(f"""
+        def body(move):
+            return f"""
             ok = 1;
             auto ret = PyList_New(input.size());
             if (!ret){{
@@ -69,8 +255,8 @@ def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=...,
                 return nullptr; 
             }}
             Py_ssize_t  i = 0;
-            for (auto e: input){{
-                PyObject* to_add = {inner_porting.to_py_func.function_name}(e, ok, PACKED_UD(0));
+            for ({element_ref(move)} e: input){{
+                PyObject* to_add = {element_to_py(inner_porting.to_py_func, move)}(e, ok, PACKED_UD(0));
                 if (!ok || PyErr_Occurred()){{
                     Py_CLEAR(ret);
                     return nullptr;
@@ -83,9 +269,12 @@ def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=...,
                 i++;
             }}
             return ret;
-        """)
+        """
+        to_py = FunctionBody.combine(inner_porting.to_py_func)(
+            body(False), rvalue_body=rvalue_variant(body, inner_porting.to_py_func) if sequence else None)
     elif output is tuple:
-        to_py = FunctionBody.combine(inner_porting.to_py_func)(f"""
+        def body(move):
+            return f"""
                 ok = 1;
                 auto ret = PyTuple_New(input.size());
                 if (!ret){{
@@ -93,8 +282,8 @@ def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=...,
                     return nullptr; 
                 }}
                 Py_ssize_t  i = 0;
-                for (auto e: input){{
-                    PyObject* to_add = {inner_porting.to_py_func.function_name}(e, ok, PACKED_UD(0));
+                for ({element_ref(move)} e: input){{
+                    PyObject* to_add = {element_to_py(inner_porting.to_py_func, move)}(e, ok, PACKED_UD(0));
                     if (!ok || PyErr_Occurred()){{
                         Py_CLEAR(ret);
                         return nullptr;
@@ -103,7 +292,9 @@ def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=...,
                     i++;
                 }}
                 return ret;
-                """)
+                """
+        to_py = FunctionBody.combine(inner_porting.to_py_func)(
+            body(False), rvalue_body=rvalue_variant(body, inner_porting.to_py_func) if sequence else None)
     elif output is set:
         to_py = FunctionBody.combine(inner_porting.to_py_func)(f"""
                 ok = 1;
@@ -112,7 +303,7 @@ def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=...,
                     ok = 0;
                     return nullptr; 
                 }}
-                for (auto e: input){{
+                for (auto const & e: input){{
                     auto to_add = {inner_porting.to_py_func.function_name}(e, ok, PACKED_UD(0));
                     if (!ok || PyErr_Occurred()){{
                         SWIM_THROW_UNSPECIFIED;
@@ -132,7 +323,7 @@ def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=...,
                     ok = 0;
                     return nullptr; 
                 }}
-                for (auto e: input){{
+                for (auto const & e: input){{
                     auto to_add = {inner_porting.to_py_func.function_name}(e, ok, PACKED_UD(0));
                     if (!ok || PyErr_Occurred()){{
                         SWIM_THROW_UNSPECIFIED;
@@ -162,12 +353,83 @@ def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=...,
 
         if reserve is ...:
             reserve = any(
-                cpp_name.startswith(pref) for pref in ('std::vector<', 'vector<')
+                cpp_name.startswith(pref) for pref in ('std::vector<', 'vector<',
+                                                       'std::unordered_set<', 'unordered_set<')
             )
 
+        if from_buffer is ...:
+            from_buffer = inner_type in buffer_formats and insert_func in ('push_back', 'insert') \
+                          and not inner_porting.to_cpp_post_func
+        if from_buffer:
+            formats = buffer_formats.get(inner_type)
+            if not formats:
+                raise ValueError(f'cannot copy buffers of inner type {inner_type}')
+            if insert_func == 'push_back':
+                insert_range = 'assign'
+            elif insert_func == 'insert':
+                insert_range = 'insert'
+            else:
+                raise ValueError(f'cannot copy buffers with insert function {insert_func}')
+            buffer_body = f"""
+            if (PyObject_CheckBuffer(input)){{
+                Py_buffer view;
+                if (PyObject_GetBuffer(input, &view, PyBUF_FORMAT | PyBUF_C_CONTIGUOUS) == 0){{
+                    const char* format = view.format ? view.format : "B";
+                    if (*format == '@' || *format == '=')
+                        format++;
+                    if (view.ndim == 1 && view.itemsize == sizeof({inner_type})
+                        && format[0] && !format[1] && strchr("{formats}", format[0])){{
+                        auto first = ({inner_type} const *)view.buf;
+                        {cpp_name} ret;
+                        ret.{insert_range}(first, first + view.len / view.itemsize);
+                        PyBuffer_Release(&view);
+                        return ret;
+                    }}
+                    PyBuffer_Release(&view);
+                }}
+                else
+                    PyErr_Clear();
+            }}
+            """
+        else:
+            buffer_body = ""
+
         to_cpp = FunctionBody.combine(inner_porting.to_cpp_func)(
             f"""
             ok = 1;
+            """
+            + buffer_body
+            + f"""
+            if (PyList_CheckExact(input) || PyTuple_CheckExact(input)){{
+                {cpp_name} ret;
+                """
+            + ("""
+                ret.reserve(PySequence_Fast_GET_SIZE(input));
+                """ if reserve else "")
+            + f"""
+                // the size is checked on every iteration, in case a conversion changed the list
+                for (Py_ssize_t i = 0; i < PySequence_Fast_GET_SIZE(input); i++){{
+                    // the item is borrowed, and the conversion might run python code that changes the list
+                    PyObject* current = PySequence_Fast_GET_ITEM(input, i);
+                    Py_INCREF(current);
+                    try{{
+                        {inner_type} cpp_curr = {inner_porting.to_cpp_func.function_name}(current, ok, PACKED_UD(0));
+                        if (ok && !PyErr_Occurred())
+                            ret.{insert_func}(std::move(cpp_curr));
+                    }}
+                    catch(...){{
+                        Py_DECREF(current);
+                        throw;
+                    }}
+                    Py_DECREF(current);
+                    if (!ok || PyErr_Occurred()){{
+                        PyErr_SetString(PyExc_TypeError, "could not convert object in iterable");
+                        SWIM_RAISE_UNSPECIFIED;
+                    }}
+                }}
+                return ret;
+            }}
+
             auto iter = PyObject_GetIter(input);
             if (!iter){{
                 SWIM_RAISE_TYPE("expected an iterable, not ", input);
@@ -180,6 +442,7 @@ def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=...,
                 if (size >= 0)
                     ret.reserve(size);
                 else if (size != -2){
+                    Py_DECREF(iter);
                     SWIM_RAISE_EXISTING;
                 }
             """ if reserve else "")
@@ -193,13 +456,17 @@ def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=...,
                     PyErr_SetString(PyExc_TypeError, "could not convert object in iterable"); 
                     SWIM_RAISE_UNSPECIFIED;
                 }}
-                ret.{insert_func}(cpp_curr);
+                ret.{insert_func}(std::move(cpp_curr));
             }}
             Py_DECREF(iter);
             return ret;
             """)
 
-        to_cpp_check = """
+        if inner_porting.to_cpp_check_func:
+            to_cpp_check = FunctionBody.combine(inner_porting.to_cpp_check_func)(sample_check(
+                f'ret = {inner_porting.to_cpp_check_func.function_name}(first, PACKED_UD(0));'))
+        else:
+            to_cpp_check = """
                     auto iter = PyObject_GetIter(input);
                     auto ret = (iter != nullptr);
                     Py_XDECREF(iter);
@@ -209,7 +476,7 @@ def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=...,
 
         if inner_porting.to_cpp_post_func:
             to_cpp_post = FunctionBody.combine(inner_porting.to_cpp_post_func)(f"""
-            for (auto e: input){{
+            for (auto const & e: input){{
                 {inner_porting.to_cpp_post_func.function_name}(e, ok, PACKED_UD(0));
                 if (!ok || PyErr_Occurred())
                     return;
@@ -223,7 +490,8 @@ def iter_(inner_type, *, cpp_name='std::vector<?>', input_=..., insert_func=...,
         to_cpp_check = None
         to_cpp_post = None
 
-    return TypeSwimporting(cpp_name, 'Iterable[' + inner_porting.py_name + ']',
+    return TypeSwimporting(cpp_name,
+                           'numpy.ndarray' if output == 'numpy' else ('Iterable[' + inner_porting.py_name + ']'),
                            to_py=to_py,
                            to_cpp=to_cpp,
                            to_cpp_check=to_cpp_check,
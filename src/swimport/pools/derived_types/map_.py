@@ -1,16 +1,18 @@
 from swimport.pools.pools import pools
 from swimport.pools.types import TypeSwimportingPool
-from swimport.pools.derived_types.iter_ import iter_
+from swimport.pools.derived_types.iter_ import iter_, element_ref, element_to_py, rvalue_variant, sample_check
 from swimport.typeswim import TypeSwimporting, FunctionBody
 
 
 @pools.add(TypeSwimportingPool, name='map')
-def map_(key_type, value_type, *, cpp_name='std::unordered_map<?>', output=dict, swim, **type_args):
+def map_(key_type, value_type, *, cpp_name='std::unordered_map<?>', output=dict, reserve=..., swim, **type_args):
     """
     typemaps for using std::tuple for a set of types
     :param key_type: the key type to handle
     :param value_type: the value type to handle
     :param cpp_name: the name of the cpp type to map for. ? will be replaced with the type names
+    :param reserve: whether to call reserve on the C++ structure using the input's length. Default is to only reserve
+        for std::unordered_map.
     :param type_args: keyword parameters forwarded to the TypeSwimporting created
     """
 
@@ -20,12 +22,69 @@ def map_(key_type, value_type, *, cpp_name='std::unordered_map<?>', output=dict,
     cpp_name = cpp_name.replace('?', key_type + ', ' + value_type)
 
     if key_porting.to_cpp_func and value_porting.to_cpp_func:
+        if reserve is ...:
+            reserve = any(
+                cpp_name.startswith(pref) for pref in ('std::unordered_map<', 'unordered_map<')
+            )
+
+        def reserve_for(size, release=()):
+            """
+            :param size: the expression of the size hint
+            :param release: the references to release if the hint raised an error
+            """
+            if not reserve:
+                return ''
+            decrefs = ''.join(f'Py_DECREF({r}); ' for r in release)
+            return f"""
+            {{
+                auto size = {size};
+                if (size >= 0)
+                    ret.reserve(size);
+                else if (size != -2){{
+                    {decrefs}SWIM_RAISE_EXISTING;
+                }}
+            }}
+            """
+
         to_cpp = FunctionBody.combine(key_porting.to_cpp_func, value_porting.to_cpp_func)(
             f"""
         void* kud = PACKED_UD(0);
         void* vud = PACKED_UD(1);
         {cpp_name} ret;
 
+        if (PyDict_CheckExact(input)){{
+            {reserve_for('PyDict_GET_SIZE(input)')}
+            Py_ssize_t pos = 0;
+            PyObject* key;
+            PyObject* value;
+            auto dict_size = PyDict_GET_SIZE(input);
+            while (PyDict_Next(input, &pos, &key, &value)){{
+                // the key and value are borrowed, and the conversions might run python code that changes the dict
+                Py_INCREF(key);
+                Py_INCREF(value);
+                try{{
+                    auto cpp_k = {key_porting.to_cpp_func.function_name}(key, ok, kud);
+                    if (ok && !PyErr_Occurred()){{
+                        auto cpp_v = {value_porting.to_cpp_func.function_name}(value, ok, vud);
+                        if (ok && !PyErr_Occurred())
+                            ret.emplace(std::move(cpp_k), std::move(cpp_v));
+                    }}
+                }}
+                catch(...){{
+                    Py_DECREF(key);
+                    Py_DECREF(value);
+                    throw;
+                }}
+                Py_DECREF(key);
+                Py_DECREF(value);
+                if (!ok || PyErr_Occurred()) SWIM_RAISE_UNSPECIFIED;
+                if (PyDict_GET_SIZE(input) != dict_size){{
+                    SWIM_RAISE(PyExc_RuntimeError, "dictionary changed size during conversion");
+                }}
+            }}
+            return ret;
+        }}
+
         auto keys = PyObject_CallMethod(input, "keys", nullptr);
         if (!keys){{
             PyErr_Clear();
@@ -33,6 +92,7 @@ def map_(key_type, value_type, *, cpp_name='std::unordered_map<?>', output=dict,
             if (!iter){{
                 SWIM_RAISE_TYPE("expected an iterable, not ", input);
             }}
+            {reserve_for('PyObject_LengthHint(input, -2)', ('iter',))}
             PyObject* py_current;
             auto key_index = PyLong_FromLong(0);
             auto value_index = PyLong_FromLong(1);
@@ -53,6 +113,7 @@ def map_(key_type, value_type, *, cpp_name='std::unordered_map<?>', output=dict,
         if (!iter){{
             SWIM_RAISE_TYPE("expected an iterable, not ", input);;
         }}
+        {reserve_for('PyObject_LengthHint(keys, -2)', ('iter', 'keys'))}
         PyObject* key;
         while (key = PyIter_Next(iter)){{
             auto value = PyObject_GetItem(input, key);
@@ -67,26 +128,48 @@ def map_(key_type, value_type, *, cpp_name='std::unordered_map<?>', output=dict,
         return ret;
         """)
 
-        to_cpp_check = """
-        auto keys = PyObject_CallMethod(input, "keys", nullptr);
-        PyObject* iter;
-        if (keys){
-            iter = PyObject_GetIter(keys);
-        }
-        else{
-            iter = PyObject_GetIter(input);
-        }
-        bool ret = iter == nullptr;
-        Py_XDECREF(keys);
-        Py_XDECREF(iter);
-        return ret;
-        """
+        key_check = key_porting.to_cpp_check_func
+        value_check = value_porting.to_cpp_check_func
+        entry_checks = []
+        if key_check:
+            entry_checks.append(f'{key_check.function_name}(key, PACKED_UD(0))')
+        if value_check:
+            entry_checks.append(f'{value_check.function_name}(value, PACKED_UD(1))')
+        entry_check = ' && '.join(entry_checks) or 'true'
+        # only the first entry is checked
+        to_cpp_check = FunctionBody.combine(key_check, value_check)(f"""
+        if (PyDict_CheckExact(input)){{
+            Py_ssize_t pos = 0;
+            PyObject* key;
+            PyObject* value;
+            if (!PyDict_Next(input, &pos, &key, &value))
+                return 1;
+            Py_INCREF(key);
+            Py_INCREF(value);
+            bool ret = {entry_check};
+            PyErr_Clear();
+            Py_DECREF(key);
+            Py_DECREF(value);
+            return ret;
+        }}
+        if (PyObject_HasAttrString(input, "keys"))
+            return 1;
+        """ + sample_check(f"""
+                ret = PySequence_Check(first) && PySequence_Size(first) == 2;
+                if (ret){{
+                    PyObject* key = PySequence_GetItem(first, 0);
+                    PyObject* value = PySequence_GetItem(first, 1);
+                    ret = key && value && {entry_check};
+                    Py_XDECREF(key);
+                    Py_XDECREF(value);
+                }}
+                """))
         if key_porting.to_cpp_post_func or value_porting.to_cpp_post_func:
             to_cpp_post = FunctionBody.combine(key_porting.to_cpp_post_func, value_porting.to_cpp_post_func)(
                 f"""
             void* kud = PACKED_UD(0);
             void* vud = PACKED_UD(1);
-            for (auto pair: input){{
+            for (auto const & pair: input){{
             """
                 + (
                     f'{key_porting.to_cpp_post_func.function_name}(pair.first, ok, kud); if (!ok || PyErr_Occurred()) return;'
@@ -95,7 +178,7 @@ def map_(key_type, value_type, *, cpp_name='std::unordered_map<?>', output=dict,
                     f'{value_porting.to_cpp_post_func.function_name}(pair.second, ok, vud); if (!ok || PyErr_Occurred()) return;'
                     if value_porting.to_cpp_post_func else '')
                 + """
-            }}
+            }
             """)
         else:
             to_cpp_post = None
@@ -104,19 +187,27 @@ def map_(key_type, value_type, *, cpp_name='std::unordered_map<?>', output=dict,
 
     if key_porting.to_py_func and value_porting.to_py_func:
         if output is dict:
-            to_py = FunctionBody.combine(key_porting.to_py_func, value_porting.to_py_func)(f"""
+            def body(move):
+                return f"""
                 void* kud = PACKED_UD(0);
                 void* vud = PACKED_UD(1);
                 auto ret = PyDict_New();
-                for (auto pair: input){{
+                for ({element_ref(move)} pair: input){{
                     auto key = {key_porting.to_py_func.function_name}(pair.first, ok, kud);
                     if (!ok || PyErr_Occurred()) {{ return ret; }}
-                    auto value = {value_porting.to_py_func.function_name}(pair.second, ok, vud);
-                    if (!ok || PyErr_Occurred()) {{ return ret; }}
-                    if(PyDict_SetItem(ret ,key, value) != 0) {{ ok = false; return ret;}}
+                    auto value = {element_to_py(value_porting.to_py_func, move)}(pair.second, ok, vud);
+                    if (!ok || PyErr_Occurred()) {{ Py_XDECREF(key); return ret; }}
+                    // PyDict_SetItem does not steal the references
+                    int set = PyDict_SetItem(ret ,key, value);
+                    Py_DECREF(key);
+                    Py_DECREF(value);
+                    if(set != 0) {{ ok = false; return ret;}}
                 }}
                 return ret;
-            """)
+            """
+            # keys are const, only the values can be moved from
+            to_py = FunctionBody.combine(key_porting.to_py_func, value_porting.to_py_func)(
+                body(False), rvalue_body=rvalue_variant(body, value_porting.to_py_func))
         elif output in (iter, list, tuple, set, frozenset):
             yield pools.tuple.get(key_type, value_type, swim=swim, pair=True)
             pair_type = 'std::pair<' + key_type + ', ' + value_type + '>'
@@ -1,5 +1,6 @@
 from swimport.pools.pools import pools
 from swimport.pools.types import TypeSwimportingPool
+from swimport.pools.derived_types.iter_ import sample_check
 from swimport.typeswim import TypeSwimporting, FunctionBody
 
 
@@ -32,6 +33,18 @@ def input_iterable(inner_type, *, cpp_name='py_iterable<?>', converter_name='py_
     if inner_porting.to_cpp_post_func:
         frags.extend(inner_porting.to_cpp_post_func.frags)
 
+    if inner_porting.to_cpp_check_func:
+        to_cpp_check = FunctionBody.combine(inner_porting.to_cpp_check_func)(sample_check(
+            f'ret = {inner_porting.to_cpp_check_func.function_name}(first, PACKED_UD(0));'))
+    else:
+        to_cpp_check = """
+                        auto iter = PyObject_GetIter(input);
+                        auto ret = (iter != nullptr);
+                        Py_XDECREF(iter);
+                        PyErr_Clear();
+                        return ret;
+                        """
+
     return TypeSwimporting(cpp_name, py_name=f'Iterable[{inner_porting.py_name}]',
                            to_cpp=FunctionBody(f"""
                                                 auto iter = PyObject_GetIter(input);
@@ -66,11 +79,5 @@ def input_iterable(inner_type, *, cpp_name='py_iterable<?>', converter_name='py_
                                                userdata = (void * volatile)ud; 
                                                """,
                                                fragments=frags),
-                           to_cpp_check="""
-                                        auto iter = PyObject_GetIter(input);
-                                        auto ret = (iter != nullptr);
-                                        Py_XDECREF(iter);
-                                        PyErr_Clear();
-                                        return ret;
-                                        """,
+                           to_cpp_check=to_cpp_check,
                            **type_args)
@@ -39,7 +39,8 @@ def slice_no_step(start_type, end_type, cpp_name, *, swim, **type_args):
         ok = 1;
         if (!PySlice_Check(input))
             SWIM_RAISE_TYPE("expected a slice, not ", input);
-        PyObject* step = PyObject_GetAttrString(input, "step");
+        PyObject* step = ((PySliceObject*)input)->step;
+        Py_INCREF(step);
         if (step != Py_None)
         {{
             Py_DECREF(step);
@@ -48,7 +49,8 @@ def slice_no_step(start_type, end_type, cpp_name, *, swim, **type_args):
         Py_DECREF(step);
         {cpp_name} ret;
 
-        PyObject* start = PyObject_GetAttrString(input, "start");
+        PyObject* start = ((PySliceObject*)input)->start;
+        Py_INCREF(start);
         if (start == Py_None)
             ret.has_start = false;
         else{{
@@ -61,7 +63,8 @@ def slice_no_step(start_type, end_type, cpp_name, *, swim, **type_args):
         }}
         Py_DECREF(start);
 
-        PyObject* end = PyObject_GetAttrString(input, "stop");
+        PyObject* end = ((PySliceObject*)input)->stop;
+        Py_INCREF(end);
         if (end == Py_None)
             ret.has_end = false;
         else{{
@@ -84,7 +87,8 @@ def slice_no_step(start_type, end_type, cpp_name, *, swim, **type_args):
         body = f"""
         if (!PySlice_Check(input))
             return 0;
-        PyObject* step = PyObject_GetAttrString(input, "step");
+        PyObject* step = ((PySliceObject*)input)->step;
+        Py_INCREF(step);
         if (step != Py_None)
         {{
             Py_DECREF(step);
@@ -92,7 +96,8 @@ def slice_no_step(start_type, end_type, cpp_name, *, swim, **type_args):
         }}
         Py_DECREF(step);
 
-        PyObject* start = PyObject_GetAttrString(input, "start");
+        PyObject* start = ((PySliceObject*)input)->start;
+        Py_INCREF(start);
         if (start != Py_None)
         {{
             if (!{start_porting.to_cpp_check_func.function_name}(start, PACKED_UD(0))){{
@@ -102,7 +107,8 @@ def slice_no_step(start_type, end_type, cpp_name, *, swim, **type_args):
         }}
         Py_DECREF(start);
 
-        PyObject* end = PyObject_GetAttrString(input, "stop");
+        PyObject* end = ((PySliceObject*)input)->stop;
+        Py_INCREF(end);
         if (end != Py_None){{
             if (!{end_porting.to_cpp_check_func.function_name}(end, PACKED_UD(1))){{
                 Py_DECREF(end);
@@ -193,7 +199,8 @@ def slice_step(start_type, end_type, step_type, cpp_name, *, swim, **type_args):
             SWIM_RAISE_TYPE("expected a slice, not ", input);
         {cpp_name} ret;
 
-        PyObject* start = PyObject_GetAttrString(input, "start");
+        PyObject* start = ((PySliceObject*)input)->start;
+        Py_INCREF(start);
         if (start == Py_None)
             ret.has_start = false;
         else{{
@@ -206,7 +213,8 @@ def slice_step(start_type, end_type, step_type, cpp_name, *, swim, **type_args):
         }}
         Py_DECREF(start);
 
-        PyObject* end = PyObject_GetAttrString(input, "stop");
+        PyObject* end = ((PySliceObject*)input)->stop;
+        Py_INCREF(end);
         if (end == Py_None)
             ret.has_end = false;
         else{{
@@ -219,7 +227,8 @@ def slice_step(start_type, end_type, step_type, cpp_name, *, swim, **type_args):
         }}
         Py_DECREF(end);
 
-        PyObject* step = PyObject_GetAttrString(input, "step");
+        PyObject* step = ((PySliceObject*)input)->step;
+        Py_INCREF(step);
         if (step == Py_None)
             ret.has_step = false;
         else{{
@@ -244,7 +253,8 @@ def slice_step(start_type, end_type, step_type, cpp_name, *, swim, **type_args):
         if (!PySlice_Check(input))
             return 0;
 
-        PyObject* start = PyObject_GetAttrString(input, "start");
+        PyObject* start = ((PySliceObject*)input)->start;
+        Py_INCREF(start);
         if (start != Py_None)
         {{
             if (!{start_porting.to_cpp_check_func.function_name}(start, PACKED_UD(0))){{
@@ -254,7 +264,8 @@ def slice_step(start_type, end_type, step_type, cpp_name, *, swim, **type_args):
         }}
         Py_DECREF(start);
 
-        PyObject* end = PyObject_GetAttrString(input, "stop");
+        PyObject* end = ((PySliceObject*)input)->stop;
+        Py_INCREF(end);
         if (end != Py_None){{
             if (!{end_porting.to_cpp_check_func.function_name}(end, PACKED_UD(1))){{
                 Py_DECREF(end);
@@ -263,7 +274,8 @@ def slice_step(start_type, end_type, step_type, cpp_name, *, swim, **type_args):
         }}
         Py_DECREF(end);
 
-        PyObject* step = PyObject_GetAttrString(input, "step");
+        PyObject* step = ((PySliceObject*)input)->step;
+        Py_INCREF(step);
         if (step != Py_None){{
             if (!{step_porting.to_cpp_check_func.function_name}(step, PACKED_UD(2))){{
                 Py_DECREF(step);
@@ -2,6 +2,7 @@ from typing import List
 
 from swimport.pools.pools import pools, syspools
 from swimport.pools.types import TypeSwimportingPool
+from swimport.pools.derived_types.iter_ import element_to_py, rvalue_variant
 from swimport.typeswim import TypeSwimporting, FunctionBody
 
 
@@ -62,20 +63,22 @@ def tuple_(*types, cpp_name='std::tuple<?>', pair=..., swim, **type_args):
     to_cpp_post_funcs = [sp.to_cpp_post_func for sp in sub_portings]
 
     if all(to_py_funcs):
-        body = ['ok = 1;',
-                f'auto ret = PyTuple_New({len(types)}); if (!ret) {{ok = false; return ret;}};']
-        for i, func in enumerate(to_py_funcs):
-            body.append(f"""
+        def body(move):
+            ret = ['ok = 1;',
+                   f'auto ret = PyTuple_New({len(types)}); if (!ret) {{ok = false; return ret;}};']
+            for i, func in enumerate(to_py_funcs):
+                ret.append(f"""
             {{
-                PyObject* _pyval = {func.function_name}(std::get<{i}>(input), ok, PACKED_UD({i}));
+                PyObject* _pyval = {element_to_py(func, move)}(std::get<{i}>(input), ok, PACKED_UD({i}));
                 if (!ok || PyErr_Occurred()) {{ return ret; }}
                 PyTuple_SET_ITEM(ret, {i}, _pyval);
             }}""")
-        body.append("""
+            ret.append("""
             return ret;
             """)
+            return ret
 
-        to_py_func = FunctionBody.combine(*to_py_funcs)(body)
+        to_py_func = FunctionBody.combine(*to_py_funcs)(body(False), rvalue_body=rvalue_variant(body, *to_py_funcs))
     else:
         to_py_func = None
 
@@ -110,15 +113,14 @@ def tuple_(*types, cpp_name='std::tuple<?>', pair=..., swim, **type_args):
     else:
         to_cpp_func = None
 
-    if all(to_cpp_check_funcs):
-        body = []
-        for i, func in enumerate(to_cpp_check_funcs):
-            body.append(f'PyObject* _p{i} = nullptr;')
-        body.append(f'if (!PyArg_ParseTuple(input, "{"O" * len(types)}", ' + ', '.join(
-            '&_p' + str(i) for i in range(len(types))) + f')) return 0;')
+    if all(to_cpp_funcs):
+        # members without a to_cpp_check are only checked when converted
+        body = [f'if (!PyTuple_Check(input) || PyTuple_GET_SIZE(input) != {len(types)}) return 0;']
         for i, func in enumerate(to_cpp_check_funcs):
+            if not func:
+                continue
             body.append(
-                f'if(!{func.function_name}(_p{i}, PACKED_UD({i}))) {{return 0;}}')
+                f'if(!{func.function_name}(PyTuple_GET_ITEM(input, {i}), PACKED_UD({i}))) {{return 0;}}')
         body.append(f'return 1;')
 
         to_cpp_check_func = FunctionBody.combine(*to_cpp_check_funcs)(body)
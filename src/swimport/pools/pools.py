@@ -2,11 +2,13 @@ from typing import Dict, Union, Callable, Iterable
 
 from abc import ABC
 
+import os
 from textwrap import dedent
 from datetime import datetime
 from functools import partial
 
 import swimport
+import swimport.runtime
 from swimport.model import FileSource
 import swimport.swim as swim_module
 
@@ -28,15 +30,21 @@ class Pool(ABC):
             ret = True
         return ret
 
+    def _apply_profiled(self, swim, args, kwargs):
+        profiler = getattr(swim, 'profiler', None)
+        if profiler is None:
+            return self.apply(swim, args, kwargs)
+        return profiler.call(swim, 'pool', self.name, self.apply, swim, args, kwargs)
+
     def __call__(self, *args, **kwargs):
         if not (args or kwargs):
             return self
         if args and isinstance(args[-1], swim_module.Swim):
             *args, swim = args
-            return self.apply(swim, args, kwargs)
+            return self._apply_profiled(swim, args, kwargs)
         elif 'swim' in kwargs:
             swim = kwargs.pop('swim')
-            return self.apply(swim, args, kwargs)
+            return self._apply_profiled(swim, args, kwargs)
         else:
             args = self.args + args
             kwargs = {**self.kwargs, **kwargs}
@@ -166,26 +174,34 @@ syspools = Pools()  # contains pools that are meant to pe added programmatically
 def disclose(swim):
     """
     add a disclosure the file was generated, including the swimport version and the time
+    (the time can be overridden with the SOURCE_DATE_EPOCH environment variable, for reproducible output)
     """
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if epoch:
+        now = datetime.fromtimestamp(int(epoch))
+    else:
+        now = datetime.now()
     swim.add_comment_ml(f"""
                     This file was programmatically generated with {swimport.__pacakge_name__} v{swimport.__version__}
-                    on {datetime.now():%Y-%m-%d %H:%M}
+                    on {now:%Y-%m-%d %H:%M}
                     """)
     swim.add_nl()
 
 
 @syspools.add(IdiomaticPool)
 def std_exception(swim):
-    swim(include("<exception>", "<system_error>", "<stdexcept>", "<typeinfo>", "<utility>"))
+    swim(include("<cerrno>", "<exception>", "<system_error>", "<stdexcept>", "<typeinfo>", "<utility>"))
     swim.add_begin("""
     #define SWIM_STD_CATCH(ctype, ptype) catch (const ctype& e){PyErr_SetString(ptype, e.what()); SWIG_fail;}
 """)
 
     swim.add_raw("""
-%define SWIM_STD_EXCEPTION(pattern)
+%define SWIM_STD_EXCEPTION_ACTION(pattern, swim_action)
 %exception{
     try {
-        $action;
+        // errno is checked after the action, so it must not keep the errors of earlier calls on the thread
+        errno = 0;
+        swim_action;
     }
     catch (PyObject* const & e){
         if (e == nullptr)
@@ -200,11 +216,8 @@ def std_exception(swim):
         }
         if (PyObject_IsInstance(e, PyExc_BaseException))
         {
-            PyObject* type = PyObject_Type(e);
-            PyObject* args = PyObject_GetAttrString(e, "args");
-            PyErr_SetObject(type, args);
-            Py_DECREF(type);
-            Py_DECREF(args);
+            // the instance itself is raised, so that it keeps its attributes and traceback
+            PyErr_SetObject((PyObject*)Py_TYPE(e), e);
             Py_DECREF(e);
             SWIG_fail;
         }
@@ -267,6 +280,9 @@ def std_exception(swim):
     }
 }
 %enddef
+%define SWIM_STD_EXCEPTION(pattern)
+SWIM_STD_EXCEPTION_ACTION(pattern, $action)
+%enddef
 """)
 
 
@@ -390,34 +406,76 @@ def ns_trap(*names, swim):
         swim(ns_trap_name(name))
 
 
+@pools.add(IdiomaticPool)
+def runtime(swim):
+    """
+    include swimport's header-only runtime: the macros of the type conversion functions, and the helper classes of
+    iterables and callables. The runtime header's directory (swimport.runtime.get_include()) must be in the include
+    path. Since the header does not depend on the module, it can be precompiled (see swim_run's precompiled_header).
+    """
+    swim(include('"' + swimport.runtime.header + '"'))
+
+
 @syspools.add(IdiomaticPool)
-def typemap_macros(swim):
-    swim(include("<exception>", "<utility>", "<string>"))
-    swim.add_begin("""
-    #define PACKED_UD(ind) (((void**)userdata)[(ind)])
-    // note: RAISE macros are supposed to be thrown form py->cpp functions, and THROW from cpp->py
-    #define SWIM_RAISE(TYPE,MSG) throw std::pair<PyObject*, std::string>((TYPE), (MSG))
-    #define SWIM_RAISE_KEY(MSG, KEY)   { std::string msg = (MSG);\\
-                                         auto key_str = PyObject_Str((KEY));\\
-                                         msg += PyUnicode_AsUTF8(key_str);\\
-                                         Py_DECREF(key_str);\\
-                                         SWIM_RAISE(PyExc_KeyError, msg); }
-    #define SWIM_RAISE_TYPE(MSG, OBJ)  { std::string msg = (MSG);\\
-                                         auto otype = PyObject_Type((OBJ)); \\
-                                         auto otype_str = PyObject_Str(otype);\\
-                                         msg += PyUnicode_AsUTF8(otype_str);\\
-                                         Py_DECREF(otype);\\
-                                         Py_DECREF(otype_str);\\
-                                         SWIM_RAISE(PyExc_TypeError, msg); }
-    #define SWIM_RAISE_UNSPECIFIED_VAR(var) SWIM_RAISE_TYPE("an unspecified exception occurred, input type: ", var);
-    #define SWIM_RAISE_UNSPECIFIED SWIM_RAISE_UNSPECIFIED_VAR(input);
-    #define SWIM_RAISE_EXISTING throw Py_Ellipsis;
-    
-    #define SWIM_THROW SWIM_RAISE
-    #define SWIM_THROW_TYPE(MSG, OBJ)  { std::string msg = (MSG);\\
-                                         msg += typeid((OBJ)).name();\\
-                                         SWIM_RAISE(PyExc_TypeError, msg); }
-    #define SWIM_THROW_UNSPECIFIED_VAR(var) SWIM_THROW_TYPE("an unspecified exception occurred, input type: ", var);
-    #define SWIM_THROW_UNSPECIFIED SWIM_THROW_UNSPECIFIED_VAR(input);
-    #define SWIM_THROW_EXISTING SWIM_RAISE_EXISTING
+def conversion_cache(swim):
+    """
+    the memo of the values converted by typecheck typemaps during a call (see DefaultCppCheck)
+    """
+    if getattr(swim, 'runtime', False):
+        swim(runtime())
+        return
+    swim.add_begin(swimport.runtime.header_source('swimport/conversion_cache.h'))
+
+
+@syspools.add(IdiomaticPool)
+def allow_threads(swim):
+    """
+    the guard that releases the GIL around the actions of functions (see FunctionBehaviour's release_gil)
+    """
+    if getattr(swim, 'runtime', False):
+        swim(runtime())
+        return
+    swim.add_begin(swimport.runtime.header_source('swimport/gil.h'))
+
+
+@syspools.add(IdiomaticPool)
+def init_threads(swim):
+    """
+    initialize python's threads when the module is loaded, for modules that acquire the GIL from other threads (before
+    python 3.7, the GIL is only created once threads are initialized)
+    """
+    swim.add_init("""
+    #if PY_VERSION_HEX < 0x03070000
+    PyEval_InitThreads();
+    #endif
     """)
+
+
+@syspools.add(IdiomaticPool)
+def async_executor(swim):
+    """
+    the module's async_executor, that the coroutines of functions run them in (see FunctionBehaviour's async_)
+    """
+    swim.add_python_begin("""
+                    import asyncio as _SWIMPORT_asyncio
+                    import functools as _SWIMPORT_functools
+
+                    # the concurrent.futures.Executor that the *_async coroutines run their functions in, or None to
+                    # use the event loop's default executor
+                    async_executor = None
+
+                    def _SWIMPORT_run_async(func, *args, **kwargs):
+                        loop = _SWIMPORT_asyncio.get_running_loop()
+                        return loop.run_in_executor(async_executor, _SWIMPORT_functools.partial(func, *args, **kwargs))
+                    """)
+
+
+@syspools.add(IdiomaticPool)
+def typemap_macros(swim):
+    """
+    the macros that the type conversion functions use to raise exceptions and unpack their user data
+    """
+    if getattr(swim, 'runtime', False):
+        swim(runtime())
+        return
+    swim.add_begin(swimport.runtime.header_source('swimport/typemap_macros.h'))
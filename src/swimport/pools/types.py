@@ -1,3 +1,5 @@
+from typing import Dict
+
 from inspect import signature
 
 from swimport.pools.pools import pools, IdiomaticPool, Pool
@@ -252,6 +254,13 @@ _prim_maps = [
     ('long double', 'PyFloat_FromDouble', 'PyFloat_AsDouble', None, 'SWIG_TYPECHECK_DOUBLE'),
 ]
 
+# the python c-api functions that the primitive pool converts primitives to python with, derived types can call them
+# directly instead of calling the primitives' to_py functions
+primitive_to_py: Dict[str, str] = {
+    **{prim: topy for prim, topy, *_ in _prim_maps},
+    'bool': 'PyBool_FromLong',
+}
+
 
 @pools.add(IdiomaticPool)
 def primitive(*, additionals=True, swim, blacklist=(), **type_args):
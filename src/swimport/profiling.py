@@ -0,0 +1,168 @@
+from typing import List, Dict, Tuple, Union, TextIO, Optional, Callable, Any
+
+import json
+from os import PathLike, fspath
+from time import perf_counter
+
+
+class ProfileEntry:
+    """Aggregated measurements for a single key (kind and name) of a profiler"""
+
+    def __init__(self, kind: str, name: str):
+        self.kind = kind
+        self.name = name
+        self.calls = 0
+        self.total_time = 0.0
+        self.self_time = 0.0
+        self.lines = 0
+        self.self_lines = 0
+        self.applied = 0
+
+    def __str__(self):
+        return f'{self.kind}: {self.name}'
+
+
+class _Frame:
+    __slots__ = 'kind', 'name', 'start', 'start_lines', 'child_time', 'child_lines'
+
+    def __init__(self, kind, name, start, start_lines):
+        self.kind = kind
+        self.name = name
+        self.start = start
+        self.start_lines = start_lines
+        self.child_time = 0.0
+        self.child_lines = 0
+
+
+class SwimProfiler:
+    """
+    Records the wall time, lines emitted and swimportings applied by every pool, type swimporting and rule
+    that a swim applies.
+    Measurements nest, so every entry keeps both its total time (including everything it applied) and its self time.
+    """
+    report_columns = ('total ms', 'self ms', 'calls', 'lines', 'self lines', 'applied')
+
+    def __init__(self, trace=True):
+        """
+        :param trace: whether to store every individual measurement, required for write_trace.
+        """
+        self.entries: Dict[Tuple[str, str], ProfileEntry] = {}
+        self.events: Optional[List[dict]] = [] if trace else None
+        self._stack: List[_Frame] = []
+        self._origin = perf_counter()
+
+    @staticmethod
+    def line_count(swim):
+        """
+        :return: the number of lines the swim has emitted so far (including those already written to its sink)
+        """
+        return getattr(swim, 'lines_flushed', 0) + len(getattr(swim, 'lines', ()))
+
+    def call(self, swim, kind: str, name: str, func: Callable, *args, **kwargs):
+        """
+        call a function and record it under a key
+        :param swim: the swim the function emits to
+        :param kind: the kind of the key (pool, type, rule...)
+        :param name: the name of the key
+        :param func: the function to call
+        :return: the function's return value
+        """
+        frame = _Frame(kind, name, perf_counter(), self.line_count(swim))
+        self._stack.append(frame)
+        ret = None
+        try:
+            ret = func(*args, **kwargs)
+            return ret
+        finally:
+            self._stack.pop()
+            self._record(frame, perf_counter(), self.line_count(swim), bool(ret))
+
+    def add(self, kind: str, name: str, start: float, end: float):
+        """
+        record a span that was timed outside the profiler (and emitted no lines)
+        """
+        self._record(_Frame(kind, name, start, 0), end, 0, False)
+
+    def _record(self, frame: _Frame, end: float, end_lines: int, applied: bool):
+        duration = end - frame.start
+        lines = end_lines - frame.start_lines
+        key = frame.kind, frame.name
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = ProfileEntry(frame.kind, frame.name)
+        entry.calls += 1
+        entry.total_time += duration
+        entry.self_time += duration - frame.child_time
+        entry.lines += lines
+        entry.self_lines += lines - frame.child_lines
+        entry.applied += applied
+
+        if self._stack:
+            parent = self._stack[-1]
+            parent.child_time += duration
+            parent.child_lines += lines
+
+        if self.events is not None:
+            self.events.append({
+                'name': frame.name,
+                'cat': frame.kind,
+                'ph': 'X',
+                'ts': (frame.start - self._origin) * 1e6,
+                'dur': duration * 1e6,
+                'pid': 0,
+                'tid': 0,
+                'args': {'lines': lines, 'applied': applied},
+            })
+
+    def sorted_entries(self, key: str = 'self_time') -> List[ProfileEntry]:
+        """
+        :param key: the attribute of ProfileEntry to sort by (descending)
+        """
+        return sorted(self.entries.values(), key=lambda e: getattr(e, key), reverse=True)
+
+    def report(self, sort_by: str = 'self_time', limit: Optional[int] = None) -> str:
+        """
+        get a table of all the recorded keys
+        :param sort_by: the attribute of ProfileEntry to sort by (descending)
+        :param limit: the maximum number of rows, or None to include all of them
+        """
+        entries = self.sorted_entries(sort_by)
+        if limit is not None:
+            entries = entries[:limit]
+        rows = [(f'{e.total_time * 1000:.2f}', f'{e.self_time * 1000:.2f}', str(e.calls), str(e.lines),
+                 str(e.self_lines), str(e.applied), str(e)) for e in entries]
+        widths = [max([len(c), *(len(r[i]) for r in rows)]) for i, c in enumerate(self.report_columns)]
+        lines = ['  '.join(c.rjust(w) for c, w in zip(self.report_columns, widths)) + '  key']
+        lines.extend(
+            '  '.join(v.rjust(w) for v, w in zip(r, widths)) + '  ' + r[-1] for r in rows
+        )
+        return '\n'.join(lines)
+
+    def write_trace(self, dst: Union[str, PathLike, TextIO]):
+        """
+        write all recorded measurements as a chrome trace (viewable in chrome://tracing or perfetto)
+        """
+        if self.events is None:
+            raise ValueError('the profiler was created without tracing')
+        trace = {'traceEvents': sorted(self.events, key=lambda e: e['ts']), 'displayTimeUnit': 'ms'}
+        if isinstance(dst, (str, PathLike)):
+            with open(fspath(dst), 'w') as w:
+                json.dump(trace, w)
+        else:
+            json.dump(trace, dst)
+
+    def __str__(self):
+        return self.report()
+
+
+def porting_key(swimporting: Any) -> Tuple[str, str]:
+    """
+    :return: the kind and name a swimporting is recorded under
+    """
+    rule = getattr(swimporting, 'rule', None)
+    if rule is not None:
+        return 'rule', str(rule)
+    cpp_name = getattr(swimporting, 'cpp_name', None)
+    if cpp_name is not None:
+        return 'type', cpp_name
+    return 'swimporting', getattr(swimporting, '__qualname__', type(swimporting).__qualname__)
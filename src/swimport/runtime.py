@@ -0,0 +1,23 @@
+from os import path
+
+# the directory of swimport's header-only runtime, which must be in the include path of modules that use it
+include_dir = path.join(path.dirname(path.abspath(__file__)), 'include')
+# the runtime header, relative to include_dir
+header = 'swimport/runtime.h'
+
+
+def get_include() -> str:
+    """
+    :return: the directory to add to the include path of modules that use swimport's runtime (see pools.runtime)
+    """
+    return include_dir
+
+
+def header_source(name: str) -> str:
+    """
+    :param name: the name of a header of the runtime, relative to include_dir
+    :return: the source of the header without its "#pragma once", to embed in interface files that do not include the
+        runtime
+    """
+    with open(path.join(include_dir, name)) as r:
+        return ''.join(l for l in r if l.strip() != '#pragma once')
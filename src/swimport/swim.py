@@ -1,12 +1,16 @@
 from typing import List, Optional, Union, TextIO, MutableMapping, Any, Tuple, Type
 
 from functools import lru_cache
-from os import PathLike, fspath
-import itertools as it
+import sys
+import os
+import filecmp
+from os import PathLike, fspath, environ
 
 import swimport.pools as pools_pkg
 from swimport.model import SwimportAggregate, CPPObject, Swimporting, Function
 from swimport.typeswim import TypeSwimporting
+from swimport.profiling import SwimProfiler, porting_key
+from swimport.translation_units import SplitFunctions
 from swimport.__util__ import *
 
 
@@ -36,12 +40,33 @@ class Delaying:
 
 class Swim(SwimportAggregate):
     """The main swim object, absorbs all the lines and scopes given by swimportings"""
+    temp_suffix = '.tmp'  # the suffix of the temporary file a swim streams to when its sink is a path
 
-    def __init__(self, module_name: Optional[str], disclose=True, verbosity: Verbosity = Verbosity.info, **kwargs):
+    def __init__(self, module_name: Optional[str], disclose=True, verbosity: Verbosity = Verbosity.info, *,
+                 sink: Union[str, PathLike, TextIO, None] = None, flush_threshold: int = 4096,
+                 share_functions=True, profile: Union[bool, str, PathLike, SwimProfiler, None] = ...,
+                 translation_units: int = ..., runtime=False, **kwargs):
         """
         :param module_name: the name of the module, if this is set, the module pool will be automatically added
         :param disclose: whether to automatically add the disclose pool
         :param verbosity: the verbosity of the swim
+        :param sink: a path or text file to stream the swim's lines into. If set, the lines are written to the sink
+            in chunks as they are added, and only the lines that were not yet written are stored in the swim. Call
+            write() (without a destination) to write the remaining lines.
+        :param flush_threshold: the number of stored lines that will cause the swim to flush them to its sink.
+        :param share_functions: whether functions added with add_function that are identical to previously added
+            functions (in signature, body, fragments, and scope) should reuse the previous function instead of being
+            added again.
+        :param profile: whether to record the time and lines every pool, type, and rule take to apply (see
+            swim.profiler). Can be a SwimProfiler to record into, True to create a new one, or a path to also dump the
+            profile to when the swim is written: a chrome trace if the path ends with .json, a report otherwise (or to
+            stderr if the path is "-"). Default is to use the SWIMPORT_PROFILE environment variable as a path.
+        :param translation_units: if greater than 1, the functions added with add_function that do not use swig's
+            runtime are moved out of the interface file, to be distributed between this many c++ files once swig
+            generates the wrapper (see translation_units.SplitFunctions), so they can be compiled in parallel. Default
+            is to use the SWIMPORT_TRANSLATION_UNITS environment variable, or 1.
+        :param runtime: whether to include swimport's runtime header instead of emitting its helpers into the
+            interface file (see pools.runtime).
         :param kwargs: additional arguments fed to the module pool
         """
         # note: special swimportings can place their markers here even though they are NOT cppObjects
@@ -52,6 +77,41 @@ class Swim(SwimportAggregate):
         self.id_mark = 'SWIM_MAIN' if not module_name else ('SWIM_' + module_name.upper())
         self.verbosity = verbosity
 
+        self.share_functions = share_functions
+        self.runtime = runtime
+        self._functions: MutableMapping[tuple, str] = {}
+
+        if translation_units is ...:
+            translation_units = int(environ.get('SWIMPORT_TRANSLATION_UNITS') or 1)
+        # the functions moved out of the interface file, or None if no functions are moved
+        self.split_functions: Optional[SplitFunctions] = None
+        if translation_units > 1:
+            self.split_functions = SplitFunctions(translation_units)
+
+        if profile is ...:
+            profile = environ.get('SWIMPORT_PROFILE') or None
+        self.profile_dst: Union[str, PathLike, None] = None
+        if isinstance(profile, SwimProfiler):
+            self.profiler: Optional[SwimProfiler] = profile
+        elif profile:
+            self.profiler = SwimProfiler()
+            if profile is not True:
+                self.profile_dst = profile
+        else:
+            self.profiler = None
+
+        self.flush_threshold = flush_threshold
+        self.lines_flushed = 0
+        self._sink_path: Optional[str] = None
+        if isinstance(sink, (str, PathLike)):
+            # the lines are streamed to a temporary file, that only replaces the sink if it is different from it
+            self._sink_path = fspath(sink)
+            self._sink: Optional[TextIO] = open(self._sink_path + self.temp_suffix, 'w')
+            self._own_sink = True
+        else:
+            self._sink = sink
+            self._own_sink = False
+
         if disclose:
             self(pools_pkg.pools.disclose)
         if module_name:
@@ -62,7 +122,13 @@ class Swim(SwimportAggregate):
         Apply a single porting to the swim
         :returns: whether or not the porting succeeded
         """
-        if swimporting(self):
+        if self.profiler is None or isinstance(swimporting, pools_pkg.Pool):
+            # pools record themselves, so they will also be recorded when called directly
+            success = swimporting(self)
+        else:
+            kind, name = porting_key(swimporting)
+            success = self.profiler.call(self, kind, name, swimporting, self)
+        if success:
             obj = getattr(swimporting, 'object', None)
             if obj:
                 return obj.name
@@ -75,9 +141,50 @@ class Swim(SwimportAggregate):
         :returns int: the number of lines added
         """
         lines = scope_lines(*args, **kwargs)
-        self.lines.extend(lines)
+        self._extend_lines(lines)
         return len(lines)
 
+    def _extend_lines(self, lines):
+        self.lines.extend(lines)
+        if self._sink is not None and len(self.lines) >= self.flush_threshold:
+            self.flush()
+
+    def flush(self):
+        """
+        write all the stored lines to the swim's sink and clear them. Does nothing if the swim has no sink.
+        """
+        if self._sink is None or not self.lines:
+            return
+        self._sink.write('\n'.join(self.lines))
+        self._sink.write('\n')
+        self.lines_flushed += len(self.lines)
+        self.lines.clear()
+
+    def dump_profile(self, dst: Union[str, PathLike, TextIO, None] = None):
+        """
+        write the swim's profile
+        :param dst: the path or file to write to. If a path ending with .json, a chrome trace is written, otherwise a
+            report is written. "-" writes the report to stderr. Default is the profile argument of the constructor.
+        """
+        if self.profiler is None:
+            raise ValueError('the swim is not profiled')
+        if dst is None:
+            dst = self.profile_dst
+            if dst is None:
+                raise TypeError('a destination must be specified for a swim without a profile destination')
+        if dst == '-':
+            dst = sys.stderr
+        if isinstance(dst, (str, PathLike)):
+            if fspath(dst).endswith('.json'):
+                self.profiler.write_trace(dst)
+                return
+            with open(fspath(dst), 'w') as w:
+                w.write(self.profiler.report())
+                w.write('\n')
+        else:
+            dst.write(self.profiler.report())
+            dst.write('\n')
+
     @Delaying
     def add_raw(self, lines):
         """
@@ -97,6 +204,9 @@ class Swim(SwimportAggregate):
         """
         add lines to the swim with an insert scope %{ %}
         """
+        if self.split_functions is not None:
+            lines = clean_source(lines)
+            self.split_functions.add_includes(lines)
         return self._add_scope(lines, '%{', '%}')
 
     @Delaying
@@ -111,6 +221,9 @@ class Swim(SwimportAggregate):
         """
         add lines to the swim with an %init scope
         """
+        if self.split_functions is not None:
+            lines = clean_source(lines)
+            self.split_functions.add_begin(lines)
         return self._add_scope(lines, '%begin %{', '%}')
 
     @Delaying
@@ -118,6 +231,9 @@ class Swim(SwimportAggregate):
         """
         add lines to the swim with an %inline scope
         """
+        if self.split_functions is not None:
+            lines = clean_source(lines)
+            self.split_functions.add_includes(lines)
         return self._add_scope(lines, '%inline %{', '%}')
 
     @Delaying
@@ -203,17 +319,34 @@ class Swim(SwimportAggregate):
         :param add_scope: the scope of the function deceleration.
         :param name_abs: if set, regular name mangling will be ignored the function's identifier will be identical
             to function_name. note that this identifier will not be stored in the swim's translated_ids.
-        :return: the true identifier of the function.
+        :param fragments: additional fragments the function requires.
+        :return: the true identifier of the function. If the swim shares functions, this might be the identifier of
+            an identical function that was previously added.
         """
+        lines = clean_source(lines)
+        key = None
+        if self.share_functions and not name_abs:
+            key = (return_type, tuple(arguments), tuple(lines), tuple(fragments), add_scope)
+            prev = self._functions.get(key)
+            if prev:
+                return prev
+
         if name_abs:
             name = function_name
         else:
             name = self.create_unique_id(function_name)
+        if key:
+            self._functions[key] = name
+        signature = return_type + ' ' + name + '(' + ', '.join(arguments) + ')'
+        if not name_abs and self.split_functions is not None and self.split_functions.can_split(lines, fragments):
+            self.split_functions.add(name, signature, lines, fragments)
+            add_scope(self, ['%fragment ("' + name + '","header"){', signature + ';', '}'])
+            return name
+
         frag_str = (',fragment="' + ','.join(fragments) + '"') if fragments else ''
-        lines = clean_source(lines)
         lines = [
             '%fragment ("' + name + '","header"' + frag_str + '){',
-            return_type + ' ' + name + '(' + ', '.join(arguments) + ') {',
+            signature + ' {',
             *('\t' + l for l in lines),
             '}',
             '}'
@@ -229,10 +362,7 @@ class Swim(SwimportAggregate):
         """
         if self.verbosity <= Verbosity.critical:
             return 0
-        if n == 1:
-            self.lines.append('')
-        else:
-            self.lines.extend('' for _ in range(n))
+        self._extend_lines('' for _ in range(n))
         return n
 
     def __str__(self):
@@ -243,25 +373,53 @@ class Swim(SwimportAggregate):
     def __iter__(self):
         """
         Get an iterable of the lines stored in the swimport.
+        Note: if the swim has a sink, only the lines that were not yet written to it are stored.
         """
         return (yield from self.lines)
 
-    def write(self, dst: Union[str, PathLike, TextIO]):
-        """
-        write the lines of the swim to a file or path
-        """
-        if isinstance(dst, (str, PathLike)):
-            dst = open(fspath(dst), 'w')
-            own = True
+    def write(self, dst: Union[str, PathLike, TextIO, None] = None):
+        """
+        write the lines of the swim to a file or path. A path is not rewritten if its content would not change.
+        If the swim has a sink, the destination must be omitted, the remaining lines are written to the sink
+        and the sink is closed (if the swim opened it).
+        If the swim has a profile destination, the profile is dumped to it as well.
+        If the swim moved functions out of the interface file, and is written to a path, the functions are written
+        next to it, to <module>.swim_functions.json (see translation_units.SplitFunctions).
+        """
+        if self.profile_dst is not None:
+            self.dump_profile()
+
+        if self._sink is not None:
+            if dst is not None:
+                raise ValueError('a swim with a sink cannot be written to a different destination')
+            self.flush()
+            if self._own_sink:
+                self._sink.close()
+                temp_path = self._sink_path + self.temp_suffix
+                if os.path.exists(self._sink_path) and filecmp.cmp(temp_path, self._sink_path, shallow=False):
+                    os.remove(temp_path)
+                else:
+                    os.replace(temp_path, self._sink_path)
+            self._sink = None
+            path = self._sink_path
+        elif dst is None:
+            raise TypeError('a destination must be specified for a swim without a sink')
         else:
-            own = False
-
-        dst.writelines(
-            it.chain.from_iterable(zip(self, it.repeat('\n')))
-        )
-
-        if own:
-            dst.close()
+            text = ('\n'.join(self.lines) + '\n') if self.lines else ''
+            if isinstance(dst, (str, PathLike)):
+                path = fspath(dst)
+                write_if_changed(path, text)
+            else:
+                path = None
+                dst.write(text)
+
+        if path is not None:
+            split_path = os.path.splitext(path)[0] + SplitFunctions.suffix
+            if self.split_functions is not None:
+                self.split_functions.write(split_path)
+            elif os.path.exists(split_path):
+                # left over from a previous write that did move functions
+                os.remove(split_path)
 
     @staticmethod
     def _normalize_to_cpp_type(t)->str:
@@ -1,12 +1,20 @@
 from pathlib import Path
 import os
 import sys
-import itertools as it
 import subprocess
 import warnings
 import ntpath
 import glob
 from collections import namedtuple
+from typing import Optional, Dict, List, NamedTuple
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+import json
+
+from swimport.swim_run_backends import CompilerBackend, CompilerCache, default_backend, default_compiler_cache, \
+    fingerprint, source_dependencies, tool_version
+from swimport.translation_units import SplitFunctions
+import swimport.runtime
 
 """
 An open letter to the c++ compiler:
@@ -41,13 +49,82 @@ fields = ('SWIG_PATH', 'PYTHON_ROOT', 'windows_kit_template', 'MSVC_dir', 'np_in
 swimport_paths_tuple = namedtuple('swimport_paths', fields)
 
 
+class BuildManifest:
+    """
+    A record of the fingerprints of the inputs of swim_run's stages, stored next to the module. A stage whose inputs
+    have the same fingerprint as in its last successful run (and whose outputs still exist) can be skipped.
+    """
+    suffix = '.swim_manifest.json'
+
+    def __init__(self, path: Path, enabled=True):
+        """
+        :param path: the path of the manifest file
+        :param enabled: if false, no stage is ever considered current, and the manifest file is not written
+        """
+        self.path = path
+        self.enabled = enabled
+        self.stages: Dict[str, str] = {}
+        if enabled and path.exists():
+            try:
+                with open(path) as r:
+                    self.stages = json.load(r)
+            except (OSError, ValueError):
+                self.stages = {}
+
+    def is_current(self, stage: str, stage_fingerprint: str, *outputs: Path) -> bool:
+        """
+        :return: whether the stage's last run had the same fingerprint, and all its outputs exist
+        """
+        return self.enabled \
+               and self.stages.get(stage) == stage_fingerprint \
+               and all(o.exists() for o in outputs)
+
+    def update(self, stage: str, stage_fingerprint: str):
+        """
+        record a successful run of a stage
+        """
+        if not self.enabled:
+            return
+        self.stages[stage] = stage_fingerprint
+        with open(self.path, 'w') as w:
+            json.dump(self.stages, w, indent=1)
+
+
 def swim_run(
         dirname: Path,
         swimport_paths: swimport_paths_tuple,
         optimization,
-        print_out=True, module_name=..., is_cpp=...):
-    original_cwd = os.getcwd()
-    os.chdir(str(dirname.absolute()))
+        print_out=True, module_name=..., is_cpp=..., backend: CompilerBackend = ..., jobs: Optional[int] = None,
+        incremental=True, capture_output=False, compiler_cache: Optional[CompilerCache] = ...,
+        translation_units: Optional[int] = None, precompiled_header=False) -> Dict[str, float]:
+    """
+    run the example in a directory: run main.py, run swig on the resulting interface file, build the extension module
+    and run usage.py
+    :param dirname: the directory of the example
+    :param swimport_paths: the paths of the tools and libraries to use (see swim_run_paths)
+    :param optimization: the optimization flag to compile with (either msvc or gcc style)
+    :param print_out: whether to print the progress
+    :param module_name: the name of the module, default is to use the name of a *.m file in the directory,
+        or "example"
+    :param is_cpp: whether the module is c++ (as opposed to c)
+    :param backend: the compiler backend to use, default is the platform's default (see swim_run_backends)
+    :param jobs: the maximum number of translation units to compile at once, default is the cpu count
+    :param incremental: whether to skip the swig and compilation stages if their inputs have not changed since their
+        last run (see BuildManifest)
+    :param compiler_cache: the cache to compile translation units with, None to disable caching. Default is to use
+        sccache or ccache if installed, or a local cache (see swim_run_backends.default_compiler_cache)
+    :param capture_output: whether to capture the output of main.py and usage.py (the output is then included in the
+        exception if they fail)
+    :param translation_units: if set, the number of translation units the swim should split its functions between
+        (see Swim's translation_units parameter), default is to leave it to main.py
+    :param precompiled_header: whether to precompile swimport's runtime header (see pools.runtime) and include it in
+        every translation unit, if the backend supports it. Only applies to c++ modules.
+    :return: the time (in seconds) each stage that ran took, skipped stages are recorded with a time of 0
+    """
+    # the process-wide cwd is never changed, so multiple examples can run concurrently
+    dirname = dirname.absolute()
+    timings: Dict[str, float] = {}
+    output = subprocess.PIPE if capture_output else None
 
     if module_name is ...:
         files = glob.glob(str(dirname / '*.m'))
@@ -71,16 +148,27 @@ def swim_run(
     usage_path = dirname / 'usage.py'
 
     if main_path.exists():
+        start = perf_counter()
         if print_out:
             print('\t' + 'main.py', end='...', flush=True)
-        subprocess.run([sys.executable, 'main.py', module_name],
-                       stdout=subprocess.PIPE, check=True)
+        env = None
+        if incremental and 'SOURCE_DATE_EPOCH' not in os.environ:
+            # so that the .i file's disclosure is identical between runs
+            env = {**os.environ, 'SOURCE_DATE_EPOCH': str(int(main_path.stat().st_mtime))}
+        if translation_units is not None:
+            env = {**(env or os.environ), 'SWIMPORT_TRANSLATION_UNITS': str(translation_units)}
+        subprocess.run([sys.executable, 'main.py', module_name], cwd=str(dirname),
+                       stdout=subprocess.PIPE, stderr=output, check=True, env=env)
+        timings['main'] = perf_counter() - start
         if print_out:
             print('done!')
     elif print_out:
         print('\tmain.py missing')
 
+    manifest = BuildManifest(dirname / (module_name + BuildManifest.suffix), enabled=incremental)
+
     if inter_path.exists():
+        start = perf_counter()
         if print_out:
             print('\t' + module_name+'.i', end='...', flush=True)
         popenargs = [swimport_paths.SWIG_PATH]
@@ -90,58 +178,83 @@ def swim_run(
         # popenargs.append('-debug-tmsearch')
         popenargs.extend(['-outdir', str(dirname), str(inter_path)])
 
-        subprocess.run(popenargs, check=True)
-        if print_out:
-            print('done!')
+        swig_print = fingerprint([tool_version((swimport_paths.SWIG_PATH, '-version')), *popenargs],
+                                 source_dependencies([inter_path]))
+        if manifest.is_current('swig', swig_print, cxx_path, dirname / (module_name + '.py')):
+            timings['swig'] = 0
+            if print_out:
+                print('unchanged')
+        else:
+            subprocess.run(popenargs, cwd=str(dirname), stdout=output, stderr=output, check=True)
+            manifest.update('swig', swig_print)
+            timings['swig'] = perf_counter() - start
+            if print_out:
+                print('done!')
     elif print_out:
         print('\t'+module_name+'.i missing')
 
     if cxx_path.exists():
+        start = perf_counter()
         if print_out:
             print('\t' + str(cxx_path), end='...', flush=True)
         tmpdir = dirname / 'temp'
         src_path = dirname / Path('src'+src_ext)
 
-        tmpdir.mkdir(exist_ok=True, parents=True)
-        # todo compile with warnings?
-
-        is_64bits = sys.maxsize > 2 ** 32
-        pyd_suffix = f'.cp{sys.version_info[0]}{sys.version_info[1]}-{"win_amd64" if is_64bits else "win32"}.pyd'
-
-        proc = subprocess.run([
-            swimport_paths.CL_PATH, '/nologo', '/LD', '/EHsc', '/utf-8', optimization,
-            '/Tp', str(cxx_path),
-            *(('/Tp', str(src_path)) if src_path.exists() else ()),
-            '/Fo:' + str(tmpdir) + '\\',
-            '/I', swimport_paths.PY_INCLUDE_PATH,
-            '/I', str(dirname),
-            *it.chain.from_iterable(('/I', i) for i in swimport_paths.COMPILE_ADDITIONAL_INCLUDE_DIRS),
-            '/link',
-            '/LIBPATH', swimport_paths.PY_LIB_PATH,
-            *it.chain.from_iterable(('/LIBPATH', l) for l in swimport_paths.COMPILE_ADDITIONAL_LIBS),
-            '/IMPLIB:' + str(tmpdir / Path(module_name+'.lib')),
-            '/OUT:' + str(dirname / Path('_'+module_name+pyd_suffix))
-        ], stdout=subprocess.PIPE, text=True)
-        if proc.returncode != 0:
-            print(proc.stdout)
-            raise Exception(f'cl returned {proc.returncode}')
-        if print_out:
-            print('done!')
+        if backend is ...:
+            backend = default_backend(swimport_paths)
+        if compiler_cache is ...:
+            compiler_cache = default_compiler_cache()
+        sources = [cxx_path]
+        split_path = dirname / (module_name + SplitFunctions.suffix)
+        if split_path.exists():
+            sources.extend(Path(p) for p in SplitFunctions.read(split_path).write_translation_units(cxx_path,
+                                                                                                  module_name))
+        if src_path.exists():
+            sources.append(src_path)
+
+        module_path = backend.module_path(dirname, module_name)
+        include_dirs = [swimport_paths.PY_INCLUDE_PATH, str(dirname), swimport.runtime.get_include(),
+                        *swimport_paths.COMPILE_ADDITIONAL_INCLUDE_DIRS]
+        lib_paths = [swimport_paths.PY_LIB_PATH, *swimport_paths.COMPILE_ADDITIONAL_LIBS]
+
+        precompiled_header = precompiled_header and is_cpp
+        compile_print = manifest.enabled \
+                        and fingerprint([backend.fingerprint(sources, module_path, tmpdir, include_dirs, lib_paths,
+                                                             optimization, is_cpp), str(precompiled_header)],
+                                        source_dependencies([Path(swimport.runtime.include_dir,
+                                                                  swimport.runtime.header)]))
+        if manifest.is_current('compile', compile_print, module_path):
+            timings['compile'] = 0
+            if print_out:
+                print('unchanged')
+        else:
+            if precompiled_header:
+                backend = backend.precompiled(swimport.runtime.header, tmpdir, include_dirs, optimization)
+            backend.build(
+                sources, module_path, tmpdir, include_dirs=include_dirs, lib_paths=lib_paths,
+                optimization=optimization, is_cpp=is_cpp, jobs=jobs, cache=compiler_cache
+            )
+            manifest.update('compile', compile_print)
+            timings['compile'] = perf_counter() - start
+            if print_out:
+                print('done!')
     elif print_out:
         print('\t'+str(cxx_path)+' missing')
 
     if usage_path.exists():
+        start = perf_counter()
         if print_out:
             print('\t' + 'usage.py', end='...', flush=True)
-        subprocess.run([sys.executable, 'usage.py'],
-                       stdout=None, stderr=None, check=True
+        subprocess.run([sys.executable, 'usage.py'], cwd=str(dirname),
+                       stdout=output, stderr=output, check=True
                        )
+        timings['usage'] = perf_counter() - start
         if print_out:
             print('done!')
     elif print_out:
         print('\tusage.py missing')
 
-    os.chdir(original_cwd)
+    return timings
 
 
 def simple_passes_filter(path: Path):
@@ -149,13 +262,93 @@ def simple_passes_filter(path: Path):
     return not tail.startswith('_')
 
 
-def swim_run_subfolders(root_dir, optimization, passes_filter, **kwargs):
-    if optimization != '/O2':
-        warnings.warn(f'warning: optimization should be set to maximum (/O2 instead of {optimization}),'
+def _check_optimization(optimization):
+    if optimization not in ('/O2', '-O2', '-O3'):
+        warnings.warn(f'warning: optimization should be set to maximum (/O2 or -O2 instead of {optimization}),'
                       'to ensure completeness',
                       stacklevel=10)
+
+
+def swim_run_subfolders(root_dir, optimization, passes_filter, **kwargs):
+    _check_optimization(optimization)
     for item in root_dir.iterdir():
         if not item.is_dir() or not passes_filter(item):
             continue
         print(str(item.name) + ':')
         swim_run(item, optimization=optimization, **kwargs)
+
+
+class SwimRunResult(NamedTuple):
+    """The result of running a single example folder"""
+    name: str
+    passed: bool
+    timings: Dict[str, float]
+    total: float
+    error: Optional[BaseException] = None
+
+
+def _run_subfolder(item: Path, kwargs) -> SwimRunResult:
+    start = perf_counter()
+    try:
+        timings = swim_run(item, print_out=False, capture_output=True, **kwargs)
+    except Exception as e:
+        return SwimRunResult(item.name, False, {}, perf_counter() - start, e)
+    return SwimRunResult(item.name, True, timings, perf_counter() - start)
+
+
+def _error_output(error: BaseException) -> str:
+    if isinstance(error, subprocess.CalledProcessError):
+        out = error.stderr or error.stdout or ''
+        if isinstance(out, bytes):
+            out = out.decode(errors='replace')
+        return f'{error}\n{out}'
+    return str(error)
+
+
+def summary_table(results: List[SwimRunResult]) -> str:
+    """
+    :return: a table of the stage timings and status of every result, followed by the errors of all failed results
+    """
+    stages = ('main', 'swig', 'compile', 'usage')
+    header = ('example', 'status', *stages, 'total')
+    rows = [
+        (r.name, 'ok' if r.passed else 'FAIL',
+         *((f'{r.timings[s]:.2f}' if s in r.timings else '-') for s in stages),
+         f'{r.total:.2f}')
+        for r in results
+    ]
+    widths = [max([len(h), *(len(row[i]) for row in rows)]) for i, h in enumerate(header)]
+    lines = ['  '.join(h.ljust(w) for h, w in zip(header, widths)).rstrip()]
+    lines.extend('  '.join(c.ljust(w) for c, w in zip(row, widths)).rstrip() for row in rows)
+    failed = [r for r in results if not r.passed]
+    lines.append(f'{len(results) - len(failed)}/{len(results)} passed')
+    for r in failed:
+        lines.append('')
+        lines.append(r.name + ':')
+        lines.append(_error_output(r.error))
+    return '\n'.join(lines)
+
+
+def swim_run_subfolders_parallel(root_dir: Path, optimization, passes_filter, workers: Optional[int] = None,
+                                 print_out=True, **kwargs) -> List[SwimRunResult]:
+    """
+    run all the examples in a directory concurrently (see swim_run). Failing examples do not stop the other examples.
+    :param root_dir: the directory containing the example folders
+    :param optimization: the optimization flag to compile with
+    :param passes_filter: a predicate for which folders to run
+    :param workers: the maximum number of examples to run at once, default is the cpu count
+    :param print_out: whether to print a summary table when all the examples are done
+    :param kwargs: additional arguments forwarded to swim_run. Unless specified, every example compiles its
+        translation units one at a time (jobs=1), since the examples already run in parallel.
+    :return: the results of all the examples, in the order of their names
+    """
+    _check_optimization(optimization)
+    kwargs.setdefault('jobs', 1)
+    kwargs['optimization'] = optimization
+    items = sorted((item for item in Path(root_dir).absolute().iterdir() if item.is_dir() and passes_filter(item)),
+                   key=lambda i: i.name)
+    with ThreadPoolExecutor(workers or os.cpu_count() or 1) as executor:
+        results = list(executor.map(lambda item: _run_subfolder(item, kwargs), items))
+    if print_out:
+        print(summary_table(results))
+    return results
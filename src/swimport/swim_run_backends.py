@@ -0,0 +1,500 @@
+from typing import List, Sequence, Iterable, Optional, Tuple, Union
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from hashlib import sha256
+import itertools as it
+import re
+import os
+import sys
+import subprocess
+import sysconfig
+import shutil
+import tempfile
+
+
+_include_pattern = re.compile(rb'^[ \t]*(?:#[ \t]*include|%include|%import)[ \t]*"([^"\r\n]+)"', re.MULTILINE)
+
+
+def source_dependencies(sources: Iterable[Path], include_dirs: Iterable[str] = ()) -> List[Path]:
+    """
+    get all the files that sources include with quoted #include (or swig's %include and %import) directives,
+    recursively. Included files are searched for in the including file's directory, then in include_dirs.
+    Files that cannot be found are ignored.
+    :return: the sources and all their dependencies, in a stable order
+    """
+    include_dirs = [Path(d) for d in include_dirs if d]
+    ret = []
+    seen = set()
+    stack = [Path(s) for s in reversed(list(sources))]
+    while stack:
+        path = stack.pop()
+        key = os.path.normcase(os.path.abspath(path))
+        if key in seen:
+            continue
+        seen.add(key)
+        ret.append(path)
+        with open(path, 'rb') as r:
+            content = r.read()
+        for match in reversed(_include_pattern.findall(content)):
+            name = match.decode('utf-8', 'replace')
+            for d in (path.parent, *include_dirs):
+                candidate = d / name
+                if candidate.is_file():
+                    stack.append(candidate)
+                    break
+    return ret
+
+
+def fingerprint(args: Iterable[str], files: Iterable[Path]) -> str:
+    """
+    :return: a hash of command line arguments and the contents of files
+    """
+    h = sha256()
+    for a in args:
+        h.update(str(a).encode('utf-8'))
+        h.update(b'\0')
+    for f in files:
+        h.update(str(f).encode('utf-8'))
+        h.update(b'\0')
+        with open(f, 'rb') as r:
+            h.update(sha256(r.read()).digest())
+    return h.hexdigest()
+
+
+@lru_cache(None)
+def tool_version(args: Tuple[str, ...]) -> str:
+    """
+    :param args: the command line that makes a tool print its version
+    :return: the output of the command, or an empty string if it could not be run
+    """
+    try:
+        proc = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    except OSError:
+        return ''
+    return proc.stdout.strip()
+
+
+class CompilerBackend(ABC):
+    """
+    A compiler used by swim_run to build the extension module. Every translation unit is compiled to its own object
+    file (in parallel), and the objects are then linked to the module.
+    """
+    object_suffix = '.o'
+    # optimization flags of other backends, translated to this backend's flags
+    optimization_aliases = {}
+
+    @property
+    def ext_suffix(self) -> str:
+        """
+        the suffix of the extension module's file name, including the extension
+        """
+        return sysconfig.get_config_var('EXT_SUFFIX')
+
+    def module_path(self, dirname: Path, module_name: str) -> Path:
+        """
+        :return: the path of the built extension module of a swim module
+        """
+        return dirname / ('_' + module_name + self.ext_suffix)
+
+    def normalize_optimization(self, optimization: str) -> str:
+        return self.optimization_aliases.get(optimization, optimization)
+
+    @abstractmethod
+    def compile_args(self, src: Path, obj: Path, include_dirs: Iterable[str], optimization: str, is_cpp: bool) \
+            -> List[str]:
+        """
+        :return: the command line to compile a single translation unit into an object file
+        """
+
+    @abstractmethod
+    def link_args(self, objs: Sequence[Path], out: Path, tmpdir: Path, lib_paths: Iterable[str]) -> List[str]:
+        """
+        :return: the command line to link object files into an extension module
+        """
+
+    @abstractmethod
+    def version(self) -> str:
+        """
+        :return: a string identifying the compiler's version
+        """
+
+    def fingerprint(self, sources: Sequence[Path], out: Path, tmpdir: Path, include_dirs: Sequence[str],
+                    lib_paths: Sequence[str], optimization: str, is_cpp=True) -> str:
+        """
+        get a hash of all the inputs of a build (see build for the parameters). The hash includes the command lines,
+        the compiler version, and the contents of the sources and all the headers they include (with quoted includes).
+        """
+        optimization = self.normalize_optimization(optimization)
+        objs = self.objects(sources, tmpdir)
+        args = [type(self).__name__, self.version()]
+        for src, obj in zip(sources, objs):
+            args.extend(self.compile_args(src, obj, include_dirs, optimization, is_cpp))
+        args.extend(self.link_args(objs, out, tmpdir, lib_paths))
+        return fingerprint(args, source_dependencies(sources, include_dirs))
+
+    def objects(self, sources: Sequence[Path], tmpdir: Path) -> List[Path]:
+        """
+        :return: the paths of the object files of sources
+        """
+        return [tmpdir / (src.stem + self.object_suffix) for src in sources]
+
+    @staticmethod
+    def run(args: List[str], name: str):
+        """
+        run a compiler command
+        :raises Exception: if the command fails, with the command's output
+        """
+        proc = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        if proc.returncode != 0:
+            raise Exception(f'{name} returned {proc.returncode}:\n{proc.stdout}')
+        return proc
+
+    @abstractmethod
+    def preprocess_args(self, src: Path, include_dirs: Iterable[str], is_cpp: bool) -> List[str]:
+        """
+        :return: the command line to preprocess a single translation unit to stdout
+        """
+
+    def precompiled(self, header: str, tmpdir: Path, include_dirs: Sequence[str], optimization: str) \
+            -> 'CompilerBackend':
+        """
+        precompile a c++ header that every translation unit includes
+        :param header: the header to precompile, relative to one of include_dirs
+        :param tmpdir: a directory to store the precompiled header in
+        :param include_dirs: the include directories of the translation units
+        :param optimization: the optimization flag
+        :return: a backend that compiles translation units with the precompiled header included before their content.
+            Backends that do not support precompiled headers return themselves.
+        """
+        return self
+
+    @staticmethod
+    def _find_header(header: str, include_dirs: Iterable[str]) -> Path:
+        for d in include_dirs:
+            candidate = Path(d) / header
+            if candidate.is_file():
+                return candidate
+        raise FileNotFoundError(f'could not find {header} in the include directories')
+
+    def build(self, sources: Sequence[Path], out: Path, tmpdir: Path, include_dirs: Sequence[str],
+              lib_paths: Sequence[str], optimization: str, is_cpp=True, jobs: Optional[int] = None,
+              cache: Optional['CompilerCache'] = None) -> Path:
+        """
+        compile and link an extension module
+        :param sources: the translation units to compile
+        :param out: the path of the extension module
+        :param tmpdir: a directory to store the object files (and other intermediate files) in
+        :param include_dirs: the include directories of the translation units
+        :param lib_paths: library directories and additional libraries to link with
+        :param optimization: the optimization flag
+        :param is_cpp: whether the translation units are c++ (as opposed to c)
+        :param jobs: the maximum number of translation units to compile at once, default is the cpu count
+        :param cache: the cache to compile the translation units with, None to always compile them
+        :return: out
+        """
+        tmpdir.mkdir(exist_ok=True, parents=True)
+        optimization = self.normalize_optimization(optimization)
+        objs = self.objects(sources, tmpdir)
+
+        def compile_(src, obj):
+            if cache is not None:
+                return cache.compile(self, src, obj, include_dirs, optimization, is_cpp)
+            return self.run(self.compile_args(src, obj, include_dirs, optimization, is_cpp), str(src.name))
+
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        jobs = min(jobs, len(sources))
+        if jobs <= 1:
+            for s, o in zip(sources, objs):
+                compile_(s, o)
+        else:
+            with ThreadPoolExecutor(jobs) as executor:
+                # list to raise the first exception
+                list(executor.map(compile_, sources, objs))
+
+        self.run(self.link_args(objs, out, tmpdir, lib_paths), 'link ' + out.name)
+        return out
+
+
+class MSVCBackend(CompilerBackend):
+    """A backend for the microsoft c++ compiler (cl.exe)"""
+    object_suffix = '.obj'
+    optimization_aliases = {'-O0': '/Od', '-O1': '/O1', '-O2': '/O2', '-O3': '/O2'}
+
+    def __init__(self, cl_path: str = 'cl.exe', extra_compile_args: Sequence[str] = ()):
+        """
+        :param cl_path: the path to cl.exe
+        :param extra_compile_args: additional arguments to every compilation
+        """
+        self.cl_path = cl_path
+        self.extra_compile_args = list(extra_compile_args)
+
+    @property
+    def ext_suffix(self):
+        ret = sysconfig.get_config_var('EXT_SUFFIX')
+        if ret and ret.endswith('.pyd'):
+            return ret
+        # cross-building from a different platform's python
+        is_64bits = sys.maxsize > 2 ** 32
+        return f'.cp{sys.version_info[0]}{sys.version_info[1]}-{"win_amd64" if is_64bits else "win32"}.pyd'
+
+    def version(self):
+        # cl prints its version when run without arguments
+        return tool_version((self.cl_path,)).partition('\n')[0]
+
+    def compile_args(self, src, obj, include_dirs, optimization, is_cpp):
+        return [
+            self.cl_path, '/nologo', '/c', '/EHsc', '/utf-8', optimization,
+            '/Tp', str(src),
+            '/Fo:' + str(obj),
+            *self.extra_compile_args,
+            *it.chain.from_iterable(('/I', i) for i in include_dirs),
+        ]
+
+    def preprocess_args(self, src, include_dirs, is_cpp):
+        return [
+            self.cl_path, '/nologo', '/E', '/EHsc', '/utf-8',
+            '/Tp', str(src),
+            *it.chain.from_iterable(('/I', i) for i in include_dirs),
+        ]
+
+    def precompiled(self, header, tmpdir, include_dirs, optimization):
+        optimization = self.normalize_optimization(optimization)
+        pch_dir = tmpdir / 'pch'
+        pch_dir.mkdir(parents=True, exist_ok=True)
+        pch = pch_dir / (Path(header).name + '.pch')
+        # cl creates precompiled headers by compiling a source file that includes them
+        stub = pch_dir / (Path(header).stem + '_pch.cpp')
+        stub.write_text(f'#include "{header}"\n')
+        self.run([
+            self.cl_path, '/nologo', '/c', '/EHsc', '/utf-8', optimization,
+            '/Yc' + header, '/Fp' + str(pch),
+            '/Tp', str(stub),
+            '/Fo:' + str(pch_dir / (stub.stem + self.object_suffix)),
+            *self.extra_compile_args,
+            *it.chain.from_iterable(('/I', i) for i in include_dirs),
+        ], 'precompile ' + header)
+        return type(self)(self.cl_path, [*self.extra_compile_args, '/FI' + header, '/Yu' + header, '/Fp' + str(pch)])
+
+    def link_args(self, objs, out, tmpdir, lib_paths):
+        return [
+            self.cl_path, '/nologo', '/LD',
+            *(str(o) for o in objs),
+            '/link',
+            *it.chain.from_iterable(('/LIBPATH', l) for l in lib_paths),
+            '/IMPLIB:' + str(tmpdir / (out.name.split('.', 1)[0] + '.lib')),
+            '/OUT:' + str(out)
+        ]
+
+
+class GCCBackend(CompilerBackend):
+    """A backend for gcc, clang, or any other compiler with a gcc-compatible command line"""
+    optimization_aliases = {'/Od': '-O0', '/O1': '-O1', '/O2': '-O2', '/Ox': '-O3'}
+
+    def __init__(self, cxx: str = ..., cc: str = ..., std='c++14', extra_compile_args: Sequence[str] = (),
+                 extra_link_args: Sequence[str] = ()):
+        """
+        :param cxx: the c++ compiler, default is the CXX environment variable, or the compiler python was built with
+        :param cc: the c compiler, default is the CC environment variable, or the compiler python was built with
+        :param std: the c++ standard to compile with
+        :param extra_compile_args: additional arguments to every compilation
+        :param extra_link_args: additional arguments to the linking
+        """
+        if cxx is ...:
+            cxx = os.environ.get('CXX') or self._config_compiler('CXX', 'g++')
+        if cc is ...:
+            cc = os.environ.get('CC') or self._config_compiler('CC', 'gcc')
+        self.cxx = cxx
+        self.cc = cc
+        self.std = std
+        self.extra_compile_args = list(extra_compile_args)
+        self.extra_link_args = list(extra_link_args)
+
+    @staticmethod
+    def _config_compiler(var, default):
+        ret = sysconfig.get_config_var(var)
+        if ret:
+            # the config var might include flags (like "gcc -pthread")
+            ret = ret.split()[0]
+            if shutil.which(ret):
+                return ret
+        return default
+
+    def version(self):
+        return tool_version((self.cxx, '--version')) + '\n' + tool_version((self.cc, '--version'))
+
+    def _language(self, is_cpp):
+        """
+        :return: the compiler and language arguments for a translation unit
+        """
+        if is_cpp:
+            return self.cxx, ('-x', 'c++', '-std=' + self.std)
+        return self.cc, ('-x', 'c')
+
+    def compile_args(self, src, obj, include_dirs, optimization, is_cpp):
+        compiler, lang = self._language(is_cpp)
+        return [
+            compiler, '-c', '-fPIC', '-fvisibility=hidden', optimization,
+            *lang,
+            *self.extra_compile_args,
+            *('-I' + i for i in include_dirs),
+            str(src),
+            '-o', str(obj)
+        ]
+
+    def preprocess_args(self, src, include_dirs, is_cpp):
+        compiler, lang = self._language(is_cpp)
+        return [
+            compiler, '-E',
+            *lang,
+            *self.extra_compile_args,
+            *('-I' + i for i in include_dirs),
+            str(src)
+        ]
+
+    def precompiled(self, header, tmpdir, include_dirs, optimization):
+        optimization = self.normalize_optimization(optimization)
+        pch_dir = tmpdir / 'pch'
+        pch = pch_dir / (header + '.gch')
+        pch.parent.mkdir(parents=True, exist_ok=True)
+        self.run([
+            self.cxx, '-fPIC', '-fvisibility=hidden', optimization,
+            '-x', 'c++-header', '-std=' + self.std,
+            *self.extra_compile_args,
+            *('-I' + i for i in include_dirs),
+            str(self._find_header(header, include_dirs)),
+            '-o', str(pch)
+        ], 'precompile ' + header)
+        # the compiler uses <header>.gch instead of the header if it is found first in the include path, and if it is
+        # included before any other code (which -include ensures)
+        return type(self)(self.cxx, self.cc, self.std,
+                          [*self.extra_compile_args, '-I' + str(pch_dir), '-include', header],
+                          self.extra_link_args)
+
+    def link_args(self, objs, out, tmpdir, lib_paths):
+        # extension modules are not linked to libpython, the symbols are resolved by the interpreter
+        platform_args = ('-undefined', 'dynamic_lookup') if sys.platform == 'darwin' else ()
+        return [
+            self.cxx, '-shared',
+            *(str(o) for o in objs),
+            *platform_args,
+            *(('-L' + l) if os.path.isdir(l) else l for l in lib_paths),
+            *self.extra_link_args,
+            '-o', str(out)
+        ]
+
+
+class CompilerCache(ABC):
+    """A cache of object files, used by CompilerBackend.build to avoid recompiling unchanged translation units"""
+
+    @abstractmethod
+    def compile(self, backend: CompilerBackend, src: Path, obj: Path, include_dirs: Sequence[str], optimization: str,
+                is_cpp: bool):
+        """
+        compile a translation unit to an object file, or retrieve the object file from the cache
+        """
+
+
+class ExternalCompilerCache(CompilerCache):
+    """A compiler cache that prefixes compilations with an external tool (like ccache or sccache)"""
+
+    def __init__(self, tool: str):
+        """
+        :param tool: the path to the caching tool
+        """
+        self.tool = tool
+
+    def compile(self, backend, src, obj, include_dirs, optimization, is_cpp):
+        return backend.run([self.tool, *backend.compile_args(src, obj, include_dirs, optimization, is_cpp)],
+                           str(src.name))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.tool!r})'
+
+
+class LocalCompilerCache(CompilerCache):
+    """
+    A compiler cache that stores object files in a local directory, keyed by a hash of the preprocessed translation
+    unit, the compiler version and the compilation arguments.
+    """
+    default_cache_dir = ...  # the default directory, ... for <user cache directory>/swimport/objects
+
+    def __init__(self, cache_dir: Union[str, Path, None] = None):
+        """
+        :param cache_dir: the directory to store the object files in, default is default_cache_dir
+        """
+        if cache_dir is None:
+            cache_dir = self.default_cache_dir
+        if cache_dir is ...:
+            cache_dir = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'swimport' / 'objects'
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, backend: CompilerBackend, src: Path, include_dirs: Sequence[str], optimization: str,
+            is_cpp: bool) -> Optional[str]:
+        """
+        :return: the key of a translation unit in the cache, or None if it could not be preprocessed
+        """
+        proc = subprocess.run(backend.preprocess_args(src, include_dirs, is_cpp), stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL)
+        if proc.returncode != 0:
+            return None
+        h = sha256()
+        # the object path does not affect its content, so it is not a part of the key
+        for a in (type(backend).__name__, backend.version(),
+                  *backend.compile_args(src, Path('obj'), include_dirs, optimization, is_cpp)):
+            h.update(str(a).encode('utf-8'))
+            h.update(b'\0')
+        h.update(proc.stdout)
+        return h.hexdigest()
+
+    def compile(self, backend, src, obj, include_dirs, optimization, is_cpp):
+        key = self.key(backend, src, include_dirs, optimization, is_cpp)
+        cached = None
+        if key is not None:
+            cached = self.cache_dir / key[:2] / (key + backend.object_suffix)
+            if cached.is_file():
+                shutil.copyfile(cached, obj)
+                self.hits += 1
+                return
+        self.misses += 1
+        # if the translation unit could not be preprocessed, compiling it will raise the appropriate error
+        backend.run(backend.compile_args(src, obj, include_dirs, optimization, is_cpp), str(src.name))
+        if cached is not None:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            # copy then rename, so that concurrent builds never see a partial object file
+            fd, temp_path = tempfile.mkstemp(dir=cached.parent, suffix='.tmp')
+            os.close(fd)
+            shutil.copyfile(obj, temp_path)
+            os.replace(temp_path, cached)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({str(self.cache_dir)!r})'
+
+
+def default_compiler_cache() -> CompilerCache:
+    """
+    :return: a compiler cache using sccache or ccache if either is installed, or a LocalCompilerCache otherwise
+    """
+    for tool in ('sccache', 'ccache'):
+        path = shutil.which(tool)
+        if path:
+            return ExternalCompilerCache(path)
+    return LocalCompilerCache()
+
+
+def default_backend(swimport_paths=None) -> CompilerBackend:
+    """
+    :return: the default backend of the platform, MSVC on windows, gcc-compatible otherwise
+    """
+    if sys.platform == 'win32':
+        if swimport_paths is not None and swimport_paths.CL_PATH:
+            return MSVCBackend(swimport_paths.CL_PATH)
+        return MSVCBackend()
+    if swimport_paths is not None and swimport_paths.CL_PATH:
+        return GCCBackend(swimport_paths.CL_PATH)
+    return GCCBackend()
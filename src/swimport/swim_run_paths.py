@@ -1,5 +1,7 @@
 import os
 import sys
+import shutil
+import sysconfig
 from swimport.swim_run import swimport_paths_tuple
 
 
@@ -47,3 +49,37 @@ def get_path_set(python_ver=None, msvc=2019, msvc_pro=True, win10_sdk='10.0.1836
         SWIG_PATH, PYTHON_ROOT, windows_kit_template, msvc_dir, np_include_path, PY_INCLUDE_PATH,
         PY_LIB_PATH, windows_kit_include, windows_kit_lib, CL_PATH, COMPILE_ADDITIONAL_INCLUDE_DIRS,
         COMPILE_ADDITIONAL_LIBS)
+
+
+def get_unix_path_set(compiler=None, swig=None) -> swimport_paths_tuple:
+    """
+    get the paths for building with gcc or clang (see swim_run_backends.GCCBackend)
+    :param compiler: the c++ compiler, default is the CXX environment variable, or g++
+    :param swig: the swig executable, default is the SWIG environment variable, or swig
+    """
+    PYTHON_ROOT = sysconfig.get_config_var('prefix')
+    SWIG_PATH = swig or os.environ.get('SWIG') or shutil.which('swig') or 'swig'
+    CL_PATH = compiler or os.environ.get('CXX') or 'g++'
+    PY_INCLUDE_PATH = sysconfig.get_paths()['include']
+    PY_LIB_PATH = sysconfig.get_config_var('LIBDIR')
+    try:
+        import numpy
+    except ImportError:
+        np_include_path = None
+        COMPILE_ADDITIONAL_INCLUDE_DIRS = []
+    else:
+        np_include_path = numpy.get_include()
+        COMPILE_ADDITIONAL_INCLUDE_DIRS = [np_include_path]
+    return swimport_paths_tuple(
+        SWIG_PATH, PYTHON_ROOT, None, None, np_include_path, PY_INCLUDE_PATH,
+        PY_LIB_PATH, None, None, CL_PATH, COMPILE_ADDITIONAL_INCLUDE_DIRS,
+        [])
+
+
+def get_default_path_set(**kwargs) -> swimport_paths_tuple:
+    """
+    get the paths for the current platform, arguments are forwarded to get_path_set or get_unix_path_set
+    """
+    if sys.platform == 'win32':
+        return get_path_set(**kwargs)
+    return get_unix_path_set(**kwargs)
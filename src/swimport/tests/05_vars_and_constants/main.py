@@ -4,6 +4,9 @@ src = FileSource('src.h')
 swim = Swim('example')
 swim(pools.include(src))
 
+# variable name triggers only check the variables of that name in the source
+assert [src[i].name for i in Variable.Trigger('taste').candidates(src.name_index)] == ['taste']
+
 assert 'taste' in swim(
     ('taste' >> VariableGetSetBehaviour())(src)
 )
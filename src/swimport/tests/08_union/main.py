@@ -1,5 +1,8 @@
 from swimport.all import *
 
+# unions are indexed by their names without the union prefix, even before the source's objects are created
+ContainerSwim('Padded', FileSource('src.h'))
+
 src = FileSource('src.h')
 swim = Swim('example')
 swim(pools.include(src))
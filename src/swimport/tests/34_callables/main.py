@@ -1,9 +1,8 @@
 from swimport.all import *
 
 src = FileSource('src.h')
-swim = Swim('example')
+swim = Swim('example', runtime=True)
 swim(pools.include(src))
-swim(pools.include('../resources/pycall_surrogate.h'))
 
 swim(pools.primitive)
 swim(pools.std_string)
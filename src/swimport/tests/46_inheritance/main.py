@@ -6,6 +6,10 @@ swim(pools.include(src))
 swim(pools.include('../resources/cpp_iterable.h'))
 swim(pools.primitive)
 
+# container name triggers only check the containers of that name in the source
+assert [src[i].name for i in Container.Trigger('Circle').candidates(src.name_index)] == ['Circle']
+assert len(Container.Trigger('.*e').candidates(src.name_index)) == 3
+
 cswim = ContainerSwim('Shape', src)
 assert cswim(... >> FunctionBehaviour())
 assert swim(cswim)
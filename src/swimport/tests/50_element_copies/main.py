@@ -0,0 +1,38 @@
+from swimport.all import *
+
+src = FileSource('src.h')
+swim = Swim('example', runtime=True)
+swim(pools.include(src))
+
+swim(pools.primitive(additionals=False, out_iterable_types=(), in_iterable_types=()))
+swim(pools.std_string(out_iterable_types=(), in_iterable_types=()))
+
+# every element is converted to a capsule that owns a heap Counted, that is moved from the elements of values that are
+# discarded after the conversion, and copied from the elements of other values
+assert swim(
+    TypeSwimporting('Counted', 'object',
+                    to_py=FunctionBody("""
+                    auto ret = PyCapsule_New(new Counted(input), "Counted",
+                                             [](PyObject* c){delete (Counted*)PyCapsule_GetPointer(c, "Counted");});
+                    ok = (ret != nullptr);
+                    return ret;
+                    """, rvalue_body="""
+                    auto ret = PyCapsule_New(new Counted(std::move(input)), "Counted",
+                                             [](PyObject* c){delete (Counted*)PyCapsule_GetPointer(c, "Counted");});
+                    ok = (ret != nullptr);
+                    return ret;
+                    """),
+                    out_iterable_types=(), in_iterable_types=())
+)
+assert swim(pools.list('Counted'))
+assert swim(pools.map('int', 'Counted'))
+# strings and rows have no rvalue conversions, they are converted by reference
+assert swim(pools.list('std::string'))
+assert swim(pools.list('double'))
+assert swim(pools.list('std::vector<double>'))
+
+assert swim(Function.Behaviour()(src)) == 9
+assert swim(('kept' >> Variable.Behaviour(immutable=True))(src))
+
+swim.write('example.i')
+print('ok!')
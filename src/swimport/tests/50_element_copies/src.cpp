@@ -0,0 +1,104 @@
+#include "src.h"
+
+#include <cstdlib>
+#include <new>
+#include <tuple>
+#include <utility>
+
+static int copy_count = 0;
+static int move_count = 0;
+static int live_count = 0;
+
+Counted::Counted(int value): value(value){
+    live_count++;
+}
+
+Counted::Counted(Counted const & other): value(other.value){
+    live_count++;
+    copy_count++;
+}
+
+Counted::Counted(Counted&& other): value(other.value){
+    live_count++;
+    move_count++;
+}
+
+Counted::~Counted(){
+    live_count--;
+}
+
+int copies(){
+    return copy_count;
+}
+
+int moves(){
+    return move_count;
+}
+
+int live(){
+    return live_count;
+}
+
+void reset_counts(){
+    copy_count = 0;
+    move_count = 0;
+}
+
+// the elements are constructed in place, so the function itself neither copies nor moves them
+std::vector<Counted> counted_list(int count){
+    std::vector<Counted> ret;
+    ret.reserve(count);
+    for (int i = 0; i < count; i++)
+        ret.emplace_back(i);
+    return ret;
+}
+
+std::unordered_map<int, Counted> counted_map(int count){
+    std::unordered_map<int, Counted> ret;
+    ret.reserve(count);
+    for (int i = 0; i < count; i++)
+        ret.emplace(std::piecewise_construct, std::forward_as_tuple(i), std::forward_as_tuple(i));
+    return ret;
+}
+
+std::vector<Counted> kept = counted_list(10);
+
+static size_t allocation_count = 0;
+
+void* operator new(size_t size){
+    allocation_count++;
+    void* ret = std::malloc(size ? size : 1);
+    if (!ret)
+        throw std::bad_alloc();
+    return ret;
+}
+
+void operator delete(void* p) noexcept{
+    std::free(p);
+}
+
+void operator delete(void* p, size_t) noexcept{
+    std::free(p);
+}
+
+size_t allocations(){
+    return allocation_count;
+}
+
+// allocates count+1 times (the strings are longer than the small string buffer)
+std::vector<std::string> words(int count, int length){
+    std::vector<std::string> ret;
+    ret.reserve(count);
+    for (int i = 0; i < count; i++)
+        ret.emplace_back(length, (char)('a' + i % 26));
+    return ret;
+}
+
+// allocates count+1 times
+std::vector<std::vector<double>> rows(int count, int length){
+    std::vector<std::vector<double>> ret;
+    ret.reserve(count);
+    for (int i = 0; i < count; i++)
+        ret.emplace_back(length, (double)i);
+    return ret;
+}
@@ -0,0 +1,35 @@
+# pragma once
+
+#include <cstddef>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+// an element type that counts its copies and moves
+struct Counted{
+    int value;
+
+    Counted(int value = 0);
+    Counted(Counted const & other);
+    Counted(Counted&& other);
+    ~Counted();
+    Counted& operator=(Counted const & other) = default;
+    Counted& operator=(Counted&& other) = default;
+};
+
+int copies();
+int moves();
+// the number of Counted objects that were not destroyed
+int live();
+void reset_counts();
+
+std::vector<Counted> counted_list(int count);
+std::unordered_map<int, Counted> counted_map(int count);
+
+extern std::vector<Counted> kept;
+
+// the number of times operator new was called in the module
+size_t allocations();
+
+std::vector<std::string> words(int count, int length);
+std::vector<std::vector<double>> rows(int count, int length);
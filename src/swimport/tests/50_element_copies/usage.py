@@ -0,0 +1,64 @@
+import gc
+
+import example
+
+from swimport.tests.resources import *
+
+
+def counts(func, *args):
+    example.reset_counts()
+    ret = func(*args)
+    return ret, (example.copies(), example.moves())
+
+
+count = 100
+live = example.live()
+
+# the elements of a returned vector are moved to their capsules, and are never copied
+elements, copies_and_moves = counts(example.counted_list, count)
+assert_eq(len(elements), count)
+assert_eq(type(elements[0]).__name__, 'PyCapsule')
+assert_eq(copies_and_moves, (0, count))
+# the returned vector was destroyed, the capsules own the only remaining elements
+assert_eq(example.live() - live, count)
+del elements
+gc.collect()
+assert_eq(example.live(), live)
+
+# the keys of a map are const, but its values are moved
+elements, copies_and_moves = counts(example.counted_map, count)
+assert_eq(len(elements), count)
+assert_eq(type(elements[0]).__name__, 'PyCapsule')
+assert_eq(copies_and_moves, (0, count))
+del elements
+gc.collect()
+assert_eq(example.live(), live)
+
+# a variable is not discarded after the conversion, so its elements are copied, but only once
+elements, copies_and_moves = counts(lambda: example.cvar.kept)
+assert_eq(len(elements), 10)
+assert_eq(copies_and_moves, (10, 0))
+del elements
+gc.collect()
+assert_eq(example.live(), live)
+
+
+def allocations(func, *args):
+    before = example.allocations()
+    ret = func(*args)
+    return ret, example.allocations() - before
+
+
+length = 100
+
+# the strings are converted by reference, so the only allocations are those of the function itself
+words, allocated = allocations(example.words, count, length)
+assert_eq(len(words), count)
+assert_eq(words[27], 'b' * length)
+assert_eq(allocated, count + 1)
+
+# so are the rows, their buffers are not copied
+rows, allocated = allocations(example.rows, count, length)
+assert_eq(len(rows), count)
+assert_eq(rows[5], [5.0] * length)
+assert_eq(allocated, count + 1)
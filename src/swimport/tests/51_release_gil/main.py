@@ -0,0 +1,16 @@
+from swimport.all import *
+
+src = FileSource('src.h')
+swim = Swim('example')
+swim(pools.include(src))
+
+assert swim(('wait' >> Function.Behaviour(release_gil=True))(src))
+assert swim(('checked_wait' >> Function.Behaviour(release_gil=True, exception_check=...))(src))
+
+cswim = ContainerSwim('Waiter', src)
+assert cswim('wait' >> FunctionBehaviour(release_gil=True))
+cswim(... >> FunctionBehaviour())
+assert swim(cswim)
+
+swim.write('example.i')
+print('ok!')
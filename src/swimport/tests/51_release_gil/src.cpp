@@ -0,0 +1,20 @@
+#include "src.h"
+
+#include <chrono>
+#include <thread>
+#include <stdexcept>
+
+int wait(int ms){
+    std::this_thread::sleep_for(std::chrono::milliseconds(ms));
+    return ms;
+}
+int checked_wait(int ms){
+    if (ms < 0)
+        throw std::invalid_argument("negative wait");
+    return wait(ms);
+}
+
+Waiter::Waiter(int ms): ms(ms) {}
+int Waiter::wait() const{
+    return ::wait(ms);
+}
@@ -0,0 +1,12 @@
+# pragma once
+
+// sleep for a number of milliseconds, and return them
+int wait(int ms);
+// as wait, but throws if ms is negative
+int checked_wait(int ms);
+
+struct Waiter{
+    int ms;
+    Waiter(int ms);
+    int wait() const;
+};
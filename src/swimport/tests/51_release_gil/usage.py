@@ -0,0 +1,32 @@
+from threading import Thread
+from time import perf_counter
+
+import example
+
+from swimport.tests.resources import *
+
+
+def concurrent_time(func, *args, threads=4):
+    workers = [Thread(target=func, args=args) for _ in range(threads)]
+    start = perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return perf_counter() - start
+
+
+ms = 200
+# the GIL is released while the functions wait, so the threads wait concurrently
+assert_eq(example.wait(ms), ms)
+assert_lt(concurrent_time(example.wait, ms), 2 * ms / 1000)
+
+assert_eq(example.checked_wait(ms), ms)
+assert_lt(concurrent_time(example.checked_wait, ms), 2 * ms / 1000)
+# the GIL is re-acquired before the exception is converted
+with AssertError(ValueError, 'negative wait'):
+    example.checked_wait(-1)
+
+waiter = example.Waiter(ms)
+assert_eq(waiter.wait(), ms)
+assert_lt(concurrent_time(waiter.wait), 2 * ms / 1000)
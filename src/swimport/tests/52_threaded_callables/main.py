@@ -0,0 +1,18 @@
+from swimport.all import *
+
+src = FileSource('src.h')
+swim = Swim('example', runtime=True)
+swim(pools.include(src))
+
+swim(pools.primitive)
+
+# the callables are called from other threads, while the functions run without the GIL
+swim(pools.callable('int', 'int', thread_safe=True))
+swim(pools.callable('void', 'int', batch_size=16))
+
+assert swim(
+    Function.Behaviour(release_gil=True, exception_check=...)(src)
+)
+
+swim.write('example.i')
+print('ok!')
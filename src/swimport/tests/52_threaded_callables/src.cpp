@@ -0,0 +1,33 @@
+#include "src.h"
+
+#include <future>
+#include <vector>
+
+long long parallel_sum(std::function<int(int)> f, int n, int threads){
+    std::vector<std::future<long long>> parts;
+    for (int t = 0; t < threads; t++){
+        parts.push_back(std::async(std::launch::async, [f, n, t, threads]{
+            long long ret = 0;
+            for (int i = t; i < n; i += threads)
+                ret += f(i);
+            return ret;
+        }));
+    }
+    long long ret = 0;
+    // exceptions thrown in the threads are re-thrown here
+    for (auto & part: parts)
+        ret += part.get();
+    return ret;
+}
+
+void parallel_report(std::function<void(int)> f, int n, int threads){
+    std::vector<std::future<void>> parts;
+    for (int t = 0; t < threads; t++){
+        parts.push_back(std::async(std::launch::async, [f, n, t, threads]{
+            for (int i = t; i < n; i += threads)
+                f(i);
+        }));
+    }
+    for (auto & part: parts)
+        part.get();
+}
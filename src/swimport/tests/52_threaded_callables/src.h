@@ -0,0 +1,8 @@
+# pragma once
+
+#include <functional>
+
+// call f(i) for every i in [0, n) from a number of threads, and return the sum of the results
+long long parallel_sum(std::function<int(int)> f, int n, int threads);
+// call f(i) for every i in [0, n) from a number of threads
+void parallel_report(std::function<void(int)> f, int n, int threads);
@@ -0,0 +1,35 @@
+import traceback
+from threading import get_ident
+
+import example
+
+from swimport.tests.resources import *
+
+n = 1000
+threads = set()
+
+
+def square(i):
+    threads.add(get_ident())
+    return i * i
+
+
+assert_eq(example.parallel_sum(square, n, 4), sum(i * i for i in range(n)))
+assert_gt(len(threads), 1)
+
+
+def fail_at_7(i):
+    if i == 7:
+        raise ValueError('seven')
+    return i
+
+
+# the exception raised in the callback is raised as is, with its traceback
+with AssertError(ValueError, 'seven') as err:
+    example.parallel_sum(fail_at_7, n, 4)
+assert_in('fail_at_7', [frame.name for frame in traceback.extract_tb(err.exception.__traceback__)])
+
+# the calls are delivered in batches, and the last batch is delivered once the function is released
+reported = []
+example.parallel_report(reported.append, n, 4)
+assert_eq(sorted(reported), list(range(n)))
@@ -0,0 +1,26 @@
+import warnings
+
+from swimport.all import *
+
+src = FileSource('src.h')
+swim = Swim('example')
+swim(pools.include(src))
+
+assert swim(('wait' >> Function.Behaviour(async_=True))(src))
+assert swim(('checked_wait' >> Function.Behaviour(async_=True, exception_check=...))(src))
+assert swim(('lambda' >> Function.Behaviour(async_=True))(src))
+# the companions are named after the names that the functions are exported as, functions that swig ignores are skipped
+with warnings.catch_warnings(record=True) as caught:
+    warnings.simplefilter('always')
+    assert swim((r'operator\+' >> Function.Behaviour(async_=True))(src))
+assert len(caught) == 1
+
+cswim = ContainerSwim('Waiter', src)
+assert cswim('wait' >> FunctionBehaviour(async_=True))
+assert cswim('wait_for' >> FunctionBehaviour(async_=True))
+assert cswim(r'operator\(\)' >> FunctionBehaviour(async_=True))
+cswim(... >> FunctionBehaviour())
+assert swim(cswim)
+
+swim.write('example.i')
+print('ok!')
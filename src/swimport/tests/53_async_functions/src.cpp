@@ -0,0 +1,33 @@
+#include "src.h"
+
+#include <chrono>
+#include <thread>
+#include <stdexcept>
+
+int wait(int ms){
+    std::this_thread::sleep_for(std::chrono::milliseconds(ms));
+    return ms;
+}
+int checked_wait(int ms){
+    if (ms < 0)
+        throw std::invalid_argument("negative wait");
+    return wait(ms);
+}
+int lambda(int ms){
+    return wait(ms);
+}
+
+Waiter::Waiter(int ms): ms(ms) {}
+int Waiter::wait() const{
+    return ::wait(ms);
+}
+int Waiter::wait_for(int ms){
+    return ::wait(ms);
+}
+int Waiter::operator()(int ms) const{
+    return ::wait(ms);
+}
+
+Waiter operator+(Waiter const & a, Waiter const & b){
+    return Waiter(a.ms + b.ms);
+}
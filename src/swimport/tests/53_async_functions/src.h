@@ -0,0 +1,20 @@
+# pragma once
+
+// sleep for a number of milliseconds, and return them
+int wait(int ms);
+// as wait, but throws if ms is negative
+int checked_wait(int ms);
+// as wait, exported as _lambda (lambda is a python keyword)
+int lambda(int ms);
+
+struct Waiter{
+    int ms;
+    Waiter(int ms);
+    int wait() const;
+    static int wait_for(int ms);
+    // as wait_for, exported as __call__ (its companion is call_async)
+    int operator()(int ms) const;
+};
+
+// swig ignores operators outside of classes
+Waiter operator+(Waiter const & a, Waiter const & b);
@@ -0,0 +1,52 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+import example
+
+from swimport.tests.resources import *
+
+
+def gather_time(*coroutines):
+    async def gather():
+        return await asyncio.gather(*coroutines)
+
+    start = perf_counter()
+    ret = asyncio.run(gather())
+    return ret, perf_counter() - start
+
+
+ms = 200
+assert_eq(example.wait(ms), ms)
+# the functions release the GIL, so the executor's threads wait concurrently
+results, t = gather_time(*(example.wait_async(ms) for _ in range(4)))
+assert_eq(results, [ms] * 4)
+assert_lt(t, 2 * ms / 1000)
+
+results, t = gather_time(*(example.checked_wait_async(ms) for _ in range(4)))
+assert_eq(results, [ms] * 4)
+assert_lt(t, 2 * ms / 1000)
+# exceptions are raised from the coroutine
+with AssertError(ValueError, 'negative wait'):
+    asyncio.run(example.checked_wait_async(-1))
+
+waiter = example.Waiter(ms)
+results, t = gather_time(*(waiter.wait_async() for _ in range(4)))
+assert_eq(results, [ms] * 4)
+assert_lt(t, 2 * ms / 1000)
+results, t = gather_time(*(example.Waiter.wait_for_async(ms) for _ in range(4)))
+assert_eq(results, [ms] * 4)
+assert_lt(t, 2 * ms / 1000)
+
+# the companions of renamed functions are named after the exported names
+assert_eq(asyncio.run(example._lambda_async(ms)), ms)
+assert_eq(asyncio.run(waiter.call_async(ms)), ms)
+assert_false(hasattr(example, 'operator+_async'))
+
+# with a single worker, the calls run one after the other
+example.async_executor = ThreadPoolExecutor(1)
+results, t = gather_time(*(example.wait_async(ms) for _ in range(3)))
+assert_eq(results, [ms] * 3)
+assert_ge(t, 3 * ms / 1000 * 0.9)
+example.async_executor.shutdown()
+example.async_executor = None
@@ -0,0 +1,17 @@
+from swimport.all import *
+
+src = FileSource('src.h')
+swim = Swim('example', runtime=True)
+swim(pools.include(src))
+
+swim(pools.primitive(additionals=False, out_iterable_types=(), in_iterable_types=()))
+
+assert swim(pools.iter('double', output='numpy'))
+assert swim(pools.iter('int', output='numpy'))
+assert swim(pools.iter('float', output='numpy'))
+
+assert swim(Function.Behaviour()(src)) == 4
+assert swim(('squares' >> Variable.Behaviour(immutable=True))(src))
+
+swim.write('example.i')
+print('ok!')
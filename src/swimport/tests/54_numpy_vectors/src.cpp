@@ -0,0 +1,52 @@
+#include "src.h"
+
+#include <cstdlib>
+#include <new>
+
+static size_t live_count = 0;
+
+void* operator new(size_t size){
+    void* ret = std::malloc(size ? size : 1);
+    if (!ret)
+        throw std::bad_alloc();
+    live_count++;
+    return ret;
+}
+
+void operator delete(void* p) noexcept{
+    if (!p)
+        return;
+    live_count--;
+    std::free(p);
+}
+
+void operator delete(void* p, size_t) noexcept{
+    operator delete(p);
+}
+
+size_t live_allocations(){
+    return live_count;
+}
+
+std::vector<double> ramp(int count){
+    std::vector<double> ret;
+    ret.reserve(count);
+    for (int i = 0; i < count; i++)
+        ret.push_back(i);
+    return ret;
+}
+
+std::vector<int> squares = [](){
+    std::vector<int> ret;
+    for (int i = 0; i < 10; i++)
+        ret.push_back(i*i);
+    return ret;
+}();
+
+void set_square(int i, int value){
+    squares[i] = value;
+}
+
+std::vector<float> nothing(){
+    return {};
+}
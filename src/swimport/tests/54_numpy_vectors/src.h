@@ -0,0 +1,14 @@
+# pragma once
+
+#include <vector>
+#include <cstddef>
+
+// the number of blocks allocated with operator new in the module, and not yet deleted
+size_t live_allocations();
+
+// 0, 1, ... count-1
+std::vector<double> ramp(int count);
+// squares[i] == i*i, unless changed with set_square
+extern std::vector<int> squares;
+void set_square(int i, int value);
+std::vector<float> nothing();
@@ -0,0 +1,48 @@
+import gc
+
+import example
+import numpy as np
+
+from swimport.tests.resources import *
+
+count = 1000
+before = example.live_allocations()
+# a returned vector is moved to a heap vector, that the array owns, and views the buffer of
+ramp = example.ramp(count)
+assert_isinstance(ramp, np.ndarray)
+assert_eq(ramp.dtype, np.float64)
+assert_true(np.array_equal(ramp, np.arange(count, dtype=np.float64)))
+assert_false(ramp.flags.owndata)
+assert_eq(type(ramp.base).__name__, 'PyCapsule')
+# the heap vector and its buffer
+assert_eq(example.live_allocations() - before, 2)
+# the views of the array keep the vector alive
+view = ramp[10:20]
+del ramp
+gc.collect()
+assert_eq(example.live_allocations() - before, 2)
+assert_true(np.array_equal(view, np.arange(10, 20, dtype=np.float64)))
+del view
+gc.collect()
+assert_eq(example.live_allocations(), before)
+
+# a variable is copied to a heap vector, so the array does not change with the variable
+squares = example.cvar.squares
+assert_eq(squares.dtype, np.intc)
+assert_eq(list(squares), [i * i for i in range(10)])
+example.set_square(3, -1)
+assert_eq(squares[3], 9)
+assert_eq(example.cvar.squares[3], -1)
+# the array is writable, and does not change the variable either
+squares[4] = 0
+assert_eq(example.cvar.squares[4], 16)
+del squares
+gc.collect()
+assert_eq(example.live_allocations(), before)
+
+# empty vectors are released immediately
+before = example.live_allocations()
+nothing = example.nothing()
+assert_eq(nothing.shape, (0,))
+assert_eq(nothing.dtype, np.float32)
+assert_eq(example.live_allocations(), before)
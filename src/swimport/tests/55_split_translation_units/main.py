@@ -0,0 +1,35 @@
+from swimport.all import *
+from swimport.translation_units import SplitFunctions
+
+src = FileSource('src.h')
+# the conversion functions are compiled in two translation units of their own
+swim = Swim('example', translation_units=2)
+swim(pools.include(src))
+# a header that only the conversions use, it is included in the translation units as well
+swim.add_insert('#include "polar.h"')
+swim(pools.primitive(additionals=False, out_iterable_types=(), in_iterable_types=()))
+
+assert swim(
+    TypeSwimporting('Point', 'Tuple[float, float]',
+                    to_py="""
+                    Polar p = to_polar(input.x, input.y);
+                    return Py_BuildValue("dd", p.r, p.theta);
+                    """,
+                    to_cpp="""
+                    if (!PyTuple_Check(input)) SWIM_RAISE_TYPE("expected a tuple of two floats, got ", input);
+                    double x, y;
+                    if (!PyArg_ParseTuple(input, "dd", &x, &y)) {ok=false; return {};}
+                    return {x, y};
+                    """,
+                    out_iterable_types=(), in_iterable_types=())
+)
+
+assert swim(Function.Behaviour()(src)) == 2
+
+swim.write('example.i')
+
+split = SplitFunctions.read('example' + SplitFunctions.suffix)
+assert any(name.endswith('ToPy__Point') for name in split.functions)
+assert any(name.endswith('ToCpp__Point') for name in split.functions)
+assert '#include "polar.h"' in split.begin
+print('ok!')
@@ -0,0 +1,12 @@
+# pragma once
+
+#include <cmath>
+
+// points are passed to python in polar coordinates
+struct Polar{
+    double r, theta;
+};
+
+inline Polar to_polar(double x, double y){
+    return {std::hypot(x, y), std::atan2(y, x)};
+}
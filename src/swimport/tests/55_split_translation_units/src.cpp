@@ -0,0 +1,11 @@
+#include "src.h"
+
+#include <cmath>
+
+Point midpoint(Point a, Point b){
+    return {(a.x + b.x) / 2, (a.y + b.y) / 2};
+}
+
+double norm(Point p){
+    return std::hypot(p.x, p.y);
+}
@@ -0,0 +1,8 @@
+# pragma once
+
+struct Point{
+    double x,y;
+};
+
+Point midpoint(Point a, Point b);
+double norm(Point p);
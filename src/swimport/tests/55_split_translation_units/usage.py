@@ -0,0 +1,15 @@
+from math import pi
+
+import example
+
+from swimport.tests.resources import *
+
+# points are returned in polar coordinates
+r, theta = example.midpoint((0, 0), (0, 4))
+assert_isclose(r, 2)
+assert_isclose(theta, pi / 2)
+assert_isclose(example.norm((3, 4)), 5)
+
+with AssertError(TypeError, 'error in converting parameter #1 in function norm: '
+                            "expected a tuple of two floats, got <class 'str'>"):
+    example.norm('a')
@@ -0,0 +1,31 @@
+from swimport.all import *
+
+src = FileSource('src.h')
+swim = Swim('example', runtime=True)
+swim(pools.include(src))
+swim(pools.primitive(additionals=False, out_iterable_types=(), in_iterable_types=()))
+swim(pools.std_string(out_iterable_types=(), in_iterable_types=()))
+swim(pools.pyObject())
+
+# the conversion of an argument by the typecheck of one overload is reused by the other overloads, and by the chosen
+# overload's conversion
+assert swim(
+    TypeSwimporting('Celsius', 'float',
+                    to_py="""
+                    return PyFloat_FromDouble(input.degrees);
+                    """,
+                    to_cpp="""
+                    count_conversion();
+                    double degrees = PyFloat_AsDouble(input);
+                    if (PyErr_Occurred() != nullptr) {ok=false; return {};}
+                    return {degrees};
+                    """,
+                    to_cpp_check=DefaultCppCheck(cache=True),
+                    out_iterable_types=(), in_iterable_types=())
+)
+assert swim(pools.iter('Celsius'))
+
+assert swim(Function.Behaviour()(src)) == 9
+
+swim.write('example.i')
+print('ok!')
@@ -0,0 +1,44 @@
+#include "src.h"
+
+#include <swimport/conversion_cache.h>
+
+static int conversion_count = 0;
+
+int conversions(){
+    return conversion_count;
+}
+
+void count_conversion(){
+    conversion_count++;
+}
+
+size_t memo_size(){
+    return py_cache::conversion_memo::get().size();
+}
+
+double describe(Celsius c, int offset){
+    return c.degrees + offset;
+}
+
+std::string describe(Celsius c, std::string const & unit){
+    return std::to_string((int)c.degrees) + unit;
+}
+
+double total(std::vector<Celsius> const & temperatures){
+    double ret = 0;
+    for (auto & t: temperatures)
+        ret += t.degrees;
+    return ret;
+}
+
+double total(Celsius temperature){
+    return temperature.degrees;
+}
+
+double measure(int offset, Celsius c, int scale){
+    return (c.degrees + offset) * scale;
+}
+
+double measure(PyObject* offset, PyObject* degrees, std::string const & unit){
+    return PyLong_AsLong(offset) + PyFloat_AsDouble(degrees);
+}
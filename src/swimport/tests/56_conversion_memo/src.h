@@ -0,0 +1,27 @@
+# pragma once
+
+#include <Python.h>
+#include <cstddef>
+#include <string>
+#include <vector>
+
+struct Celsius{
+    double degrees;
+};
+
+// the number of times python objects were converted to Celsius
+int conversions();
+void count_conversion();
+// the number of conversions in the current thread's memo
+size_t memo_size();
+
+double describe(Celsius c, int offset);
+std::string describe(Celsius c, std::string const & unit);
+
+double total(std::vector<Celsius> const & temperatures);
+double total(Celsius temperature);
+
+// the memo is only cleared by functions that use it. The first overload is checked first (since int precedes
+// PyObject*), so when the second one is chosen, the first one's typecheck leaves the conversion of c behind
+double measure(int offset, Celsius c, int scale);
+double measure(PyObject* offset, PyObject* degrees, std::string const & unit);
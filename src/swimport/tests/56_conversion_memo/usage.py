@@ -0,0 +1,48 @@
+import sys
+
+import example
+
+from swimport.tests.resources import *
+
+
+def conversions(func, *args):
+    before = example.conversions()
+    ret = func(*args)
+    return ret, example.conversions() - before
+
+
+# the argument is converted once, by the typecheck of the first overload that is checked
+ret, converted = conversions(example.describe, 20.5, 1)
+assert_eq(ret, 21.5)
+assert_eq(converted, 1)
+ret, converted = conversions(example.describe, 20.5, 'C')
+assert_eq(ret, '20C')
+assert_eq(converted, 1)
+
+
+# mutable arguments (and instances of subclasses, that might be mutable) are converted every time
+class Degrees(float):
+    pass
+
+
+ret, converted = conversions(example.describe, Degrees(20.5), 1)
+assert_eq(ret, 21.5)
+assert_ge(converted, 2)
+
+# the checks of the elements of iterables do not store their conversions, so nothing outlives the call
+temperature = float('21.5')
+refs = sys.getrefcount(temperature)
+for _ in range(100):
+    assert_eq(example.total([temperature, 1.0]), 22.5)
+assert_eq(sys.getrefcount(temperature), refs)
+assert_eq(example.total(temperature), 21.5)
+assert_eq(sys.getrefcount(temperature), refs)
+
+# conversions that no function takes out of the memo are released when the memo is full
+sizes = []
+for i in range(100):
+    assert_eq(example.measure(1, i + 0.5, 'C'), i + 1.5)
+    sizes.append(example.memo_size())
+assert_eq(max(sizes), 32)
+assert_eq(example.measure(1, 20.5, 2), 43)
+assert_eq(example.memo_size(), 0)
@@ -0,0 +1,16 @@
+from swimport.all import *
+
+src = FileSource('src.h')
+swim = Swim('example')
+swim(pools.include(src))
+swim(pools.primitive(additionals=False, out_iterable_types=(), in_iterable_types=()))
+# containers of arithmetic types copy matching buffers in one go
+assert swim(pools.list('int'))
+assert swim(pools.list('double'))
+assert swim(pools.list('unsigned char'))
+assert swim(pools.set('int'))
+
+assert swim(Function.Behaviour()(src)) == 4
+
+swim.write('example.i')
+print('ok!')
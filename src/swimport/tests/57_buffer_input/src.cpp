@@ -0,0 +1,14 @@
+#include "src.h"
+
+std::vector<int> ints(std::vector<int> values){
+    return values;
+}
+std::vector<double> doubles(std::vector<double> values){
+    return values;
+}
+std::vector<unsigned char> octets(std::vector<unsigned char> values){
+    return values;
+}
+std::unordered_set<int> distinct(std::unordered_set<int> values){
+    return values;
+}
@@ -0,0 +1,9 @@
+# pragma once
+
+#include <vector>
+#include <unordered_set>
+
+std::vector<int> ints(std::vector<int> values);
+std::vector<double> doubles(std::vector<double> values);
+std::vector<unsigned char> octets(std::vector<unsigned char> values);
+std::unordered_set<int> distinct(std::unordered_set<int> values);
@@ -0,0 +1,34 @@
+from array import array
+from pickle import PickleBuffer
+
+import example
+
+from swimport.tests.resources import *
+
+# matching buffers are copied in one go
+assert_eq(example.ints(array('i', [1, -2, 3])), [1, -2, 3])
+assert_eq(example.doubles(array('d', [0.5, 1.5])), [0.5, 1.5])
+assert_eq(example.octets(b'\x01\xff'), [1, 255])
+assert_eq(example.octets(bytearray(b'\x02\x03')), [2, 3])
+assert_eq(example.distinct(array('i', [3, 1, 3])), {1, 3})
+assert_eq(example.ints(array('i')), [])
+# a pickle buffer is not iterable, so it can only be converted through its buffer
+assert_eq(example.ints(PickleBuffer(array('i', [4, 5, 6]))), [4, 5, 6])
+
+# buffers of a different item size or kind are converted element by element, not reinterpreted
+assert_eq(example.ints(array('h', [1, -2])), [1, -2])
+assert_eq(example.ints(array('q', [4, 5])), [4, 5])
+assert_eq(example.doubles(array('f', [0.5, 1.5])), [0.5, 1.5])
+assert_eq(example.doubles(array('i', [1, 2])), [1.0, 2.0])
+
+# non-contiguous buffers are converted element by element
+assert_eq(example.ints(memoryview(array('i', range(10)))[::2]), [0, 2, 4, 6, 8])
+assert_eq(example.ints(memoryview(array('i', range(10)))[::-3]), [9, 6, 3, 0])
+
+# a float buffer is not read as ints, its elements fail to convert
+with AssertError(TypeError):
+    example.ints(array('f', [1.5]))
+with AssertError(TypeError):
+    example.doubles(PickleBuffer(array('f', [0.5])))
+with AssertError(TypeError):
+    example.ints(PickleBuffer(memoryview(array('i', range(10)))[::2]))
@@ -0,0 +1,35 @@
+from swimport.all import *
+
+src = FileSource('src.h')
+swim = Swim('example')
+swim(pools.include(src))
+swim(pools.primitive(additionals=False, blacklist='long', out_iterable_types=(), in_iterable_types=()))
+# long is converted by a function of our own, so lists of it cannot call PyLong_FromLong directly
+swim(TypeSwimporting('long', 'int',
+                     to_py="""
+                     if (input < 0){
+                        PyErr_SetString(PyExc_ValueError, "negative longs are not supported");
+                        ok = false;
+                        return nullptr;
+                     }
+                     return PyLong_FromLong(input * 10);
+                     """,
+                     to_cpp='return PyLong_AsLong(input);',
+                     out_iterable_types=(), in_iterable_types=()))
+
+assert swim(pools.list('int'))
+assert swim(pools.iter('double', output=tuple))
+assert swim(pools.list('bool'))
+assert swim(pools.iter('unsigned long long', output=tuple))
+assert swim(pools.list('long'))
+
+assert swim(Function.Behaviour()(src)) == 5
+
+swim.write('example.i')
+
+with open('example.i') as r:
+    interface = r.read()
+# the primitives of the primitive pool are converted inline
+assert 'PyBool_FromLong(e)' in interface
+assert 'PyFloat_FromDouble(e)' in interface
+print('ok!')
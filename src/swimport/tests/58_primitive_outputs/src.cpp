@@ -0,0 +1,32 @@
+#include "src.h"
+
+std::vector<int> count_to(int n){
+    std::vector<int> ret;
+    for (int i = 1; i <= n; i++)
+        ret.push_back(i);
+    return ret;
+}
+std::vector<double> halves(int n){
+    std::vector<double> ret;
+    for (int i = 0; i < n; i++)
+        ret.push_back(i / 2.0);
+    return ret;
+}
+std::vector<bool> parities(int n){
+    std::vector<bool> ret;
+    for (int i = 0; i < n; i++)
+        ret.push_back(i % 2 == 0);
+    return ret;
+}
+std::vector<unsigned long long> powers_of_two(int n){
+    std::vector<unsigned long long> ret;
+    for (int i = 0; i < n; i++)
+        ret.push_back(1ull << i);
+    return ret;
+}
+std::vector<long> longs(long start, int n){
+    std::vector<long> ret;
+    for (int i = 0; i < n; i++)
+        ret.push_back(start - i);
+    return ret;
+}
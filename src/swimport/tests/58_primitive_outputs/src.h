@@ -0,0 +1,9 @@
+# pragma once
+
+#include <vector>
+
+std::vector<int> count_to(int n);
+std::vector<double> halves(int n);
+std::vector<bool> parities(int n);
+std::vector<unsigned long long> powers_of_two(int n);
+std::vector<long> longs(long start, int n);
@@ -0,0 +1,29 @@
+import example
+
+from swimport.tests.resources import *
+
+# lists and tuples of primitives are converted inline
+c = example.count_to(5)
+assert_isinstance(c, list)
+assert_eq(c, [1, 2, 3, 4, 5])
+assert_eq(example.count_to(0), [])
+
+h = example.halves(4)
+assert_isinstance(h, tuple)
+assert_eq(h, (0.0, 0.5, 1.0, 1.5))
+assert_eq(example.halves(0), ())
+
+p = example.parities(4)
+assert_eq(p, [True, False, True, False])
+assert all(type(b) is bool for b in p)
+
+assert_eq(example.powers_of_two(64)[-1], 2 ** 63)
+assert_eq(len(example.powers_of_two(64)), 64)
+
+# a primitive with a conversion of our own is converted by it, and its errors are raised
+assert_eq(example.longs(3, 3), [30, 20, 10])
+with AssertError(ValueError, 'negative longs are not supported'):
+    example.longs(-1, 3)
+# the error is raised after some elements were already converted
+with AssertError(ValueError, 'negative longs are not supported'):
+    example.longs(1, 3)
@@ -0,0 +1,16 @@
+from swimport.all import *
+
+src = FileSource('src.h')
+swim = Swim('example')
+swim(pools.include(src))
+swim(pools.primitive(additionals=False, out_iterable_types=(), in_iterable_types=()))
+swim(pools.std_string(out_iterable_types=(), in_iterable_types=()))
+# unordered maps and sets are reserved with the input's length, ordered maps are not
+assert swim(pools.map('std::string', 'double'))
+assert swim(pools.map('int', 'int', cpp_name='std::map<?>'))
+assert swim(pools.set('int'))
+
+assert swim(Function.Behaviour()(src)) == 3
+
+swim.write('example.i')
+print('ok!')
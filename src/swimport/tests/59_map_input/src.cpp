@@ -0,0 +1,21 @@
+#include "src.h"
+
+double total(std::unordered_map<std::string, double> prices){
+    double ret = 0;
+    for (auto const & p: prices)
+        ret += p.second;
+    return ret;
+}
+std::map<int, int> inverted(std::map<int, int> mapping){
+    std::map<int, int> ret;
+    for (auto const & p: mapping)
+        ret[p.second] = p.first;
+    return ret;
+}
+std::unordered_set<int> evens(std::unordered_set<int> values){
+    std::unordered_set<int> ret;
+    for (auto v: values)
+        if (v % 2 == 0)
+            ret.insert(v);
+    return ret;
+}
@@ -0,0 +1,10 @@
+# pragma once
+
+#include <map>
+#include <string>
+#include <unordered_map>
+#include <unordered_set>
+
+double total(std::unordered_map<std::string, double> prices);
+std::map<int, int> inverted(std::map<int, int> mapping);
+std::unordered_set<int> evens(std::unordered_set<int> values);
@@ -0,0 +1,85 @@
+from collections import OrderedDict
+from types import MappingProxyType
+
+import example
+
+from swimport.tests.resources import *
+
+prices = {'apple': 1.5, 'pear': 2.0, 'plum': 0.5}
+
+# exact dicts are walked directly, other mappings and iterables of pairs are read through their keys or items
+assert_eq(example.total(prices), 4.0)
+assert_eq(example.total({}), 0.0)
+assert_eq(example.total(OrderedDict(prices)), 4.0)
+assert_eq(example.total(MappingProxyType(prices)), 4.0)
+assert_eq(example.total(prices.items()), 4.0)
+assert_eq(example.total(iter(prices.items())), 4.0)
+
+assert_eq(example.inverted({1: 10, 2: 20}), {10: 1, 20: 2})
+assert_eq(example.inverted([(3, 30)]), {30: 3})
+
+assert_eq(example.evens({1, 2, 3, 4}), {2, 4})
+assert_eq(example.evens(range(7)), {0, 2, 4, 6})
+assert_eq(example.evens(i for i in range(4)), {0, 2})
+
+
+class Price:
+    """
+    a price that adds an entry to its dict when it is converted
+    """
+
+    def __init__(self, owner, value):
+        self.owner = owner
+        self.value = value
+
+    def __float__(self):
+        self.owner['surprise'] = 0.0
+        return self.value
+
+
+class Dropping:
+    """
+    a price that removes itself from its dict when it is converted
+    """
+
+    def __init__(self, owner, value):
+        self.owner = owner
+        self.value = value
+
+    def __float__(self):
+        self.owner.clear()
+        return self.value
+
+
+changing = {'apple': 1.5}
+changing['pear'] = Price(changing, 2.0)
+with AssertError(RuntimeError, 'error in converting parameter #1 in function total: '
+                               'dictionary changed size during conversion'):
+    example.total(changing)
+
+# the value is held while it is converted, even though its dict drops it
+dropping = {'apple': 1.5}
+dropping['pear'] = Dropping(dropping, 2.0)
+with AssertError(RuntimeError, 'error in converting parameter #1 in function total: '
+                               'dictionary changed size during conversion'):
+    example.total(dropping)
+
+
+class BadHint:
+    """
+    an iterable whose length hint raises
+    """
+
+    def __iter__(self):
+        return iter([(1, 2), (2, 4)])
+
+    def __length_hint__(self):
+        raise ValueError('no hint')
+
+
+with AssertError(ValueError):
+    example.total(BadHint())
+with AssertError(ValueError):
+    example.evens(BadHint())
+# ordered maps are not reserved, so their length hint is never called
+assert_eq(example.inverted(BadHint()), {2: 1, 4: 2})
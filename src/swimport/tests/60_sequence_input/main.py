@@ -0,0 +1,15 @@
+from swimport.all import *
+
+src = FileSource('src.h')
+swim = Swim('example')
+swim(pools.include(src))
+swim(pools.primitive(additionals=False, out_iterable_types=(), in_iterable_types=()))
+# exact lists and tuples are read directly, without an iterator
+assert swim(pools.list('double'))
+assert swim(pools.array('double', 3))
+swim(pools.slice('int', ..., ...))
+
+assert swim(Function.Behaviour()(src)) == 3
+
+swim.write('example.i')
+print('ok!')
@@ -0,0 +1,16 @@
+#include "src.h"
+
+std::vector<double> doubled(std::vector<double> values){
+    for (auto & v: values)
+        v *= 2;
+    return values;
+}
+std::array<double, 3> reversed(std::array<double, 3> values){
+    return {values[2], values[1], values[0]};
+}
+int span(slice<int, int, int> s){
+    int start = s.has_start ? s.start : 0;
+    int end = s.has_end ? s.end : 100;
+    int step = s.has_step ? s.step : 1;
+    return (end - start) / step;
+}
@@ -0,0 +1,9 @@
+# pragma once
+# include "../resources/py_slice.h"
+
+#include <array>
+#include <vector>
+
+std::vector<double> doubled(std::vector<double> values);
+std::array<double, 3> reversed(std::array<double, 3> values);
+int span(slice<int, int, int> s);
@@ -0,0 +1,102 @@
+import example
+
+from swimport.tests.resources import *
+
+
+class Shrinking:
+    """
+    a number that removes the last element of its list when it is converted
+    """
+
+    def __init__(self, owner, value):
+        self.owner = owner
+        self.value = value
+
+    def __float__(self):
+        self.owner.pop()
+        return self.value
+
+
+class Growing:
+    """
+    a number that appends to its list when it is converted
+    """
+
+    def __init__(self, owner, value):
+        self.owner = owner
+        self.value = value
+
+    def __float__(self):
+        self.owner.append(self.value * 5)
+        return self.value
+
+
+class Clearing:
+    """
+    a number that clears its list (dropping itself from it) when it is converted
+    """
+
+    def __init__(self, owner, value):
+        self.owner = owner
+        self.value = value
+
+    def __float__(self):
+        self.owner.clear()
+        return self.value
+
+
+# lists, tuples and other iterables
+assert_eq(example.doubled([1.0, 2.5]), [2.0, 5.0])
+assert_eq(example.doubled((1.0, 2.5)), [2.0, 5.0])
+assert_eq(example.doubled(x / 2 for x in range(3)), [0.0, 1.0, 2.0])
+assert_eq(example.doubled([]), [])
+with AssertError(TypeError):
+    example.doubled([1.0, 'x'])
+with AssertError(TypeError):
+    example.doubled(('x',))
+
+# lists changed by the conversion of their elements are read up to their current size
+shrinking = [1.0, 2.0, 3.0, 4.0]
+shrinking[1] = Shrinking(shrinking, 2.0)
+assert_eq(example.doubled(shrinking), [2.0, 4.0, 6.0])
+
+growing = [1.0]
+growing.append(Growing(growing, 2.0))
+assert_eq(example.doubled(growing), [2.0, 4.0, 20.0])
+
+clearing = [1.0, 2.0]
+clearing[0] = Clearing(clearing, 3.0)
+assert_eq(example.doubled(clearing), [6.0])
+
+# fixed-size arrays
+assert_eq(example.reversed([1, 2, 3]), [3.0, 2.0, 1.0])
+assert_eq(example.reversed((1, 2, 3)), [3.0, 2.0, 1.0])
+assert_eq(example.reversed(range(1, 4)), [3.0, 2.0, 1.0])
+# arrays need the length of their input
+with AssertError(TypeError):
+    example.reversed(iter([1, 2, 3]))
+with AssertError(TypeError):
+    example.reversed([1, 2])
+with AssertError(TypeError):
+    example.reversed((1, 2, 3, 4))
+with AssertError(TypeError):
+    example.reversed([1, 'x', 3])
+
+# an array whose list shrinks during its conversion is rejected
+shrinking = [1.0, 2.0, 3.0]
+shrinking[0] = Shrinking(shrinking, 1.0)
+with AssertError(TypeError):
+    example.reversed(shrinking)
+
+clearing = [1.0, 2.0, 3.0]
+clearing[2] = Clearing(clearing, 3.0)
+assert_eq(example.reversed(clearing), [3.0, 2.0, 1.0])
+
+# slices
+assert_eq(example.span(slice(10, 20, 2)), 5)
+assert_eq(example.span(slice(10, None)), 90)
+assert_eq(example.span(slice(None, None, -1)), -100)
+with AssertError(TypeError):
+    example.span(range(10))
+with AssertError(TypeError):
+    example.span(slice('a', 2))
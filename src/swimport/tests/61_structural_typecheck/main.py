@@ -0,0 +1,21 @@
+from swimport.all import *
+
+src = FileSource('src.h')
+swim = Swim('example')
+swim(pools.include(src))
+swim(pools.primitive(additionals=False, out_iterable_types=(), in_iterable_types=()))
+swim(pools.std_string(out_iterable_types=(), in_iterable_types=()))
+# the typechecks of derived types check their input's structure, so overloads on different containers can be told apart
+assert swim(pools.list('int'))
+assert swim(pools.list('std::string'))
+assert swim(pools.tuple('int', 'int'))
+assert swim(pools.tuple('int', 'int', 'int'))
+assert swim(pools.array('double', 2))
+assert swim(pools.array('double', 3))
+assert swim(pools.map('std::string', 'int'))
+assert swim(pools.map('int', 'std::string'))
+
+assert swim(Function.Behaviour()(src)) == 8
+
+swim.write('example.i')
+print('ok!')
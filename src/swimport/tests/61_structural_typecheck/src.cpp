@@ -0,0 +1,29 @@
+#include "src.h"
+
+std::string kind(std::vector<int> values){
+    return "ints " + std::to_string(values.size());
+}
+std::string kind(std::vector<std::string> values){
+    return "strings " + std::to_string(values.size());
+}
+
+int arity(std::tuple<int, int> values){
+    return 2;
+}
+int arity(std::tuple<int, int, int> values){
+    return 3;
+}
+
+int length(std::array<double, 2> values){
+    return 2;
+}
+int length(std::array<double, 3> values){
+    return 3;
+}
+
+std::string keys(std::unordered_map<std::string, int> mapping){
+    return "by name " + std::to_string(mapping.size());
+}
+std::string keys(std::unordered_map<int, std::string> mapping){
+    return "by number " + std::to_string(mapping.size());
+}
@@ -0,0 +1,19 @@
+# pragma once
+
+#include <array>
+#include <string>
+#include <tuple>
+#include <unordered_map>
+#include <vector>
+
+std::string kind(std::vector<int> values);
+std::string kind(std::vector<std::string> values);
+
+int arity(std::tuple<int, int> values);
+int arity(std::tuple<int, int, int> values);
+
+int length(std::array<double, 2> values);
+int length(std::array<double, 3> values);
+
+std::string keys(std::unordered_map<std::string, int> mapping);
+std::string keys(std::unordered_map<int, std::string> mapping);
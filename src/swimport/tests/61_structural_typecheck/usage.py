@@ -0,0 +1,42 @@
+import example
+
+from swimport.tests.resources import *
+
+# overloads are chosen by a sample element
+assert_eq(example.kind([1, 2, 3]), 'ints 3')
+assert_eq(example.kind(['a', 'b']), 'strings 2')
+assert_eq(example.kind(('a',)), 'strings 1')
+assert_eq(example.kind(range(4)), 'ints 4')
+# iterators are accepted without being consumed
+assert_eq(example.kind(i for i in range(5)), 'ints 5')
+with AssertError(TypeError):
+    example.kind([1.5])
+with AssertError(TypeError):
+    example.kind(3)
+
+# tuples are chosen by their arity
+assert_eq(example.arity((1, 2)), 2)
+assert_eq(example.arity((1, 2, 3)), 3)
+with AssertError(TypeError):
+    example.arity((1,))
+with AssertError(TypeError):
+    example.arity((1, 'a'))
+
+# arrays are chosen by their length
+assert_eq(example.length([1.0, 2.0]), 2)
+assert_eq(example.length((1, 2, 3)), 3)
+assert_eq(example.length(range(3)), 3)
+with AssertError(TypeError):
+    example.length(range(4))
+with AssertError(TypeError):
+    example.length(['a', 'b'])
+
+# maps are chosen by their first entry, for dicts and iterables of pairs alike
+assert_eq(example.keys({'a': 1, 'b': 2}), 'by name 2')
+assert_eq(example.keys({1: 'a'}), 'by number 1')
+assert_eq(example.keys([('a', 1)]), 'by name 1')
+assert_eq(example.keys([(1, 'a'), (2, 'b')]), 'by number 2')
+with AssertError(TypeError):
+    example.keys({'a': 'b'})
+with AssertError(TypeError):
+    example.keys([1, 2])
@@ -4,7 +4,7 @@ from pathlib import Path
 import warnings
 import re
 
-derived_types = All[26:33, 34, 45, 49]
+derived_types = All[26:33, 34, 45, 49, 50, 54, 57:62]
 types = All[3:9, 21:24] & derived_types
 containers = All[6:9, 37:45, 46:49]
 arrays = All[14:16, 36]
@@ -1,12 +1,15 @@
 from pathlib import Path
-from swimport.swim_run import swim_run_subfolders
-from swimport.swim_run_paths import get_path_set
+import sys
+from swimport.swim_run import swim_run_subfolders, swim_run_subfolders_parallel
+from swimport.swim_run_paths import get_default_path_set
 
 if __name__ == '__main__':
-    # if things are compiling weird, first thing, change this to /Od
+    # if things are compiling weird, first thing, change this to /Od (-O0 with gcc)
     optimization = '/O2'
 
     use_example_filters = True
+    # the number of examples to run at once, set to 1 to run them one at a time with their output
+    workers = None
     tests_dir = Path.cwd()
 
     if use_example_filters:
@@ -14,8 +17,15 @@ if __name__ == '__main__':
     else:
         from swimport.swim_run import simple_passes_filter as passes_filter
 
-    swimport_paths = get_path_set()
+    swimport_paths = get_default_path_set()
 
-    swim_run_subfolders(
-        root_dir=tests_dir, optimization=optimization, passes_filter=passes_filter,
-        print_out=True, swimport_paths=swimport_paths)
+    if workers == 1:
+        swim_run_subfolders(
+            root_dir=tests_dir, optimization=optimization, passes_filter=passes_filter,
+            print_out=True, swimport_paths=swimport_paths)
+    else:
+        results = swim_run_subfolders_parallel(
+            root_dir=tests_dir, optimization=optimization, passes_filter=passes_filter, workers=workers,
+            print_out=True, swimport_paths=swimport_paths)
+        if not all(r.passed for r in results):
+            sys.exit(1)
@@ -0,0 +1,177 @@
+from typing import List, Dict, Iterable, Set, Union, NamedTuple, Sequence
+
+import json
+import os
+import re
+from os import PathLike, fspath
+
+import swimport
+from swimport.__util__ import write_if_changed
+
+
+class SplitFunction(NamedTuple):
+    """A function that was moved out of an interface file, to be compiled in a separate translation unit"""
+    name: str
+    signature: str
+    body: List[str]
+    fragments: List[str]
+
+    @property
+    def definition(self) -> List[str]:
+        return [self.signature + ' {', *('\t' + l for l in self.body), '}']
+
+
+class SplitFunctions:
+    """
+    The functions a swim moved out of its interface file. After swig runs, the functions that the wrapper uses are
+    written into multiple c++ files (see write_translation_units), so they can be compiled in parallel.
+    """
+    suffix = '.swim_functions.json'
+    # the headers that the swig wrapper includes (directly or transitively) before the functions, which the functions
+    # (and the included headers) might rely on
+    includes = ('<Python.h>', '<cstddef>', '<exception>', '<stdexcept>', '<string>', '<utility>', '<tuple>',
+                '<vector>', '<map>', '<set>', '<unordered_map>', '<unordered_set>', '<typeinfo>')
+    # functions whose body matches this pattern use swig's runtime (or numpy's), and cannot be moved out of the wrapper
+    unsplittable_pattern = re.compile(r'\b(SWIG|swig_|PyArray|NPY_)|\$')
+    # the identifiers swimport generates (see Swim.create_unique_id)
+    identifier_pattern = re.compile(r'\b__SWIMPORT_\w+')
+    include_pattern = re.compile(r'\s*#\s*include\b')
+
+    def __init__(self, translation_units: int, begin: Iterable[str] = (), functions: Iterable[SplitFunction] = ()):
+        """
+        :param translation_units: the number of translation units to distribute the functions between
+        :param begin: the contents of the %begin scopes of the interface file (and the #include directives of its other
+            scopes), that the functions might require
+        :param functions: the functions
+        """
+        self.translation_units = translation_units
+        self.begin = list(begin)
+        self.functions: Dict[str, SplitFunction] = {f.name: f for f in functions}
+
+    def can_split(self, lines: Sequence[str], fragments: Iterable[str]) -> bool:
+        """
+        :return: whether a function can be moved to a different translation unit. It must not use swig's runtime,
+            and all the swimport identifiers it uses must be functions that were already moved.
+        """
+        if not all(f in self.functions for f in fragments):
+            return False
+        for l in lines:
+            if self.unsplittable_pattern.search(l):
+                return False
+            if any(i not in self.functions for i in self.identifier_pattern.findall(l)):
+                return False
+        return True
+
+    def add(self, name: str, signature: str, body: Sequence[str], fragments: Iterable[str]):
+        self.functions[name] = SplitFunction(name, signature, list(body), list(fragments))
+
+    def add_begin(self, lines: Iterable[str]):
+        self.begin.extend(lines)
+
+    def add_includes(self, lines: Iterable[str]):
+        """
+        add the #include directives of the interface file's other code scopes (like %{ %} and %inline), so that the
+        functions can use the types their headers declare. The rest of the scopes is not copied, since it might
+        define functions or variables that must only be defined once.
+        """
+        self.begin.extend(l for l in lines if self.include_pattern.match(l))
+
+    def used(self, wrapper: str) -> List[SplitFunction]:
+        """
+        :param wrapper: the source of the swig wrapper
+        :return: the functions that the wrapper declares (swig only emits the fragments the wrapper uses), and all the
+            functions they depend on, in the order they were added
+        """
+        used: Set[str] = set()
+        stack = [i for i in set(self.identifier_pattern.findall(wrapper)) if i in self.functions]
+        while stack:
+            name = stack.pop()
+            if name in used:
+                continue
+            used.add(name)
+            stack.extend(self.functions[name].fragments)
+        return [f for name, f in self.functions.items() if name in used]
+
+    def sources(self, wrapper: str, stem: str, translation_units: int = None) -> Dict[str, str]:
+        """
+        get the contents of the c++ files of the functions that the wrapper uses. The functions are distributed so that
+        every translation unit has roughly the same number of lines.
+        :param wrapper: the source of the swig wrapper
+        :param stem: the stem of the file names
+        :param translation_units: the number of translation units, default is the swim's translation_units
+        :return: a dict, mapping file names to their contents. The files are a shared header (<stem>_swim.h), and a
+            source file for each translation unit (<stem>_swim_<i>.cxx).
+        """
+        if translation_units is None:
+            translation_units = self.translation_units
+        functions = self.used(wrapper)
+        header_name = stem + '_swim.h'
+        header = [
+            '// functions of ' + stem + ', generated by ' + swimport.__pacakge_name__,
+            '#pragma once',
+            *('#include ' + i for i in self.includes),
+            *self.begin,
+            *(f.signature + ';' for f in functions),
+        ]
+        ret = {header_name: '\n'.join(header) + '\n'}
+        units: List[List[str]] = [[] for _ in range(max(translation_units, 1))]
+        for f in functions:
+            min(units, key=len).extend(f.definition)
+        for i, unit in enumerate(units):
+            ret[f'{stem}_swim_{i}.cxx'] = '\n'.join(['#include "' + header_name + '"', *unit]) + '\n'
+        return ret
+
+    def write_translation_units(self, wrapper_path: Union[str, PathLike], stem: str = None,
+                                translation_units: int = None) -> List[str]:
+        """
+        write the c++ files of the functions that a swig wrapper uses next to it (see sources).
+        Files that have not changed are not rewritten, and source files of previous writes with more translation
+        units are deleted.
+        :param wrapper_path: the path of the swig wrapper
+        :param stem: the stem of the file names, default is the module name (the wrapper's name without "_wrap")
+        :param translation_units: the number of translation units, default is the swim's translation_units
+        :return: the paths of the source files
+        """
+        wrapper_path = fspath(wrapper_path)
+        directory, name = os.path.split(os.path.abspath(wrapper_path))
+        if stem is None:
+            stem = os.path.splitext(name)[0]
+            if stem.endswith('_wrap'):
+                stem = stem[:-len('_wrap')]
+        with open(wrapper_path, errors='replace') as r:
+            wrapper = r.read()
+
+        ret = []
+        for name, content in self.sources(wrapper, stem, translation_units).items():
+            path = os.path.join(directory, name)
+            write_if_changed(path, content)
+            if name.endswith('.cxx'):
+                ret.append(path)
+        i = len(ret)
+        while True:
+            stale = os.path.join(directory, f'{stem}_swim_{i}.cxx')
+            if not os.path.exists(stale):
+                break
+            os.remove(stale)
+            i += 1
+        return ret
+
+    def to_json(self) -> dict:
+        return {
+            'translation_units': self.translation_units,
+            'begin': self.begin,
+            'functions': [f._asdict() for f in self.functions.values()],
+        }
+
+    @classmethod
+    def from_json(cls, d: dict) -> 'SplitFunctions':
+        return cls(d['translation_units'], d['begin'], (SplitFunction(**f) for f in d['functions']))
+
+    def write(self, path: Union[str, PathLike]):
+        write_if_changed(fspath(path), json.dumps(self.to_json(), indent=1))
+
+    @classmethod
+    def read(cls, path: Union[str, PathLike]) -> 'SplitFunctions':
+        with open(fspath(path)) as r:
+            return cls.from_json(json.load(r))
+
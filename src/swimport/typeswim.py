@@ -76,7 +76,7 @@ class FunctionBody(ToPyTypemap, ToCppTypemap, ToCppCheckTypemap, ToCppPostTypema
     def can_replace(self):
         return not self.owner
 
-    def __init__(self, body, *, user_data='', fragments=()):
+    def __init__(self, body, *, user_data='', fragments=(), rvalue_body=None, typecheck_body=None):
         """
         :param body: the function body. The function returns void and has 4 parameters:
             * T input, either of type PyObject* or the type being mapped
@@ -85,12 +85,21 @@ class FunctionBody(ToPyTypemap, ToCppTypemap, ToCppCheckTypemap, ToCppPostTypema
             * T* ret, either of type PyObject* or the type being mapped, stores the result.
         :param user_data: code to assign to an existing variable called userdata, before the function is called.
         :param fragments: a tuple of fragment names to assign to the typemap (in addition to the function fragment)
+        :param rvalue_body: only used for to_py functions. If set, the body of an additional function, used to convert
+            values that are discarded after the conversion (like the return values of functions returning by value).
+            The function's input is a non-const reference (T& input), that the body may move from.
+        :param typecheck_body: only used for to_cpp_check functions. If set, the body of an additional function, used
+            by the typecheck typemaps only (other functions, like the checks of iterables, use the regular function).
         """
         self.body = body
         self.user_data = user_data
         self.fragments = fragments
+        self.rvalue_body = rvalue_body
+        self.typecheck_body = typecheck_body
 
         self.function_name = None
+        self.rvalue_function_name = None
+        self.typecheck_function_name = None
         self.owner: TypeSwimporting = None
 
     def set_owner(self, owner):
@@ -106,13 +115,25 @@ class FunctionBody(ToPyTypemap, ToCppTypemap, ToCppCheckTypemap, ToCppPostTypema
                                                             (swimporting.cpp_name + ' const & input', 'int& ok',
                                                              'void * volatile userdata'),
                                                             fragments=self.fragments)
+        if self.rvalue_body:
+            self.rvalue_function_name = swim.add_function('PyObject*', ('ToPyRvalue', swimporting.cpp_name),
+                                                          self.rvalue_body,
+                                                          (swimporting.cpp_name + ' & input', 'int& ok',
+                                                           'void * volatile userdata'),
+                                                          fragments=self.fragments)
+            # the result must be stored in a variable (as opposed to optimal typemaps) to be passed by reference
+            out_func = self.rvalue_function_name
+            out_attrs = ''
+        else:
+            out_func = to_py_func
+            out_attrs = ', optimal="1"'
         swim.add_raw(f"""
-                    %typemap(out, fragment="{to_py_func}", optimal="1") {swimporting.cpp_name}{{
+                    %typemap(out, fragment="{out_func}"{out_attrs}) {swimporting.cpp_name}{{
                         void * volatile userdata = nullptr;
                         int ok = true;
                         {self.user_data}
                         try{{
-                            $result = {to_py_func}($1, ok, userdata);
+                            $result = {out_func}($1, ok, userdata);
                         }}
                         catch(std::exception const& e){{ PyErr_SetString(PyExc_Exception, e.what()); SWIG_fail;}}
                         catch(std::pair<PyObject*, std::string> const & p) {{
@@ -130,14 +151,14 @@ class FunctionBody(ToPyTypemap, ToCppTypemap, ToCppCheckTypemap, ToCppPostTypema
                             {swimporting.arbitrary_initializer}){{
                             $1=($1_ltype)(&res);
                         }}
-                        %typemap(argout, fragment="{to_py_func}") {swimporting.cpp_name} *OUTPUT{{
+                        %typemap(argout, fragment="{out_func}") {swimporting.cpp_name} *OUTPUT{{
                             if ($1){{
                                 void * volatile userdata = nullptr;
                                 int ok = true;
                                 {self.user_data}
                                 PyObject* to_add = nullptr;
                                 try {{
-                                    to_add = {to_py_func}(*$1, ok, userdata);
+                                    to_add = {out_func}(*$1, ok, userdata);
                                 }}
                                 catch(std::exception const& e){{ PyErr_SetString(PyExc_Exception, e.what()); SWIG_fail;}}
                                 catch(std::pair<PyObject*, std::string> const & p) {{
@@ -207,15 +228,31 @@ class FunctionBody(ToPyTypemap, ToCppTypemap, ToCppCheckTypemap, ToCppPostTypema
                                                              ('PyObject * input', 'int& ok', 'void * volatile userdata'),
                                                              fragments=self.fragments)
         swimporting.to_cpp_func = self
+
+        memoized = getattr(swimporting.to_cpp_check, 'cache', False)
+        if memoized:
+            def cached_conversion(assign, conversion):
+                return f"""
+                    auto cached = py_cache::conversion_memo::get().take<{swimporting.cpp_name}>($input);
+                    if (cached)
+                        {assign}std::move(*cached);
+                    else
+                        {assign}{conversion}"""
+        else:
+            def cached_conversion(assign, conversion):
+                return assign + conversion
+
         swim.add_raw(f"""
                     %typemap(in, fragment="{to_cpp_func}") {swimporting.cpp_name}{{
                         void * volatile userdata = nullptr;
                         {self.user_data}
                         int ok = true;
                         try{{
-                            $1 = ($1_ltype){to_cpp_func}($input, ok, userdata);;
+                            {cached_conversion('$1 = ($1_ltype)', f'{to_cpp_func}($input, ok, userdata)')};
                         }}
                         catch(std::exception const& e){{ PyErr_SetString(PyExc_Exception, e.what()); SWIG_fail;}}
+                        // thrown by SWIM_RAISE_EXISTING, the error is already set
+                        catch(PyObject* const &) {{ SWIG_fail; }}
                         catch(std::pair<PyObject*, std::string> const & p) {{
                             std::string msg = "error in converting parameter #$argnum in function $symname: ";
                             msg += std::get<1>(p);
@@ -244,10 +281,12 @@ class FunctionBody(ToPyTypemap, ToCppTypemap, ToCppCheckTypemap, ToCppPostTypema
                                 int ok = true;
                                 {self.user_data}
                                 try {{
-                                    res = {to_cpp_func}($input, ok, userdata);
+                                    {cached_conversion('res = ', f'{to_cpp_func}($input, ok, userdata)')};
                                     $1 = ($1_ltype)&res;
                                 }}
                                 catch(std::exception const& e){{ PyErr_SetString(PyExc_Exception, e.what()); SWIG_fail;}}
+                                // thrown by SWIM_RAISE_EXISTING, the error is already set
+                                catch(PyObject* const &) {{ SWIG_fail; }}
                                 catch(std::pair<PyObject*, std::string> const & p) {{
                                     std::string msg = "error in converting parameter #$argnum in function $symname: ";
                                     msg += std::get<1>(p);
@@ -258,6 +297,20 @@ class FunctionBody(ToPyTypemap, ToCppTypemap, ToCppCheckTypemap, ToCppPostTypema
                         }}
                         """)
 
+        if memoized:
+            # the memoized conversions only last for the call
+            swim.add_raw(f"""
+                        %typemap(freearg) {swimporting.cpp_name}{{
+                            py_cache::conversion_memo::get().clear();
+                        }}
+                        """)
+            if swimporting.ref_maps:
+                swim.add_raw(f"""
+                            %typemap(freearg) {swimporting.cpp_name} const * INPUT{{
+                                py_cache::conversion_memo::get().clear();
+                            }}
+                            """)
+
         if swimporting.varin_maps:
             swim.add_raw(f"""
                         %typemap(varin, fragment="{to_cpp_func}") {swimporting.cpp_name}{{
@@ -269,6 +322,8 @@ class FunctionBody(ToPyTypemap, ToCppTypemap, ToCppCheckTypemap, ToCppPostTypema
                                 $1 = temp;
                             }}
                             catch(std::exception const& e){{ PyErr_SetString(PyExc_Exception, e.what()); SWIG_fail;}}
+                            // thrown by SWIM_RAISE_EXISTING, the error is already set
+                            catch(PyObject* const &) {{ SWIG_fail; }}
                             catch(std::pair<PyObject*, std::string> const & p) {{
                                 std::string msg = "error in setting variable $symname from py: ";
                                 msg += std::get<1>(p);
@@ -297,6 +352,10 @@ class FunctionBody(ToPyTypemap, ToCppTypemap, ToCppCheckTypemap, ToCppPostTypema
                                                                    ('PyObject * input',
                                                                     'void * volatile userdata'), fragments=self.fragments)
         swimporting.to_cpp_check_func = self
+        if self.typecheck_body:
+            self.typecheck_function_name = to_cpp_check_func = swim.add_function(
+                'bool', ('ToCppTypecheck', swimporting.cpp_name), self.typecheck_body,
+                ('PyObject * input', 'void * volatile userdata'), fragments=self.fragments)
         swim.add_raw(f"""
                     %typemap(typecheck{swimporting.to_cpp_check_precedence_arg}, fragment="{to_cpp_check_func}") {swimporting.cpp_name}{{
                         void * volatile userdata=nullptr;
@@ -373,6 +432,8 @@ class FunctionBody(ToPyTypemap, ToCppTypemap, ToCppCheckTypemap, ToCppPostTypema
 }}
 """)
             frags.append(fb.function_name)
+            if fb.rvalue_function_name:
+                frags.append(fb.rvalue_function_name)
             frags.extend(fb.fragments)
         userdata.append('userdata = (void * volatile)ud;')
         userdata = '\n'.join(userdata)
@@ -397,16 +458,26 @@ class DefaultCppCheck(ToCppCheckTypemap):
     A class to create a to_cpp_check typemap using the already provided tocpp typemap.
     """
 
+    def __init__(self, cache=False):
+        """
+        :param cache: whether to memoize the values converted by the check for the rest of the call, so that the
+            checks of other overloads and the in typemap of the overload that is chosen do not convert the same
+            argument again. Only values converted from immutable objects are memoized (see conversion_cache.h), since
+            other objects might change between the check and the conversion.
+        """
+        self.cache = cache
+
     def use_as_to_cpp_check(self, swim, swimporting):
         std_to_cpp = swimporting.to_cpp_func.function_name
         if not std_to_cpp:
             raise Exception(
                 'DefaultCppCheck was declared, but a standard to cpp function was not declared for this type')
 
-        FunctionBody(f"""
+        def body(convert):
+            return f"""
             int result = 1;
             try{{
-                {std_to_cpp}(input, result, userdata);
+                {convert}
             }}
             catch(...) {{result = 0;}}
             if (PyErr_Occurred() != nullptr)
@@ -415,7 +486,24 @@ class DefaultCppCheck(ToCppCheckTypemap):
                 PyErr_Clear();
             }}
             return result;
-        """).use_as_to_cpp_check(swim, swimporting)
+            """
+
+        typecheck_body = None
+        if self.cache:
+            # only the typecheck typemaps memoize, other checks (like those of iterables' elements) are not followed by
+            # an in typemap that would take the value
+            swim(pools_pkg.syspools.conversion_cache)
+            typecheck_body = body(f"""
+                auto & memo = py_cache::conversion_memo::get();
+                if (memo.contains<{swimporting.cpp_name}>(input))
+                    return 1;
+                auto value = {std_to_cpp}(input, result, userdata);
+                if (result && PyErr_Occurred() == nullptr)
+                    memo.store<{swimporting.cpp_name}>(input, std::move(value));
+                """)
+
+        FunctionBody(body(f'{std_to_cpp}(input, result, userdata);'), typecheck_body=typecheck_body,
+                     fragments=(std_to_cpp,)).use_as_to_cpp_check(swim, swimporting)
 
 
 class BuiltinTypemap(ToPyTypemap, ToCppTypemap, ToCppCheckTypemap):